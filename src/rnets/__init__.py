@@ -1,2 +1,2 @@
 # -*- coding: utf-8 -*-
-from . import addons, struct, parser, plotter, dot, colors, conf_type_checker
+from . import addons, struct, parser, plotter, dot, colors, conf_type_checker, delta, stoich, merge, kinetics
@@ -161,6 +161,15 @@ def edge_group(parser: argparse.ArgumentParser) -> None:
         dest="graph.edge.max_width",
         default=argparse.SUPPRESS,
     )
+    edge.add_argument(
+        "-lw",
+        "--logwidth",
+        action="store_const",
+        const=True,
+        help="Normalize the edge widths on logarithmic values",
+        dest="graph.edge.log_scale",
+        default=argparse.SUPPRESS,
+    )
     edge.add_argument(
         "-eo",
         "--edge-opts",
@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
+from array import array
 from collections import Counter
 from collections.abc import Callable, Iterable, Iterator, Sequence
-from functools import reduce
-from math import exp
+from functools import lru_cache, reduce
+from math import exp, expm1, inf, isfinite, isnan, log, log1p, nan
 from itertools import chain, repeat, starmap
-from typing import NamedTuple
+from operator import sub
+from typing import Any, NamedTuple
 
-from .struct import Compound, Network, Reaction
+from .struct import Compound, Network, Reaction, relink_reactions
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 CONSTANTS = {
     "kb": {
@@ -24,6 +31,7 @@ CONSTANTS = {
 DEF_T: float = 273.15                  # Standard temperature in K
 DEF_A: float = 1E13                    # Arrhenius pre-exponential factor
 DEF_KB: float = CONSTANTS["kb"]["eV"]  # Boltzmann constat eV and K
+MAX_EXP: float = 709.78                # Largest exponent not overflowing exp
 
 
 class ChemCfg(NamedTuple):
@@ -134,6 +142,25 @@ def calc_activation_energy(
     return r.energy - (sum(map(lambda x: x.energy, r.compounds[int(reverse)])))
 
 
+def eval_free_energy(
+    coefs: Sequence[float]
+    , T: float = DEF_T
+) -> float:
+    """Evaluate a free energy polynomial of the temperature with Horner's
+    rule.
+
+    Args:
+        coefs (sequence of float): Coefficients in increasing degree, e.g.
+            (H, -S) for G = H - T S (see :attr:`Compound.g_coefs`).
+        T (float, optional): Temperature in Kelvin. Defaults to
+            :obj:`DEF_T`.
+
+    Returns:
+        float with the free energy at T.
+    """
+    return reduce(lambda acc, a: acc * T + a, reversed(coefs), 0.)
+
+
 def calc_pseudo_k_constant(
     ea: float
     , T: float = DEF_T
@@ -165,6 +192,52 @@ def calc_pseudo_k_constant(
     return A*exp((-ea/(kb*T)))
 
 
+def calc_log_pseudo_k_constant(
+    ea: float
+    , T: float = DEF_T
+    , A: float = DEF_A
+    , kb: float = DEF_KB
+) -> float:
+    """Natural logarithm of the pseudo kinetic constant (see
+    :obj:`calc_pseudo_k_constant`). No exponential is evaluated, so the
+    result neither underflows nor overflows for extreme activation energies.
+
+    Args:
+        ea (float): Reaction energy.
+        T (float): Temperature at which the kinetic constant is
+            computed. Defaults to :obj:`DEF_T`.
+        A (float): Pre-exponential factor for the Arrhenious equation. Defaults
+            to :obj:`DEF_A`.
+        kb (float): Boltzmann constant. Defaults to :obj:`DEF_KB`
+
+    Returns:
+       float: Natural logarithm of the pseudo-k.
+    """
+    return log(A) - ea/(kb*T)
+
+
+def log_diff_exp(
+    a: float
+    , b: float
+) -> tuple[int, float]:
+    """Compute the sign and the logarithm of the absolute value of exp(a) -
+    exp(b) without leaving the log domain.
+
+    Args:
+        a (float): Logarithm of the minuend.
+        b (float): Logarithm of the subtrahend.
+
+    Returns:
+        tuple of the form (sign, log|exp(a) - exp(b)|), with sign being 1, -1
+        or 0. The logarithm of a null difference is -inf.
+    """
+    if a == b:
+        return (0, -inf)
+    if a > b:
+        return (1, a + log1p(-exp(b - a)))
+    return (-1, b + log1p(-exp(a - b)))
+
+
 def calc_net_rate(
     r: Reaction
     , T: float
@@ -211,6 +284,499 @@ def calc_net_rate(
     return d - i
 
 
+def unique_reactions(
+    rs: Iterable[Reaction]
+) -> tuple[Reaction, ...]:
+    """Given a set of reactions that may contain bidirectional reactions,
+    return a set without the reversed reactions, in linear time. A reaction
+    is the reverse of another only if it shares its transition state energy,
+    so opposite reactions through different transition states are kept as
+    parallel channels.
+
+    Args:
+        rs (iterable of :obj:`Reaction`): Reactions to filter.
+
+    Returns:
+        tuple with the unique :obj:`Reaction`, keeping the first reaction of
+        each reversible pair.
+    """
+    seen: set[tuple[tuple[tuple[Compound, ...], ...], float]] = set()
+    out: list[Reaction] = []
+    for r in rs:
+        if (tuple(reversed(r.compounds)), r.energy) in seen:
+            continue
+        seen.add((r.compounds, r.energy))
+        out.append(r)
+    return tuple(out)
+
+
+class KTable(NamedTuple):
+    """Forward and reverse pseudo kinetic constants of the reactions of a
+    :obj:`RateEngine`. The constants only depend on the energies and on the
+    chemical configuration, so a table can be reused for any number of
+    concentration vectors.
+
+    Attributes:
+        c_energies (tuple of float): Energies of the compounds, following the
+            order of the concentration vectors, used to build the table.
+        r_energies (tuple of float): Energies of the reactions used to build
+            the table.
+        chem_cfg (:obj:`ChemCfg`): Chemical parameters used to build the
+            table.
+        kf (array of float): Forward pseudo kinetic constants. Constants
+            overflowing a float are stored as inf.
+        kr (array of float): Reverse pseudo kinetic constants.
+        lkf (array of float): Natural logarithm of the forward constants (see
+            :obj:`calc_log_pseudo_k_constant`).
+        lkr (array of float): Natural logarithm of the reverse constants.
+    """
+    c_energies: tuple[float, ...]
+    r_energies: tuple[float, ...]
+    chem_cfg: ChemCfg
+    kf: array
+    kr: array
+    lkf: array
+    lkr: array
+
+
+class RateEngine(NamedTuple):
+    """Precomputed data to evaluate the rates of multiple reactions at once.
+    Each reaction is evaluated as reversible, using the energy of the
+    reaction as the transition state of both directions (see
+    :obj:`calc_net_rate`).
+
+    Attributes:
+        reactions (tuple of :obj:`Reaction`): Evaluated reactions.
+        rows (dict of int as keys and int as values): Position of each
+            compound, by idx, in the concentration vectors.
+        elementary (array of int): 1 if the reaction has one or two different
+            compounds at each side, 0 otherwise.
+        l_ptr (array of int): Offsets of the reactants of each reaction in
+            :attr:`l_idx`.
+        l_idx (array of int): Concentration vector position of the reactants,
+            repeated as many times as they appear in the reaction.
+        r_ptr (array of int): Offsets of the products of each reaction in
+            :attr:`r_idx`.
+        r_idx (array of int): Concentration vector position of the products,
+            repeated as many times as they appear in the reaction.
+        kt (:obj:`KTable`): Kinetic constants of the reactions.
+    """
+    reactions: tuple[Reaction, ...]
+    rows: dict[int, int]
+    elementary: array
+    l_ptr: array
+    l_idx: array
+    r_ptr: array
+    r_idx: array
+    kt: KTable
+
+
+class RateSet(NamedTuple):
+    """Rates of the reactions of a :obj:`RateEngine`.
+
+    Attributes:
+        fwd (array of float): Forward rates.
+        rev (array of float): Reverse rates.
+        net (array of float): Net rates, forward minus reverse.
+    """
+    fwd: array
+    rev: array
+    net: array
+
+
+def build_rate_engine(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , rs: Sequence[Reaction] | None = None
+) -> RateEngine:
+    """Build a :obj:`RateEngine`, computing the participant arrays and the
+    kinetic constants once.
+
+    Args:
+        nw (:obj:`Network`): Network whose compounds define the concentration
+            vector positions.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        rs (sequence of :obj:`Reaction` or None, optional): Reactions to
+            evaluate. If None, the unique reactions of the network will be used
+            (see :obj:`unique_reactions`). Defaults to None.
+
+    Returns:
+        :obj:`RateEngine` of the reactions.
+
+    Note:
+        The :obj:`KTable` is cached by topology, energies and chemical
+        configuration, so engines built from networks differing only in their
+        concentrations share the same kinetic constants.
+
+    Raises:
+        :obj:`ValueError`: If a reaction references a compound that is not in
+            the network.
+    """
+    rows: dict[int, int] = {c.idx: i for i, c in enumerate(nw.compounds)}
+    rs = unique_reactions(nw.reactions) if rs is None else tuple(rs)
+    sides: tuple[tuple[array, array], ...] = (
+        (array('q', [0]), array('q')), (array('q', [0]), array('q')))
+    for r in rs:
+        for (ptr, idx), xs in zip(sides, r.compounds):
+            try:
+                idx.extend(rows[c.idx] for c in xs)
+            except KeyError as e:
+                raise ValueError(
+                    f"Compound with idx {e.args[0]} of reaction {r.name} not "
+                    "found in the network"
+                ) from None
+            ptr.append(len(idx))
+    c_es: tuple[float, ...] = tuple(c.energy for c in nw.compounds)
+    r_es: tuple[float, ...] = tuple(r.energy for r in rs)
+    return RateEngine(
+        reactions=rs
+        , rows=rows
+        , elementary=array('B', (
+            all(0 < len(set(xs)) <= 2 for xs in r.compounds) for r in rs))
+        , l_ptr=sides[0][0]
+        , l_idx=sides[0][1]
+        , r_ptr=sides[1][0]
+        , r_idx=sides[1][1]
+        , kt=_cached_ktable(
+            _topology_key(*sides[0], *sides[1]), c_es, r_es, chem_cfg))
+
+
+def _topology_key(
+    *xs: array
+) -> tuple[bytes, ...]:
+    return tuple(x.tobytes() for x in xs)
+
+
+def _side_energies(
+    c_es: Sequence[float]
+    , r_es: Sequence[float]
+    , ptr: array
+    , idx: array
+) -> Iterator[float]:
+    """Activation energy of each reaction from one of its sides, summing the
+    energies in the same order as :obj:`calc_activation_energy`."""
+    for j, e in enumerate(r_es):
+        yield e - sum(c_es[i] for i in idx[ptr[j]:ptr[j + 1]])
+
+
+@lru_cache(maxsize=32)
+def _cached_ktable(
+    topology: tuple[bytes, ...]
+    , c_es: tuple[float, ...]
+    , r_es: tuple[float, ...]
+    , chem_cfg: ChemCfg
+) -> KTable:
+    l_ptr, l_idx, r_ptr, r_idx = (
+        array('q', x) for x in topology)
+    eaf: tuple[float, ...] = tuple(_side_energies(c_es, r_es, l_ptr, l_idx))
+    ear: tuple[float, ...] = tuple(_side_energies(c_es, r_es, r_ptr, r_idx))
+    A, kbt = chem_cfg.A, chem_cfg.kb * chem_cfg.T
+    la: float = log(A)
+    return KTable(
+        c_energies=c_es
+        , r_energies=r_es
+        , chem_cfg=chem_cfg
+        , kf=array('d', (A * _exp_or_inf(-ea / kbt) for ea in eaf))
+        , kr=array('d', (A * _exp_or_inf(-ea / kbt) for ea in ear))
+        , lkf=array('d', (la - ea / kbt for ea in eaf))
+        , lkr=array('d', (la - ea / kbt for ea in ear)))
+
+
+def _exp_or_inf(
+    x: float
+) -> float:
+    return exp(x) if x < MAX_EXP else inf
+
+
+def update_ktable(
+    eng: RateEngine
+    , c_energies: Sequence[float] | None = None
+    , r_energies: Sequence[float] | None = None
+    , chem_cfg: ChemCfg | None = None
+) -> RateEngine:
+    """Update the :obj:`KTable` of an engine, recomputing the kinetic
+    constants only if the energies or the chemical configuration changed.
+
+    Args:
+        eng (:obj:`RateEngine`): Engine to update.
+        c_energies (sequence of float or None, optional): New energies of the
+            compounds, following the order of the concentration vectors. If
+            None, the current energies are kept. Defaults to None.
+        r_energies (sequence of float or None, optional): New energies of the
+            reactions of the engine. If None, the current energies are kept.
+            Defaults to None.
+        chem_cfg (:obj:`ChemCfg` or None, optional): New chemical parameters.
+            If None, the current ones are kept. Defaults to None.
+
+    Returns:
+        :obj:`RateEngine` with the updated table. The same engine is returned
+        if nothing changed.
+    """
+    kt: KTable = eng.kt
+    c_es: tuple[float, ...] = (
+        kt.c_energies if c_energies is None else tuple(c_energies))
+    r_es: tuple[float, ...] = (
+        kt.r_energies if r_energies is None else tuple(r_energies))
+    cfg: ChemCfg = kt.chem_cfg if chem_cfg is None else chem_cfg
+    if (c_es, r_es, cfg) == (kt.c_energies, kt.r_energies, kt.chem_cfg):
+        return eng
+    return eng._replace(kt=_cached_ktable(
+        _topology_key(eng.l_ptr, eng.l_idx, eng.r_ptr, eng.r_idx)
+        , c_es, r_es, cfg))
+
+
+def sync_rate_engine(
+    eng: RateEngine
+    , nw: Network
+    , chem_cfg: ChemCfg | None = None
+) -> RateEngine:
+    """Update the :obj:`KTable` of an engine with the energies of a network
+    sharing its compounds, e.g. a frame of a trajectory.
+
+    Args:
+        eng (:obj:`RateEngine`): Engine to update.
+        nw (:obj:`Network`): Network with the same compounds, in the same
+            order, as the one used to build the engine.
+        chem_cfg (:obj:`ChemCfg` or None, optional): New chemical parameters.
+            If None, the current ones are kept. Defaults to None.
+
+    Returns:
+        :obj:`RateEngine` with the updated table. The same engine is returned
+        if neither the compound energies nor the configuration changed.
+
+    Note:
+        Only the energies of the compounds are read from the network; the
+        reaction energies are changed with :obj:`update_ktable`.
+    """
+    return update_ktable(
+        eng, tuple(c.energy for c in nw.compounds), None, chem_cfg)
+
+
+def conc_vector(
+    nw: Network
+) -> array:
+    """Build the concentration vector of a network, following the order of
+    :attr:`Network.compounds`. Missing concentrations are stored as NaN.
+
+    Args:
+        nw (:obj:`Network`): Network with the concentrations.
+
+    Returns:
+        array of float with the concentrations.
+    """
+    return array('d', (nan if c.conc is None else c.conc for c in nw.compounds))
+
+
+def _side_rates(
+    k: array
+    , c: Sequence[float]
+    , ptr: array
+    , idx: array
+) -> array:
+    """Multiply each kinetic constant by the concentrations of the compounds
+    in the corresponding reaction side."""
+    if np is not None:
+        g = np.append(np.asarray(c, dtype=float)[np.asarray(idx)], 1.)
+        p = np.asarray(ptr)
+        prod = np.multiply.reduceat(g, p[:-1]) if len(p) > 1 else g[:0]
+        prod[p[:-1] == p[1:]] = 1.
+        return array('d', (np.asarray(k) * prod).tobytes())
+    out: array = array('d', k)
+    for j in range(len(k)):
+        x: float = out[j]
+        for i in idx[ptr[j]:ptr[j + 1]]:
+            x *= c[i]
+        out[j] = x
+    return out
+
+
+def eval_rates(
+    eng: RateEngine
+    , c: Sequence[float]
+) -> RateSet:
+    """Evaluate the forward, reverse and net rates of all the reactions of a
+    :obj:`RateEngine` in a single pass. Uses NumPy when available.
+
+    Args:
+        eng (:obj:`RateEngine`): Engine with the reactions.
+        c (sequence of float): Concentration vector (see :obj:`conc_vector`).
+
+    Returns:
+        :obj:`RateSet` with the rates in the order of
+        :attr:`RateEngine.reactions`. Reactions involving a NaN concentration
+        will have NaN rates.
+    """
+    fwd: array = _side_rates(eng.kt.kf, c, eng.l_ptr, eng.l_idx)
+    rev: array = _side_rates(eng.kt.kr, c, eng.r_ptr, eng.r_idx)
+    return RateSet(fwd=fwd, rev=rev, net=array('d', map(sub, fwd, rev)))
+
+
+def net_rates_or_none(
+    eng: RateEngine
+    , c: Sequence[float]
+) -> tuple[float | None, ...]:
+    """Evaluate the net rates of a :obj:`RateEngine` following the conventions
+    of :obj:`calc_net_rate`.
+
+    Args:
+        eng (:obj:`RateEngine`): Engine with the reactions.
+        c (sequence of float): Concentration vector (see :obj:`conc_vector`).
+
+    Returns:
+        tuple of float or None with the net rate of each reaction, being None
+        for non-elementary reactions or reactions with NaN concentrations.
+    """
+    return tuple(
+        None if not e or isnan(x) else x
+        for e, x in zip(eng.elementary, eval_rates(eng, c).net))
+
+
+class LogRateSet(NamedTuple):
+    """Natural logarithm of the rates of the reactions of a
+    :obj:`RateEngine`.
+
+    Attributes:
+        fwd (array of float): Logarithm of the forward rates.
+        rev (array of float): Logarithm of the reverse rates.
+        net (array of float): Logarithm of the absolute net rates.
+        sign (array of int): Sign of the net rates, 1 if the forward rate
+            dominates, -1 if the reverse rate dominates and 0 otherwise.
+    """
+    fwd: array
+    rev: array
+    net: array
+    sign: array
+
+
+def log_conc_vector(
+    nw: Network
+) -> array:
+    """Logarithmic version of :obj:`conc_vector`. Null concentrations are
+    stored as -inf and missing concentrations as NaN.
+
+    Args:
+        nw (:obj:`Network`): Network with the concentrations.
+
+    Returns:
+        array of float with the logarithm of the concentrations.
+    """
+    return array('d', (
+        nan if c.conc is None else -inf if c.conc <= 0. else log(c.conc)
+        for c in nw.compounds))
+
+
+def _side_log_rates(
+    lk: array
+    , lc: Sequence[float]
+    , ptr: array
+    , idx: array
+) -> array:
+    """Add to each logarithmic kinetic constant the logarithm of the
+    concentrations of the compounds in the corresponding reaction side."""
+    if np is not None:
+        g = np.append(np.asarray(lc, dtype=float)[np.asarray(idx)], 0.)
+        p = np.asarray(ptr)
+        tot = np.add.reduceat(g, p[:-1]) if len(p) > 1 else g[:0]
+        tot[p[:-1] == p[1:]] = 0.
+        return array('d', (np.asarray(lk) + tot).tobytes())
+    out: array = array('d', lk)
+    for j in range(len(lk)):
+        x: float = out[j]
+        for i in idx[ptr[j]:ptr[j + 1]]:
+            x += lc[i]
+        out[j] = x
+    return out
+
+
+def eval_log_rates(
+    eng: RateEngine
+    , lc: Sequence[float]
+) -> LogRateSet:
+    """Logarithmic version of :obj:`eval_rates`. Concentration powers are
+    combined as sums of logarithms, so rates spanning many orders of magnitude
+    neither underflow nor overflow.
+
+    Args:
+        eng (:obj:`RateEngine`): Engine with the reactions.
+        lc (sequence of float): Logarithmic concentration vector (see
+            :obj:`log_conc_vector`).
+
+    Returns:
+        :obj:`LogRateSet` with the rates in the order of
+        :attr:`RateEngine.reactions`. Reactions involving a NaN concentration
+        will have NaN rates.
+    """
+    fwd: array = _side_log_rates(eng.kt.lkf, lc, eng.l_ptr, eng.l_idx)
+    rev: array = _side_log_rates(eng.kt.lkr, lc, eng.r_ptr, eng.r_idx)
+    net: array = array('d')
+    sign: array = array('b')
+    for a, b in zip(fwd, rev):
+        if isnan(a) or isnan(b):
+            net.append(nan)
+            sign.append(0)
+            continue
+        sg, x = log_diff_exp(a, b)
+        net.append(x)
+        sign.append(sg)
+    return LogRateSet(fwd=fwd, rev=rev, net=net, sign=sign)
+
+
+def calc_net_rates(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , rs: Sequence[Reaction] | None = None
+) -> tuple[float | None, ...]:
+    """Batch version of :obj:`calc_net_rate`, computing the net rates of
+    multiple reactions with a :obj:`RateEngine`.
+
+    Args:
+        nw (:obj:`Network`): Network with the compounds and their
+            concentrations.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        rs (sequence of :obj:`Reaction` or None, optional): Reactions to
+            evaluate. If None, the unique reactions of the network will be
+            used. Defaults to None.
+
+    Returns:
+        tuple of float or None with the net rate of each reaction. As in
+        :obj:`calc_net_rate`, non-elementary reactions or reactions with
+        missing concentrations will have None as rate.
+    """
+    return net_rates_or_none(
+        build_rate_engine(nw, chem_cfg, rs), conc_vector(nw))
+
+
+def trajectory_rates(
+    nws: Iterable[Network]
+    , chem_cfg: ChemCfg = ChemCfg()
+    , rs: Sequence[Reaction] | None = None
+) -> Iterator[RateSet]:
+    """Evaluate the rates of a sequence of networks sharing their compounds
+    and reactions, e.g. the frames of a trajectory. A single
+    :obj:`RateEngine` is built for the first network and its :obj:`KTable`
+    is only recomputed when the compound energies change.
+
+    Args:
+        nws (iterable of :obj:`Network`): Networks to evaluate.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        rs (sequence of :obj:`Reaction` or None, optional): Reactions to
+            evaluate. If None, the unique reactions of the first network will
+            be used. Defaults to None.
+
+    Yields:
+        :obj:`RateSet` of each network.
+    """
+    eng: RateEngine | None = None
+    for nw in nws:
+        eng = (
+            build_rate_engine(nw, chem_cfg, rs) if eng is None
+            else sync_rate_engine(eng, nw))
+        yield eval_rates(eng, conc_vector(nw))
+
+
 def normalizer(
     s: float
     , e: float
@@ -304,43 +870,925 @@ def minmax(
     return (min(ys), max(ys))
 
 
+class NetworkStats(NamedTuple):
+    """Summary of the values of a network used to build normalizers and
+    colorbars.
+
+    Attributes:
+        e_range (tuple of two floats): Minimum and maximum energies of the
+            compounds and reactions.
+        c_range (tuple of two floats or None): Minimum and maximum
+            concentrations of the compounds, None if no compound has a
+            concentration.
+        k_range (tuple of two floats or None): Minimum and maximum pseudo
+            kinetic constants of the reactions, None if there are no
+            reactions.
+        rate_range (tuple of two floats or None): Minimum and maximum absolute
+            net rates of the reactions, None if no rate could be computed.
+        ks (tuple of floats): Pseudo kinetic constant of each reaction,
+            following the order of :attr:`Network.reactions`.
+        rates (tuple of floats or None): Net rate of each reaction, following
+            the order of :attr:`Network.reactions`. See :obj:`calc_net_rate`.
+        log_k_range (tuple of two floats or None): Minimum and maximum
+            logarithmic kinetic constants, None if there are no reactions.
+        log_rate_range (tuple of two floats or None): Minimum and maximum
+            finite logarithms of the absolute net rates, None if no rate could
+            be computed.
+        log_ks (tuple of floats): Natural logarithm of the pseudo kinetic
+            constant of each reaction (see :obj:`calc_log_pseudo_k_constant`).
+        log_rates (tuple of floats or None): Natural logarithm of the
+            absolute net rate of each reaction (see :obj:`eval_log_rates`).
+        rate_signs (tuple of int): Sign of the net rate of each reaction,
+            computed in the log domain. 0 if the rate is null or could not be
+            computed.
+    """
+    e_range: tuple[float, float]
+    c_range: tuple[float, float] | None
+    k_range: tuple[float, float] | None
+    rate_range: tuple[float, float] | None
+    ks: tuple[float, ...]
+    rates: tuple[float | None, ...]
+    log_k_range: tuple[float, float] | None = None
+    log_rate_range: tuple[float, float] | None = None
+    log_ks: tuple[float, ...] = ()
+    log_rates: tuple[float | None, ...] = ()
+    rate_signs: tuple[int, ...] = ()
+
+
 def network_energy_normalizer(
     n: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , stats: NetworkStats | None = None
 ) -> Callable[[float], float]:
     """Given a reaction network, build an energy normalizer based on the
     minimum and maximum energies of the compounds and reactions.
 
     Args:
         n (:obj:`Network`): Network for which the normalizer will be built.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical configuration used to
+            retrieve the cached :obj:`NetworkStats`. Defaults to
+            :obj:`ChemCfg`.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network, e.g. from :obj:`sweep_network_stats`.
+            If None, :obj:`network_stats` will be used. Defaults to None.
 
     Returns:
         Callable[[float], float]: Function that normalizes a given float using
         minimum and maximum values of the network and an offset.
     """
-    return normalizer(*minmax(chain.from_iterable(map(
-        lambda xs: starmap(
-            getattr
-            , zip(xs, repeat("energy")
-        ))
-        , (n.compounds, n.reactions)
-    ))))
+    if stats is None:
+        stats = network_stats(n, chem_cfg)
+    return normalizer(*stats.e_range)
+
 
 def network_conc_normalizer(
     nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , stats: NetworkStats | None = None
 ) -> Callable[[float], float]:
     """Given a reaction network, build a concentration normalizer based on the
     maximum and minimum concentration of the compounds in the network.
 
     Args:
         nw (:obj:`Network`): Network for which the normalizer will be built.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical configuration used to
+            retrieve the cached :obj:`NetworkStats`. Defaults to
+            :obj:`ChemCfg`.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network, e.g. from :obj:`sweep_network_stats`.
+            If None, :obj:`network_stats` will be used. Defaults to None.
 
     Returns:
         Callable[[float], float]: Function that normalizes a float using
         minimum and maximum values of the network and an offset
+
+    Raises:
+        :obj:`ValueError`: If no compound of the network has a concentration.
+    """
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
+    c_range: tuple[float, float] | None = stats.c_range
+    if c_range is None:
+        raise ValueError("No concentrations found in the network")
+    return normalizer(*c_range)
+
+
+def network_k_normalizer(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , stats: NetworkStats | None = None
+    , log_scale: bool = False
+) -> Callable[[float], float]:
+    """Given a reaction network, build a normalizer based on the maximum and
+    minimum pseudo kinetic constants of its reactions (see
+    :obj:`calc_pseudo_k_constant`).
+
+    Args:
+        nw (:obj:`Network`): Network for which the normalizer will be built.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the constants. Defaults to :obj:`ChemCfg`.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network, e.g. from :obj:`sweep_network_stats`.
+            If None, :obj:`network_stats` will be used. Defaults to None.
+        log_scale (bool, optional): If True, the normalizer will work with the
+            logarithm of the constants (see :attr:`NetworkStats.log_ks`).
+            Defaults to False.
+
+    Returns:
+        Callable[[float], float]: Function that normalizes a float using
+        minimum and maximum kinetic constants of the network.
+
+    Raises:
+        :obj:`ValueError`: If the network has no reactions.
+    """
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
+    k_range: tuple[float, float] | None = (
+        stats.log_k_range if log_scale else stats.k_range)
+    if k_range is None:
+        raise ValueError("No reactions found in the network")
+    return normalizer(*k_range)
+
+
+def network_rate_normalizer(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , stats: NetworkStats | None = None
+    , log_scale: bool = False
+) -> Callable[[float], float]:
+    """Given a reaction network, build a normalizer based on the maximum and
+    minimum absolute net rates of its reactions (see :obj:`calc_net_rate`).
+
+    Args:
+        nw (:obj:`Network`): Network for which the normalizer will be built.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the rates. Defaults to :obj:`ChemCfg`.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network, e.g. from :obj:`sweep_network_stats`.
+            If None, :obj:`network_stats` will be used. Defaults to None.
+        log_scale (bool, optional): If True, the normalizer will work with the
+            logarithm of the absolute net rates (see
+            :attr:`NetworkStats.log_rates`). Defaults to False.
+
+    Returns:
+        Callable[[float], float]: Function that normalizes an absolute net rate
+        using the minimum and maximum absolute net rates of the network.
+
+    Raises:
+        :obj:`ValueError`: If no net rate could be computed.
+    """
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
+    r_range: tuple[float, float] | None = (
+        stats.log_rate_range if log_scale else stats.rate_range)
+    if r_range is None:
+        raise ValueError("No net rates could be computed for the network")
+    return normalizer(*r_range)
+
+
+def calc_network_stats(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+) -> NetworkStats:
+    """Compute the :obj:`NetworkStats` of a network in a single pass over its
+    compounds and reactions.
+
+    Args:
+        nw (:obj:`Network`): Network to summarize.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants and the net rates. Defaults to
+            :obj:`ChemCfg`.
+
+    Returns:
+        :obj:`NetworkStats` of the network.
+
+    Note:
+        The kinetic constants and the net rates are evaluated with a
+        :obj:`RateEngine` over all the reactions of the network.
+    """
+    def r_range(
+        x: tuple[float, float] | None
+        , v: float
+    ) -> tuple[float, float]:
+        return (v, v) if x is None else (min(x[0], v), max(x[1], v))
+
+    e_ran: tuple[float, float] | None = None
+    c_ran: tuple[float, float] | None = None
+    for c in nw.compounds:
+        e_ran = r_range(e_ran, c.energy)
+        if c.conc is not None:
+            c_ran = r_range(c_ran, c.conc)
+
+    for r in nw.reactions:
+        e_ran = r_range(e_ran, r.energy)
+
+    if e_ran is None:
+        raise ValueError("Cannot compute the statistics of an empty network")
+    return NetworkStats(
+        e_range=e_ran
+        , c_range=c_ran
+        , **_kinetic_stats(
+            build_rate_engine(nw, chem_cfg, nw.reactions), nw))
+
+
+def _kinetic_stats(
+    eng: RateEngine
+    , nw: Network
+) -> dict[str, Any]:
+    """Fields of :obj:`NetworkStats` depending on the kinetic constants."""
+    def opt_minmax(
+        xs: Iterable[float]
+    ) -> tuple[float, float] | None:
+        ys: tuple[float, ...] = tuple(xs)
+        return minmax(ys) if ys else None
+
+    rates: tuple[float | None, ...] = net_rates_or_none(eng, conc_vector(nw))
+    lrs: LogRateSet = eval_log_rates(eng, log_conc_vector(nw))
+    log_rates: tuple[float | None, ...] = tuple(
+        None if not e or isnan(x) else x
+        for e, x in zip(eng.elementary, lrs.net))
+    return {
+        "k_range": opt_minmax(eng.kt.kf)
+        , "rate_range": opt_minmax(abs(x) for x in rates if x is not None)
+        , "ks": tuple(eng.kt.kf)
+        , "rates": rates
+        , "log_k_range": opt_minmax(eng.kt.lkf)
+        , "log_rate_range": opt_minmax(
+            x for x in log_rates if x is not None and isfinite(x))
+        , "log_ks": tuple(eng.kt.lkf)
+        , "log_rates": log_rates
+        , "rate_signs": tuple(
+            0 if x is None else sg for x, sg in zip(log_rates, lrs.sign))}
+
+
+@lru_cache(maxsize=8)
+def _cached_network_stats(
+    nw: Network
+    , chem_cfg: ChemCfg
+) -> NetworkStats:
+    return calc_network_stats(nw, chem_cfg)
+
+
+def network_stats(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+) -> NetworkStats:
+    """Cached version of :obj:`calc_network_stats`. The normalizers and the
+    colorbars of the plotters read from this function, so the network is
+    scanned only once per plot.
+
+    Args:
+        nw (:obj:`Network`): Network to summarize.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants and the net rates. Defaults to
+            :obj:`ChemCfg`.
+
+    Returns:
+        :obj:`NetworkStats` of the network.
+
+    Note:
+        Only networks storing their compounds and reactions as tuples, the
+        output of the parser, are cached. Other networks are computed at each
+        call.
+    """
+    if isinstance(nw.compounds, tuple) and isinstance(nw.reactions, tuple):
+        return _cached_network_stats(nw, chem_cfg)
+    return calc_network_stats(nw, chem_cfg)
+
+
+class KSweep(NamedTuple):
+    """Pseudo kinetic constants of the reactions of a network over a set of
+    temperatures. The matrices have a row per reaction, following the order
+    of :attr:`Network.reactions`, and a column per temperature.
+
+    Attributes:
+        engine (:obj:`RateEngine`): Engine over all the reactions of the
+            network, built with the first configuration.
+        cfgs (tuple of :obj:`ChemCfg`): Chemical configuration of each
+            temperature, with its pre-exponential factor.
+        kf (tuple of array of float): Forward pseudo kinetic constants.
+        kr (tuple of array of float): Reverse pseudo kinetic constants.
+        k_norms (tuple of array of float): Forward constants normalized
+            between 0 and 1 at each temperature, as used for the edge widths
+            of the thermodynamic plot (see :obj:`network_k_normalizer`).
+        log_scale (bool): If True, :attr:`kf` and :attr:`kr` store the natural
+            logarithm of the constants and :attr:`k_norms` are normalized on
+            the logarithms.
     """
-    def f_none[T](xs: Iterable[T | None]) -> Iterable[T]:
-        return (x for x in xs if x is not None)
+    engine: RateEngine
+    cfgs: tuple[ChemCfg, ...]
+    kf: tuple[array, ...]
+    kr: tuple[array, ...]
+    k_norms: tuple[array, ...]
+    log_scale: bool = False
+
+
+def _k_matrix(
+    eas: Sequence[float] | Sequence[Sequence[float]]
+    , cfgs: Sequence[ChemCfg]
+    , log_scale: bool = False
+) -> tuple[array, ...]:
+    """Pseudo kinetic constants, or their logarithms, of each activation
+    energy at each configuration. Each activation energy is either a float
+    or a sequence with its value at each configuration."""
+    if np is not None:
+        ea = np.asarray(eas, dtype=float)
+        ea = ea[:, None] if ea.ndim == 1 else ea
+        a = np.array([c.A for c in cfgs])
+        kbt = np.array([c.kb * c.T for c in cfgs])
+        with np.errstate(over="ignore"):
+            m = np.log(a) - ea / kbt if log_scale else a * np.exp(-ea / kbt)
+        return tuple(array('d', row.tobytes()) for row in m)
+
+    def per_cfg(ea: float | Sequence[float]) -> Iterable[float]:
+        return repeat(ea) if isinstance(ea, (int, float)) else ea
+
+    if log_scale:
+        l_coefs: tuple[tuple[float, float], ...] = tuple(
+            (log(c.A), c.kb * c.T) for c in cfgs)
+        return tuple(
+            array('d', [
+                la - e / kbt for (la, kbt), e in zip(l_coefs, per_cfg(ea))])
+            for ea in eas)
+    coefs: tuple[tuple[float, float], ...] = tuple(
+        (c.A, c.kb * c.T) for c in cfgs)
+    return tuple(
+        array('d', [
+            a * _exp_or_inf(-e / kbt)
+            for (a, kbt), e in zip(coefs, per_cfg(ea))])
+        for ea in eas)
+
+
+def _norm_columns(
+    m: Sequence[array]
+) -> tuple[array, ...]:
+    """Normalize each column of a matrix between 0 and 1 (see
+    :obj:`normalizer`)."""
+    ranges: list[tuple[float, float]] = [minmax(col) for col in zip(*m)]
+    return tuple(
+        array('d', [
+            (x - lo) / (hi - lo) if hi != lo else 0.
+            for x, (lo, hi) in zip(row, ranges)])
+        for row in m)
+
+
+def build_chemcfgs(
+    Ts: Iterable[float]
+    , e_units: str = "eV"
+    , kb: float | None = None
+    , h: float | None = None
+    , A: float | None = None
+) -> tuple[ChemCfg, ...]:
+    """Build the chemical configuration of each temperature of a sweep,
+    computing the pre-exponential factor of each temperature if it is not
+    given.
+
+    Args:
+        Ts (iterable of float): Temperatures in Kelvin.
+        e_units (str, optional): Energy units. Defaults to "eV".
+        kb (float or None, optional): Boltzmann constant. If None, its value
+            will be searched at :obj:`CONSTANTS`. Defaults to None.
+        h (float or None, optional): Planck constant, used to compute the
+            pre-exponential factor at each temperature when A is None. If
+            None, its value will be searched at :obj:`CONSTANTS`. Defaults to
+            None.
+        A (float or None, optional): Constant pre-exponential factor. If None,
+            it will be computed at each temperature with :obj:`calc_A`.
+            Defaults to None.
+
+    Returns:
+        tuple of :obj:`ChemCfg`, one per temperature.
+
+    Raises:
+        :obj:`NotImplementedError`: If a constant is not provided and is not
+            found in :obj:`CONSTANTS` for the given units.
+    """
+    if kb is None:
+        if e_units not in CONSTANTS["kb"]:
+            raise NotImplementedError(f"kb not implemented for {e_units}")
+        kb = CONSTANTS["kb"][e_units]
+    if A is not None:
+        return tuple(ChemCfg(T=T, e_units=e_units, kb=kb, A=A) for T in Ts)
+    if h is None:
+        if e_units not in CONSTANTS["h"]:
+            raise NotImplementedError(f"h not implemented for {e_units}")
+        h = CONSTANTS["h"][e_units]
+    return tuple(
+        ChemCfg(T=T, e_units=e_units, kb=kb, A=calc_A(T, kb, h))
+        for T in Ts)
+
+
+def calc_k_sweep(
+    nw: Network
+    , Ts: Iterable[float]
+    , e_units: str = "eV"
+    , kb: float | None = None
+    , h: float | None = None
+    , A: float | None = None
+    , log_scale: bool = False
+) -> KSweep:
+    """Compute the pseudo kinetic constants of all the reactions of a network
+    over multiple temperatures. The activation energies are computed once and
+    the pre-exponential factor of each temperature is computed in the same
+    pass (see :obj:`build_chemcfgs`).
+
+    Args:
+        nw (:obj:`Network`): Network with the reactions.
+        Ts (iterable of float): Temperatures in Kelvin.
+        e_units (str, optional): Energy units. Defaults to "eV".
+        kb (float or None, optional): Boltzmann constant. If None, its value
+            will be searched at :obj:`CONSTANTS`. Defaults to None.
+        h (float or None, optional): Planck constant, used to compute the
+            pre-exponential factor at each temperature when A is None. If
+            None, its value will be searched at :obj:`CONSTANTS`. Defaults to
+            None.
+        A (float or None, optional): Constant pre-exponential factor. If None,
+            it will be computed at each temperature with :obj:`calc_A`.
+            Defaults to None.
+        log_scale (bool, optional): If True, compute the logarithm of the
+            constants instead, avoiding the evaluation of an exponential per
+            element (see :obj:`calc_log_pseudo_k_constant`). Defaults to
+            False.
+
+    Returns:
+        :obj:`KSweep` with the constants of each reaction and temperature.
+
+    Note:
+        If the network has free energy polynomials (see
+        :attr:`Compound.g_coefs`), the activation energies are evaluated at
+        each temperature with :obj:`free_energies`, in a single pass over all
+        the compounds and transition states.
+
+    Raises:
+        :obj:`ValueError`: If no temperature is given or the network has no
+            reactions.
+        :obj:`NotImplementedError`: If a constant is not provided and is not
+            found in :obj:`CONSTANTS` for the given units.
+    """
+    cfgs: tuple[ChemCfg, ...] = build_chemcfgs(Ts, e_units, kb, h, A)
+    if not cfgs or not nw.reactions:
+        raise ValueError("At least one temperature and reaction are required")
+
+    eng: RateEngine = build_rate_engine(nw, cfgs[0], nw.reactions)
+    ts: tuple[tuple[array, ...], tuple[array, ...]] | None = None
+    if any(x.g_coefs is not None for x in chain(nw.compounds, nw.reactions)):
+        ts = free_energies(build_thermo_table(nw), (c.T for c in cfgs))
+
+    def side_energies(ptr: array, idx: array) -> tuple[Any, ...]:
+        if ts is not None:
+            return tuple(_side_energy_rows(*ts, ptr, idx))
+        return tuple(_side_energies(
+            eng.kt.c_energies, eng.kt.r_energies, ptr, idx))
+
+    kf: tuple[array, ...] = _k_matrix(
+        side_energies(eng.l_ptr, eng.l_idx), cfgs, log_scale)
+    kr: tuple[array, ...] = _k_matrix(
+        side_energies(eng.r_ptr, eng.r_idx), cfgs, log_scale)
+    return KSweep(
+        engine=eng
+        , cfgs=cfgs
+        , kf=kf
+        , kr=kr
+        , k_norms=_norm_columns(kf)
+        , log_scale=log_scale)
+
+
+def sweep_network_stats(
+    nw: Network
+    , sw: KSweep
+    , i: int
+) -> NetworkStats:
+    """Build the :obj:`NetworkStats` of a network at one of the temperatures
+    of a sweep, without recomputing the kinetic constants. The result can be
+    passed to the plotters to draw a graph per temperature.
 
-    return normalizer(*minmax(starmap(
-            getattr
-            , zip(f_none(nw.compounds), repeat("conc")))))
+    Args:
+        nw (:obj:`Network`): Network used to compute the sweep.
+        sw (:obj:`KSweep`): Sweep of the network.
+        i (int): Position of the temperature in :attr:`KSweep.cfgs`.
+
+    Returns:
+        :obj:`NetworkStats` of the network at the i-th temperature.
+    """
+    def log_or_inf(x: float) -> float:
+        return log(x) if x > 0. else -inf
+
+    kf: array = array('d', (row[i] for row in sw.kf))
+    kr: array = array('d', (row[i] for row in sw.kr))
+    kt: KTable
+    if sw.log_scale:
+        kt = sw.engine.kt._replace(
+            chem_cfg=sw.cfgs[i]
+            , kf=array('d', (_exp_or_inf(x) for x in kf))
+            , kr=array('d', (_exp_or_inf(x) for x in kr))
+            , lkf=kf
+            , lkr=kr)
+    else:
+        kt = sw.engine.kt._replace(
+            chem_cfg=sw.cfgs[i]
+            , kf=kf
+            , kr=kr
+            , lkf=array('d', map(log_or_inf, kf))
+            , lkr=array('d', map(log_or_inf, kr)))
+    return network_stats(nw, sw.cfgs[0])._replace(
+        **_kinetic_stats(sw.engine._replace(kt=kt), nw))
+
+
+class ThermoTable(NamedTuple):
+    """Free energy polynomials of the compounds and transition states of a
+    network, stored by degree so the energies of all of them are evaluated
+    together at each temperature. Elements without polynomial keep their
+    energy at every temperature.
+
+    Attributes:
+        c_coefs (tuple of array of float): Coefficient of each degree of the
+            compounds, following the order of :attr:`Network.compounds`.
+        r_coefs (tuple of array of float): Coefficient of each degree of the
+            transition states of the reactions of the table.
+        reactions (tuple of :obj:`Reaction`): Reactions of the table.
+    """
+    c_coefs: tuple[array, ...]
+    r_coefs: tuple[array, ...]
+    reactions: tuple[Reaction, ...]
+
+
+def _coef_columns(
+    xs: Sequence[Compound | Reaction]
+) -> tuple[array, ...]:
+    polys: list[tuple[float, ...]] = [
+        (x.energy,) if x.g_coefs is None else x.g_coefs for x in xs]
+    deg: int = max(map(len, polys), default=1)
+    return tuple(
+        array('d', (p[d] if d < len(p) else 0. for p in polys))
+        for d in range(deg))
+
+
+def build_thermo_table(
+    nw: Network
+    , rs: Sequence[Reaction] | None = None
+) -> ThermoTable:
+    """Build the :obj:`ThermoTable` of a network.
+
+    Args:
+        nw (:obj:`Network`): Network with the free energy polynomials (see
+            :attr:`Compound.g_coefs`).
+        rs (sequence of :obj:`Reaction` or None, optional): Reactions of the
+            table, e.g. the reactions of a :obj:`RateEngine`. If None,
+            :attr:`Network.reactions` will be used. Defaults to None.
+
+    Returns:
+        :obj:`ThermoTable` of the network.
+    """
+    rs = tuple(nw.reactions if rs is None else rs)
+    return ThermoTable(
+        c_coefs=_coef_columns(nw.compounds)
+        , r_coefs=_coef_columns(rs)
+        , reactions=rs)
+
+
+def _eval_columns(
+    coefs: Sequence[array]
+    , Ts: Sequence[float]
+) -> tuple[array, ...]:
+    """Evaluate the polynomials stored by degree at each temperature, with a
+    row per polynomial and a column per temperature."""
+    if np is not None:
+        c = np.array(coefs, dtype=float).reshape(len(coefs), -1)
+        powers = np.vander(np.asarray(Ts, dtype=float), len(coefs), True)
+        return tuple(array('d', row.tobytes()) for row in c.T @ powers.T)
+    cols: list[list[float]] = [
+        [reduce(lambda acc, a: acc * T + a, reversed(ps), 0.) for T in Ts]
+        for ps in zip(*coefs)]
+    return tuple(array('d', col) for col in cols)
+
+
+def free_energies(
+    tt: ThermoTable
+    , Ts: Iterable[float]
+) -> tuple[tuple[array, ...], tuple[array, ...]]:
+    """Evaluate the free energies of all the compounds and transition states
+    of a table over multiple temperatures, as a matrix product with the
+    powers of the temperatures when NumPy is available.
+
+    Args:
+        tt (:obj:`ThermoTable`): Table with the polynomials.
+        Ts (iterable of float): Temperatures in Kelvin.
+
+    Returns:
+        tuple of the form (compounds, reactions), each one a matrix with a
+        row per compound or reaction and a column per temperature.
+    """
+    ts: tuple[float, ...] = tuple(Ts)
+    return (_eval_columns(tt.c_coefs, ts), _eval_columns(tt.r_coefs, ts))
+
+
+def thermo_network(
+    nw: Network
+    , T: float
+    , tt: ThermoTable | None = None
+) -> Network:
+    """Set the energies of a network to their free energies at a temperature,
+    e.g. to draw one frame of a temperature sweep.
+
+    Args:
+        nw (:obj:`Network`): Network with the free energy polynomials.
+        T (float): Temperature in Kelvin.
+        tt (:obj:`ThermoTable` or None, optional): Table of the network,
+            built once for all the temperatures. If None, it will be built.
+            Defaults to None.
+
+    Returns:
+        :obj:`Network` with the energies at T, the reactions referencing its
+        compounds.
+    """
+    tt = build_thermo_table(nw) if tt is None else tt
+    c_es, r_es = free_energies(tt, (T,))
+    cs: tuple[Compound, ...] = tuple(
+        c._replace(energy=e[0]) for c, e in zip(nw.compounds, c_es))
+    return Network(
+        compounds=cs
+        , reactions=relink_reactions(
+            (r._replace(energy=e[0]) for r, e in zip(tt.reactions, r_es))
+            , cs))
+
+
+def _side_energy_rows(
+    c_es: Sequence[array]
+    , r_es: Sequence[array]
+    , ptr: array
+    , idx: array
+) -> Iterator[array]:
+    """Activation energy of each reaction at each temperature, see
+    :obj:`_side_energies`."""
+    for j, row in enumerate(r_es):
+        out: array = array('d', row)
+        for i in idx[ptr[j]:ptr[j + 1]]:
+            for t, e in enumerate(c_es[i]):
+                out[t] -= e
+        yield out
+
+
+class CatalyticCycle(NamedTuple):
+    """Closed sequence of reactions regenerating its first intermediate.
+
+    Attributes:
+        intermediates (tuple of :obj:`Compound`): Intermediate consumed by
+            each step, the i-th step converting the i-th intermediate into
+            the next one and the last step regenerating the first one.
+        steps (tuple of :obj:`Reaction`): Reactions of the cycle, in the
+            direction in which the cycle runs.
+        reactants (tuple of :obj:`Compound`): Compounds consumed by a
+            turnover, with repetitions for their stoichiometry.
+        products (tuple of :obj:`Compound`): Compounds produced by a
+            turnover, with repetitions for their stoichiometry.
+    """
+    intermediates: tuple[Compound, ...]
+    steps: tuple[Reaction, ...]
+    reactants: tuple[Compound, ...]
+    products: tuple[Compound, ...]
+
+
+class EnergeticSpan(NamedTuple):
+    """Energetic span model of a catalytic cycle (Kozuch and Shaik).
+
+    Attributes:
+        cycle (:obj:`CatalyticCycle`): Analyzed cycle.
+        span (float): Energetic span of the cycle.
+        tdts (int): Position in :attr:`CatalyticCycle.steps` of the TOF
+            determining transition state.
+        tdi (int): Position in :attr:`CatalyticCycle.intermediates` of the
+            TOF determining intermediate.
+        reaction_energy (float): Energy of a turnover of the cycle.
+        tof (float): Turnover frequency of the cycle, in the units of the
+            pre-exponential factor. Negative for endergonic cycles.
+        x_ts (tuple of float): Degree of TOF control of the transition state
+            of each step.
+        x_int (tuple of float): Degree of TOF control of each intermediate.
+    """
+    cycle: CatalyticCycle
+    span: float
+    tdts: int
+    tdi: int
+    reaction_energy: float
+    tof: float
+    x_ts: tuple[float, ...]
+    x_int: tuple[float, ...]
+
+
+def _build_cycle(
+    nodes: Sequence[Compound]
+    , steps: Sequence[Reaction]
+) -> CatalyticCycle | None:
+    """Build the cycle of a closed path of the intermediate graph, or None if
+    a turnover does not transform anything."""
+    consumed: Counter[int] = Counter()
+    produced: Counter[int] = Counter()
+    comps: dict[int, Compound] = {}
+    for k, r in enumerate(steps):
+        lc: Counter[int] = Counter(c.idx for c in r.compounds[0])
+        rc: Counter[int] = Counter(c.idx for c in r.compounds[1])
+        lc[nodes[k].idx] -= 1
+        rc[nodes[(k + 1) % len(nodes)].idx] -= 1
+        consumed.update(lc)
+        produced.update(rc)
+        comps.update((c.idx, c) for c in chain(*r.compounds))
+    common: Counter[int] = consumed & produced
+    consumed -= common
+    produced -= common
+    if not consumed and not produced:
+        return None
+    return CatalyticCycle(
+        intermediates=tuple(nodes)
+        , steps=tuple(steps)
+        , reactants=tuple(comps[i] for i in consumed.elements())
+        , products=tuple(comps[i] for i in produced.elements()))
+
+
+def find_catalytic_cycles(
+    nw: Network
+    , max_length: int = 8
+) -> Iterator[CatalyticCycle]:
+    """Find the catalytic cycles of a network.
+
+    The compounds are connected by each reaction from every compound of its
+    left side to every other compound of its right side, and each simple
+    cycle of that graph is a candidate, the rest of the compounds of each
+    step being the reactants or products exchanged with the medium. Cycles
+    whose turnover does not transform anything, like a reaction followed by
+    its reverse, are discarded. Each cycle is reported once, starting at its
+    intermediate with the lowest index, and cycles running in opposite
+    directions are reported separately.
+
+    Args:
+        nw (:obj:`Network`): Network to search. Only the directions present
+            in :attr:`Network.reactions` are followed.
+        max_length (int, optional): Largest number of steps of a cycle. The
+            number of simple cycles may grow exponentially with it. Defaults
+            to 8.
+
+    Yields:
+        :obj:`CatalyticCycle` found in the network.
+    """
+    adj: dict[int, list[tuple[int, Reaction]]] = {}
+    comps: dict[int, Compound] = {}
+    for r in nw.reactions:
+        rights: dict[int, Compound] = {c.idx: c for c in r.compounds[1]}
+        comps.update(rights)
+        for c in {c.idx: c for c in r.compounds[0]}.values():
+            comps[c.idx] = c
+            adj.setdefault(c.idx, []).extend(
+                (y, r) for y in rights if y != c.idx)
+
+    for s in sorted(adj):
+        nodes: list[Compound] = [comps[s]]
+        steps: list[Reaction] = []
+        stack: list[Iterator[tuple[int, Reaction]]] = [iter(adj[s])]
+        while stack:
+            for y, r in stack[-1]:
+                if y == s:
+                    cycle: CatalyticCycle | None = _build_cycle(
+                        nodes, steps + [r])
+                    if cycle is not None:
+                        yield cycle
+                elif (y > s and len(nodes) < max_length
+                      and all(c.idx != y for c in nodes)):
+                    nodes.append(comps[y])
+                    steps.append(r)
+                    stack.append(iter(adj.get(y, ())))
+                    break
+            else:
+                stack.pop()
+                nodes.pop()
+                if steps:
+                    steps.pop()
+
+
+def cycle_profile(
+    cycle: CatalyticCycle
+) -> tuple[array, array, float]:
+    """Energy profile of a catalytic cycle. The reactants of each step are
+    taken from the medium and its products are released to it, so the energy
+    of the exchanged compounds accumulates along the cycle.
+
+    Args:
+        cycle (:obj:`CatalyticCycle`): Cycle to profile.
+
+    Returns:
+        tuple of the form (intermediates, transition states, reaction energy),
+        with an array with the energy of each intermediate, another with the
+        energy of the transition state of each step, both relative to the
+        first turnover, and the energy of a turnover.
+    """
+    n: int = len(cycle.steps)
+    i_es: array = array('d', bytes(8 * n))
+    t_es: array = array('d', bytes(8 * n))
+    offset: float = 0.
+    for k, r in enumerate(cycle.steps):
+        e_in: float = cycle.intermediates[k].energy
+        e_out: float = cycle.intermediates[(k + 1) % n].energy
+        taken: float = sum(c.energy for c in r.compounds[0]) - e_in
+        i_es[k] = e_in + offset
+        t_es[k] = r.energy - taken + offset
+        offset += sum(c.energy for c in r.compounds[1]) - e_out - taken
+    return (i_es, t_es, offset)
+
+
+def _log_add_exp(
+    a: float
+    , b: float
+) -> float:
+    """Logarithm of exp(a) + exp(b)."""
+    if a == -inf:
+        return b
+    return max(a, b) + log1p(exp(-abs(a - b)))
+
+
+def _log_cumsum(
+    xs: Iterable[float]
+) -> list[float]:
+    """Logarithm of the cumulative sums of the exponentials of xs, with the
+    empty sum first."""
+    out: list[float] = [-inf]
+    for x in xs:
+        out.append(_log_add_exp(out[-1], x))
+    return out
+
+
+def energetic_span(
+    cycle: CatalyticCycle
+    , chem_cfg: ChemCfg = ChemCfg()
+) -> EnergeticSpan:
+    """Apply the energetic span model to a catalytic cycle.
+
+    Each pair of a transition state and an intermediate spans the energy
+    between them, adding the reaction energy when the transition state comes
+    before the intermediate, i.e. in the next turnover. The energetic span is
+    the largest one, found with the prefix minima of the intermediates
+    before each transition state and the suffix minima after it, and the
+    degrees of TOF control follow from the prefix sums of the Boltzmann
+    factors, so the cost is linear in the length of the cycle instead of
+    quadratic.
+
+    Args:
+        cycle (:obj:`CatalyticCycle`): Cycle to analyze (see
+            :obj:`find_catalytic_cycles`).
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical configuration used for
+            the TOF. Defaults to :obj:`ChemCfg`.
+
+    Returns:
+        :obj:`EnergeticSpan` of the cycle.
+    """
+    i_es, t_es, dg = cycle_profile(cycle)
+    n: int = len(t_es)
+    kbt: float = chem_cfg.kb * chem_cfg.T
+
+    # Lowest intermediate up to each step and after it
+    lo_pre: list[int] = [0] * n
+    lo_suf: list[int | None] = [None] * (n + 1)
+    for k in range(1, n):
+        lo_pre[k] = k if i_es[k] < i_es[lo_pre[k - 1]] else lo_pre[k - 1]
+    for k in range(n - 1, -1, -1):
+        after: int | None = lo_suf[k + 1]
+        lo_suf[k] = k if after is None or i_es[k] <= i_es[after] else after
+
+    span: float = -inf
+    tdts: int = 0
+    tdi: int = 0
+    for k, t in enumerate(t_es):
+        if t - i_es[lo_pre[k]] > span:
+            span, tdts, tdi = t - i_es[lo_pre[k]], k, lo_pre[k]
+        after = lo_suf[k + 1]
+        if after is not None and t + dg - i_es[after] > span:
+            span, tdts, tdi = t + dg - i_es[after], k, after
+
+    g: float = dg / kbt
+    li: list[float] = [-e / kbt for e in i_es]
+    lt: list[float] = [e / kbt for e in t_es]
+    li_pre: list[float] = _log_cumsum(li)
+    li_suf: list[float] = _log_cumsum(reversed(li))[::-1]
+    lt_pre: list[float] = _log_cumsum(lt)
+    lt_suf: list[float] = _log_cumsum(reversed(lt))[::-1]
+    l_ts: list[float] = [
+        lt[k] + _log_add_exp(li_pre[k + 1], g + li_suf[k + 1])
+        for k in range(n)]
+    l_int: list[float] = [
+        li[k] + _log_add_exp(lt_suf[k], g + lt_pre[k])
+        for k in range(n)]
+    lz: float = reduce(_log_add_exp, l_ts, -inf)
+
+    tof: float
+    if dg < 0.:
+        tof = chem_cfg.A * _exp_or_inf(log(-expm1(g)) - lz)
+    elif dg > 0.:
+        tof = -chem_cfg.A * _exp_or_inf(log(expm1(g)) - lz)
+    else:
+        tof = 0.
+    return EnergeticSpan(
+        cycle=cycle
+        , span=span
+        , tdts=tdts
+        , tdi=tdi
+        , reaction_energy=dg
+        , tof=tof
+        , x_ts=tuple(exp(x - lz) for x in l_ts)
+        , x_int=tuple(exp(x - lz) for x in l_int))
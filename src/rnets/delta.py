@@ -0,0 +1,486 @@
+# -*- coding: utf-8 -*-
+"""Differences between two reaction networks. A :obj:`NetworkDelta` stores
+only what changed between two networks (added or removed elements, changed
+energies or concentrations and visibility flips) keyed by the idx of the
+elements, so it can be applied to the original network, composed with other
+deltas or serialized in a few bytes.
+
+Compounds are keyed by their idx. As bidirectional reactions share the same
+idx, reactions are keyed by a tuple of the form (idx, left, right, ordinal),
+where left and right are the idx of the compounds of each side and the
+ordinal is the position of the reaction among the identical ones. Removing a
+reaction thus never changes the keys of the other ones.
+
+Attributes:
+    RKey (type): Type synonym for the reaction keys.
+    C_FIELDS (tuple of str): Compound fields tracked as updates.
+    R_FIELDS (tuple of str): Reaction fields tracked as updates.
+"""
+
+import json
+from collections.abc import Iterable, Sequence
+from itertools import chain
+from typing import Any, NamedTuple
+
+from .struct import (
+    Compound
+    , FFlags
+    , Network
+    , Reaction
+    , Visibility
+    , relink_reactions
+)
+
+
+type RKey = tuple[int, tuple[int, ...], tuple[int, ...], int]
+
+C_FIELDS: tuple[str, ...] = ("energy", "conc", "visible")
+R_FIELDS: tuple[str, ...] = ("energy", "visible")
+
+
+class ReactionRecord(NamedTuple):
+    """Flat version of a :obj:`Reaction`, in which the compounds are
+    referenced by their idx.
+
+    Attributes:
+        name (str): Reaction name.
+        compounds (tuple of the form ([int], [int])): idx of the compounds of
+            the reaction, with left->right direction.
+        energy (float): Energy of the reaction.
+        idx (int): Reaction index, in reading order.
+        opts (dict of str as keys and str as values or None, optional):
+            Additional options for the reaction. Defaults to None.
+        visible (obj:`Visible`, optional): Visibility of the
+            reaction. Defaults to :obj:`Visible.TRUE`.
+        g_coefs (tuple of float or None, optional): Coefficients of the free
+            energy polynomial of the transition state, see
+            :attr:`Reaction.g_coefs`. Defaults to None.
+    """
+    name: str
+    compounds: tuple[tuple[int, ...], tuple[int, ...]]
+    energy: float
+    idx: int
+    opts: dict[str, str] | None = None
+    visible: Visibility = Visibility.TRUE
+    g_coefs: tuple[float, ...] | None = None
+
+
+class NetworkDelta(NamedTuple):
+    """Changes between two networks.
+
+    Attributes:
+        c_del (tuple of int): idx of the removed compounds.
+        c_add (tuple of :obj:`Compound`): Added compounds.
+        c_energy (tuple of (int, float)): New energies of the compounds.
+        c_conc (tuple of (int, float or None)): New concentrations of the
+            compounds.
+        c_visible (tuple of (int, :obj:`Visibility`)): New visibility of the
+            compounds.
+        r_del (tuple of :obj:`RKey`): Keys of the removed reactions.
+        r_add (tuple of (:obj:`RKey`, :obj:`ReactionRecord`)): Added
+            reactions.
+        r_energy (tuple of (:obj:`RKey`, float)): New energies of the
+            reactions.
+        r_visible (tuple of (:obj:`RKey`, :obj:`Visibility`)): New visibility
+            of the reactions.
+
+    Note:
+        When applied, removals are processed first, then additions and
+        finally the updates. Any change of a compound or a reaction that is
+        not tracked as an update (e.g. its name or its options) is stored as a
+        removal followed by an addition of the element.
+    """
+    c_del: tuple[int, ...] = ()
+    c_add: tuple[Compound, ...] = ()
+    c_energy: tuple[tuple[int, float], ...] = ()
+    c_conc: tuple[tuple[int, float | None], ...] = ()
+    c_visible: tuple[tuple[int, Visibility], ...] = ()
+    r_del: tuple[RKey, ...] = ()
+    r_add: tuple[tuple[RKey, ReactionRecord], ...] = ()
+    r_energy: tuple[tuple[RKey, float], ...] = ()
+    r_visible: tuple[tuple[RKey, Visibility], ...] = ()
+
+    def __bool__(self): return any(self)
+
+
+def reaction_keys(
+    rs: Iterable[Reaction]
+) -> tuple[RKey, ...]:
+    """Compute the key of each reaction.
+
+    Args:
+        rs (iterable of :obj:`Reaction`): Reactions, in network order.
+
+    Returns:
+        tuple of :obj:`RKey` preserving the order of the reactions.
+    """
+    seen: dict[tuple[int, tuple[int, ...], tuple[int, ...]], int] = {}
+
+    def key(r: Reaction) -> RKey:
+        k: tuple[int, tuple[int, ...], tuple[int, ...]] = (
+            r.idx
+            , tuple(c.idx for c in r.compounds[0])
+            , tuple(c.idx for c in r.compounds[1]))
+        o: int = seen.get(k, 0)
+        seen[k] = o + 1
+        return (*k, o)
+
+    return tuple(map(key, rs))
+
+
+def reaction_to_record(
+    r: Reaction
+) -> ReactionRecord:
+    """Convert a :obj:`Reaction` into a :obj:`ReactionRecord`.
+
+    Args:
+        r (:obj:`Reaction`): Reaction to convert.
+
+    Returns:
+        :obj:`ReactionRecord` with the compounds replaced by their idx.
+    """
+    return ReactionRecord(
+        name=r.name
+        , compounds=(
+            tuple(c.idx for c in r.compounds[0])
+            , tuple(c.idx for c in r.compounds[1]))
+        , energy=r.energy
+        , idx=r.idx
+        , opts=r.opts
+        , visible=r.visible
+        , g_coefs=r.g_coefs)
+
+
+def record_to_reaction(
+    r: ReactionRecord
+    , cs: dict[int, Compound]
+) -> Reaction:
+    """Convert a :obj:`ReactionRecord` into a :obj:`Reaction`.
+
+    Args:
+        r (:obj:`ReactionRecord`): Record to convert.
+        cs (dict of int as keys and :obj:`Compound` as values): Compounds
+            indexed by their idx.
+
+    Returns:
+        :obj:`Reaction` referencing the compounds in cs.
+
+    Raises:
+        :obj:`ValueError`: If a compound idx of the record is not in cs.
+    """
+    try:
+        return Reaction(
+            name=r.name
+            , compounds=(
+                tuple(cs[i] for i in r.compounds[0])
+                , tuple(cs[i] for i in r.compounds[1]))
+            , energy=r.energy
+            , idx=r.idx
+            , opts=r.opts
+            , visible=r.visible
+            , g_coefs=r.g_coefs)
+    except KeyError as e:
+        raise ValueError(
+            f"Compound with idx {e.args[0]} of reaction {r.name} not found"
+        ) from None
+
+
+def _diff[K, V: (Compound, ReactionRecord)](
+    old: dict[K, V]
+    , new: dict[K, V]
+    , fields: Sequence[str]
+) -> tuple[list[K], list[K], dict[str, list[tuple[K, Any]]]]:
+    """Diff two keyed dictionaries of structures.
+
+    Returns:
+        A tuple containing the removed keys, the added keys and, for each
+        field, the keys and values of the updates.
+    """
+    rem: list[K] = [k for k in old if k not in new]
+    add: list[K] = []
+    upd: dict[str, list[tuple[K, Any]]] = {f: [] for f in fields}
+    for k, v in new.items():
+        o: V | None = old.get(k)
+        if o is None:
+            add.append(k)
+            continue
+        if o == v:
+            continue
+        ch: dict[str, Any] = {
+            f: getattr(v, f) for f in fields if getattr(o, f) != getattr(v, f)
+        }
+        if o._replace(**ch) != v:
+            rem.append(k)
+            add.append(k)
+            continue
+        for f, x in ch.items():
+            upd[f].append((k, x))
+    return (rem, add, upd)
+
+
+def compute_delta(
+    old: Network
+    , new: Network
+) -> NetworkDelta:
+    """Compute the changes needed to transform a network into another.
+
+    Args:
+        old (:obj:`Network`): Initial network.
+        new (:obj:`Network`): Final network.
+
+    Returns:
+        :obj:`NetworkDelta` that transforms old into new when applied with
+        :obj:`apply_delta`.
+
+    Note:
+        Reactions are compared through their :obj:`ReactionRecord`, so a
+        change in the energy of a compound does not mark the reactions in
+        which it participates as changed.
+    """
+    oc: dict[int, Compound] = {c.idx: c for c in old.compounds}
+    nc: dict[int, Compound] = {c.idx: c for c in new.compounds}
+    c_rem, c_add, c_upd = _diff(oc, nc, C_FIELDS)
+
+    orr: dict[RKey, ReactionRecord] = dict(zip(
+        reaction_keys(old.reactions), map(reaction_to_record, old.reactions)))
+    nr: dict[RKey, ReactionRecord] = dict(zip(
+        reaction_keys(new.reactions), map(reaction_to_record, new.reactions)))
+    r_rem, r_add, r_upd = _diff(orr, nr, R_FIELDS)
+
+    return NetworkDelta(
+        c_del=tuple(c_rem)
+        , c_add=tuple(nc[k] for k in c_add)
+        , c_energy=tuple(c_upd["energy"])
+        , c_conc=tuple(c_upd["conc"])
+        , c_visible=tuple(c_upd["visible"])
+        , r_del=tuple(r_rem)
+        , r_add=tuple((k, nr[k]) for k in r_add)
+        , r_energy=tuple(r_upd["energy"])
+        , r_visible=tuple(r_upd["visible"]))
+
+
+def _updates[K](
+    **kw: Iterable[tuple[K, Any]]
+) -> dict[K, dict[str, Any]]:
+    """Group field updates by key."""
+    out: dict[K, dict[str, Any]] = {}
+    for f, xs in kw.items():
+        for k, v in xs:
+            out.setdefault(k, {})[f] = v
+    return out
+
+
+def apply_delta(
+    nw: Network
+    , d: NetworkDelta
+) -> Network:
+    """Apply a delta to a network.
+
+    Args:
+        nw (:obj:`Network`): Network to update.
+        d (:obj:`NetworkDelta`): Changes to apply.
+
+    Returns:
+        :obj:`Network` with the changes applied. Compounds are sorted by idx
+        and reactions by idx, the added reactions preceding the kept ones of
+        their idx. The reactions reference the updated compounds.
+
+    Raises:
+        :obj:`ValueError`: If a reaction references a compound that is not
+            present after applying the delta.
+    """
+    if not d:
+        return nw
+    c_upd: dict[int, dict[str, Any]] = _updates(
+        energy=d.c_energy, conc=d.c_conc, visible=d.c_visible)
+    c_del: set[int] = set(d.c_del)
+    cs: list[Compound] = [
+        c._replace(**c_upd[c.idx]) if c.idx in c_upd else c
+        for c in chain(
+            (c for c in nw.compounds if c.idx not in c_del)
+            , d.c_add)
+    ]
+    cs.sort(key=lambda c: c.idx)
+    c_map: dict[int, Compound] = {c.idx: c for c in cs}
+
+    r_upd: dict[RKey, dict[str, Any]] = _updates(
+        energy=d.r_energy, visible=d.r_visible)
+    r_del: set[RKey] = set(d.r_del)
+    c_changed: bool = bool(d.c_del or d.c_add or c_upd)
+    kept: list[tuple[RKey, Reaction]] = [
+        (k, r) for k, r in zip(reaction_keys(nw.reactions), nw.reactions)
+        if k not in r_del
+    ]
+    if c_changed:
+        kept = list(zip(
+            (k for k, _ in kept)
+            , relink_reactions((r for _, r in kept), cs)))
+    # The parser writes the reverse of a bidirectional reaction first, so
+    # the added reactions precede the kept ones of their idx
+    rs: list[tuple[RKey, Reaction]] = [
+        (k, record_to_reaction(r, c_map)) for k, r in d.r_add
+    ] + kept
+    rs.sort(key=lambda x: x[0][0])
+
+    return Network(
+        compounds=tuple(cs)
+        , reactions=tuple(
+            r._replace(**r_upd[k]) if k in r_upd else r for k, r in rs)
+    )
+
+
+def _compose_kind[K, V: (Compound, ReactionRecord)](
+    del1: Iterable[K]
+    , add1: Iterable[tuple[K, V]]
+    , upd1: dict[K, dict[str, Any]]
+    , del2: Iterable[K]
+    , add2: Iterable[tuple[K, V]]
+    , upd2: dict[K, dict[str, Any]]
+) -> tuple[list[K], dict[K, V], dict[K, dict[str, Any]]]:
+    """Compose the removals, additions and updates of a single element kind.
+    """
+    dels: list[K] = list(del1)
+    d_set: set[K] = set(dels)
+    adds: dict[K, V] = dict(add1)
+    upds: dict[K, dict[str, Any]] = {k: dict(v) for k, v in upd1.items()}
+    for k in del2:
+        upds.pop(k, None)
+        if k in adds:
+            del adds[k]
+        elif k not in d_set:
+            dels.append(k)
+            d_set.add(k)
+    adds.update(add2)
+    for k, fs in upd2.items():
+        if k in adds:
+            adds[k] = adds[k]._replace(**fs)
+        else:
+            upds.setdefault(k, {}).update(fs)
+    return (dels, adds, upds)
+
+
+def _split_updates[K](
+    upds: dict[K, dict[str, Any]]
+    , f: str
+) -> tuple[tuple[K, Any], ...]:
+    return tuple((k, v[f]) for k, v in upds.items() if f in v)
+
+
+def compose_delta(
+    d1: NetworkDelta
+    , d2: NetworkDelta
+) -> NetworkDelta:
+    """Compose two deltas into a single one.
+
+    Args:
+        d1 (:obj:`NetworkDelta`): First delta.
+        d2 (:obj:`NetworkDelta`): Second delta, relative to the network
+            obtained after applying d1.
+
+    Returns:
+        :obj:`NetworkDelta` equivalent to applying d1 and then d2.
+    """
+    c_dels, c_adds, c_upds = _compose_kind(
+        d1.c_del
+        , ((c.idx, c) for c in d1.c_add)
+        , _updates(energy=d1.c_energy, conc=d1.c_conc, visible=d1.c_visible)
+        , d2.c_del
+        , ((c.idx, c) for c in d2.c_add)
+        , _updates(energy=d2.c_energy, conc=d2.c_conc, visible=d2.c_visible))
+    r_dels, r_adds, r_upds = _compose_kind(
+        d1.r_del
+        , d1.r_add
+        , _updates(energy=d1.r_energy, visible=d1.r_visible)
+        , d2.r_del
+        , d2.r_add
+        , _updates(energy=d2.r_energy, visible=d2.r_visible))
+
+    return NetworkDelta(
+        c_del=tuple(c_dels)
+        , c_add=tuple(c_adds.values())
+        , c_energy=_split_updates(c_upds, "energy")
+        , c_conc=_split_updates(c_upds, "conc")
+        , c_visible=_split_updates(c_upds, "visible")
+        , r_del=tuple(r_dels)
+        , r_add=tuple(r_adds.items())
+        , r_energy=_split_updates(r_upds, "energy")
+        , r_visible=_split_updates(r_upds, "visible"))
+
+
+def dump_delta(
+    d: NetworkDelta
+) -> bytes:
+    """Serialize a delta as compact JSON. The size of the output is
+    proportional to the number of changes.
+
+    Args:
+        d (:obj:`NetworkDelta`): Delta to serialize.
+
+    Returns:
+        bytes with the UTF-8 encoded JSON.
+    """
+    def c_row(c: Compound) -> list[Any]:
+        return [
+            c.idx, c.name, c.energy, c.visible.value
+            , None if c.fflags is None else sorted(c.fflags)
+            , c.conc, c.opts, c.g_coefs]
+
+    def r_row(k: RKey, r: ReactionRecord) -> list[Any]:
+        return [
+            k[3], r.idx, r.name, r.compounds[0], r.compounds[1], r.energy
+            , r.visible.value, r.opts, r.g_coefs]
+
+    return json.dumps(
+        [
+            d.c_del
+            , [c_row(c) for c in d.c_add]
+            , d.c_energy
+            , d.c_conc
+            , [(k, v.value) for k, v in d.c_visible]
+            , d.r_del
+            , [r_row(k, r) for k, r in d.r_add]
+            , d.r_energy
+            , [(k, v.value) for k, v in d.r_visible]
+        ]
+        , separators=(',', ':')
+    ).encode()
+
+
+def load_delta(
+    b: bytes | str
+) -> NetworkDelta:
+    """Inverse of :obj:`dump_delta`.
+
+    Args:
+        b (bytes or str): Serialized delta.
+
+    Returns:
+        :obj:`NetworkDelta` with the deserialized changes.
+    """
+    c_del, c_add, c_e, c_c, c_v, r_del, r_add, r_e, r_v = json.loads(b)
+
+    def rk(k: Sequence[Any]) -> RKey:
+        return (k[0], tuple(k[1]), tuple(k[2]), k[3])
+
+    def coefs(g: Sequence[float] | None) -> tuple[float, ...] | None:
+        return None if g is None else tuple(g)
+
+    return NetworkDelta(
+        c_del=tuple(c_del)
+        , c_add=tuple(
+            Compound(
+                name=n, energy=e, idx=i, visible=Visibility(v)
+                , fflags=None if f is None else set(map(FFlags, f))
+                , conc=c, opts=o, g_coefs=coefs(g))
+            for i, n, e, v, f, c, o, g in c_add)
+        , c_energy=tuple((k, v) for k, v in c_e)
+        , c_conc=tuple((k, v) for k, v in c_c)
+        , c_visible=tuple((k, Visibility(v)) for k, v in c_v)
+        , r_del=tuple(map(rk, r_del))
+        , r_add=tuple(
+            ((i, tuple(cl), tuple(cr), o), ReactionRecord(
+                name=n, compounds=(tuple(cl), tuple(cr)), energy=e, idx=i
+                , opts=op, visible=Visibility(v), g_coefs=coefs(g)))
+            for o, i, n, cl, cr, e, v, op, g in r_add)
+        , r_energy=tuple((rk(k), v) for k, v in r_e)
+        , r_visible=tuple((rk(k), Visibility(v)) for k, v in r_v))
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+from . import codegen, conservation, drc, ensemble, grid, jacobian, kmc, linalg, ode, pool, ranking, reduction, scaling, steady
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""Generation of Python code evaluating the time derivative and the Jacobian
+of a mass-action system. The rate laws are unrolled into straight-line
+expressions, as in a hand-written model, and the kinetic constants are bound
+to closure variables, so no loop over reactions or compounds runs at each
+call.
+
+The generated code only depends on the structure of the network, and not on
+the kinetic constants, which are passed when the functions are built. It is
+written to a cache directory keyed by a fingerprint of the structure and
+imported from there, so it is generated once per network and reused across
+temperatures, sessions and processes.
+
+The "python" backend takes and returns lists. The "numpy" backend takes an
+array whose first axis follows the compounds, so a single call evaluates a
+batch of states, e.g. ``x[:, k]`` being the k-th state.
+
+Attributes:
+    Backend (type): Possible backends of the generated code.
+"""
+
+import hashlib
+import importlib.util
+import os
+from array import array
+from collections import Counter
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Literal, NamedTuple
+
+from ..chemistry import ChemCfg, RateEngine
+from ..stoich import StoichMatrix
+from ..struct import Network, Reaction
+from .conservation import (
+    Reduction
+    , expand_vector
+    , reduce_jacobian
+    , reduce_vector
+)
+from .ode import MassAction, build_mass_action
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+type Backend = Literal["auto", "python", "numpy"]
+
+CODEGEN_VERSION: int = 1
+"""Version of the generated code, part of the fingerprints so the cached
+files are regenerated when the generator changes."""
+
+
+class CompiledModel(NamedTuple):
+    """Generated functions of a mass-action system.
+
+    Attributes:
+        fingerprint (str): Fingerprint of the structure of the system.
+        backend (str): Backend of the generated code, "python" or "numpy".
+        path (:obj:`pathlib.Path` or None): File with the generated code, or
+            None if it was not cached.
+        rhs (callable): Time derivative of the concentrations.
+        jac (callable): Dense Jacobian of :attr:`rhs`.
+    """
+    fingerprint: str
+    backend: str
+    path: Path | None
+    rhs: Callable[[Sequence[float]], Any]
+    jac: Callable[[Sequence[float]], Any]
+
+
+def default_cache_dir() -> Path:
+    """Directory of the cached generated code: $RNETS_CACHE_DIR if set,
+    otherwise the rnets folder of the user cache directory.
+
+    Returns:
+        :obj:`pathlib.Path` of the directory.
+    """
+    if "RNETS_CACHE_DIR" in os.environ:
+        return Path(os.environ["RNETS_CACHE_DIR"])
+    base: str = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(Path.home(), ".cache"))
+    return Path(base) / "rnets" / "codegen"
+
+
+def _resolve_backend(
+    backend: Backend
+) -> str:
+    if backend == "auto":
+        return "python" if np is None else "numpy"
+    if backend == "numpy" and np is None:
+        raise ValueError("The numpy backend requires NumPy")
+    if backend not in ("python", "numpy"):
+        raise ValueError(f"Unknown backend {backend}")
+    return backend
+
+
+def model_fingerprint(
+    m: MassAction
+    , backend: str = "python"
+) -> str:
+    """Fingerprint of the structure of a mass-action system: the reactants
+    and products of each reaction and the stoichiometric matrix. The kinetic
+    constants are not included.
+
+    Args:
+        m (:obj:`MassAction`): System to identify.
+        backend (str, optional): Backend of the generated code. Defaults to
+            "python".
+
+    Returns:
+        str with the hexadecimal SHA-256 digest.
+    """
+    eng: RateEngine = m.engine
+    s: StoichMatrix = m.stoich
+    h = hashlib.sha256()
+    h.update(repr((
+        CODEGEN_VERSION, backend, s.shape
+        , *(tuple(a) for a in (
+            eng.l_ptr, eng.l_idx, eng.r_ptr, eng.r_idx
+            , s.indptr, s.indices, s.data))
+    )).encode())
+    return h.hexdigest()
+
+
+def _product(
+    k: str
+    , idx: Sequence[int]
+) -> str:
+    return "*".join([k, *(f"x{i}" for i in idx)])
+
+
+def _partial(
+    k: str
+    , idx: Sequence[int]
+    , i: int
+) -> str:
+    """Derivative of a side product with respect to compound i."""
+    rest: list[int] = list(idx)
+    rest.remove(i)
+    mult: int = len(idx) - len(rest) + rest.count(i)
+    term: str = _product(k, rest)
+    return f"{mult}*{term}" if mult > 1 else term
+
+
+def _linear_sum(
+    terms: Sequence[tuple[int, str]]
+) -> str:
+    """Sum of coefficient and variable pairs."""
+    out: str = ""
+    for coef, var in terms:
+        sign: str = "-" if coef < 0 else "+"
+        mag: str = "" if abs(coef) == 1 else f"{abs(coef)}*"
+        out += f" {sign} {mag}{var}" if out else (
+            f"{'-' if coef < 0 else ''}{mag}{var}")
+    return out or "0."
+
+
+def generate_source(
+    m: MassAction
+    , backend: str = "python"
+) -> str:
+    """Generate the source of a module defining the function
+    ``build(kf, kr)``, which binds the kinetic constants and returns the
+    derivative and the Jacobian functions of a system.
+
+    Args:
+        m (:obj:`MassAction`): System to generate.
+        backend (str, optional): "python" or "numpy". Defaults to "python".
+
+    Returns:
+        str with the source of the module.
+    """
+    eng: RateEngine = m.engine
+    s: StoichMatrix = m.stoich
+    n: int = s.shape[0]
+    n_r: int = s.shape[1]
+    sides: list[tuple[list[int], list[int]]] = [
+        (list(eng.l_idx[eng.l_ptr[j]:eng.l_ptr[j + 1]])
+         , list(eng.r_idx[eng.r_ptr[j]:eng.r_ptr[j + 1]]))
+        for j in range(n_r)]
+    used: list[int] = sorted({i for ls, rs in sides for i in ls + rs})
+
+    rates: list[str] = []
+    partials: list[str] = []
+    # Derivative of each compound, as (coefficient, variable) terms
+    d_terms: list[list[tuple[int, str]]] = [[] for _ in range(n)]
+    # Jacobian entries, as (coefficient, variable) terms
+    j_terms: dict[tuple[int, int], list[tuple[int, str]]] = {}
+    for j, (ls, rs) in enumerate(sides):
+        rates.append(
+            f"r{j} = {_product(f'kf{j}', ls)} - {_product(f'kr{j}', rs)}")
+        nu: list[tuple[int, int]] = [
+            (s.indices[p], s.data[p])
+            for p in range(s.indptr[j], s.indptr[j + 1])]
+        for i, x in nu:
+            d_terms[i].append((x, f"r{j}"))
+        for k in sorted(set(ls) | set(rs)):
+            parts: list[str] = []
+            if k in ls:
+                parts.append(_partial(f"kf{j}", ls, k))
+            if k in rs:
+                parts.append("- " + _partial(f"kr{j}", rs, k))
+            partials.append(f"d{j}_{k} = {' '.join(parts)}")
+            for i, x in nu:
+                j_terms.setdefault((i, k), []).append((x, f"d{j}_{k}"))
+
+    ind: str = " " * 8
+    load: list[str] = [f"{ind}x{i} = x[{i}]" for i in used]
+    lines: list[str] = [
+        "# Generated by rnets.kinetics.codegen, do not edit"
+        , f"# Compounds: {n}, reactions: {n_r}"
+        , ""
+        , "def build(kf, kr):"]
+    lines += [f"    kf{j} = kf[{j}]" for j in range(n_r)]
+    lines += [f"    kr{j} = kr[{j}]" for j in range(n_r)]
+    lines += ["", "    def rhs(x):"] + load
+    lines += [ind + r for r in rates]
+    if backend == "numpy":
+        lines.append(f"{ind}out = np.zeros(x.shape)")
+        lines += [
+            f"{ind}out[{i}] = {_linear_sum(ts)}"
+            for i, ts in enumerate(d_terms) if ts]
+        lines.append(f"{ind}return out")
+    else:
+        lines.append(f"{ind}return [")
+        lines += [f"{ind}    {_linear_sum(ts)}," for ts in d_terms]
+        lines.append(f"{ind}]")
+    lines += ["", "    def jac(x):"] + load
+    lines += [ind + p for p in partials]
+    if backend == "numpy":
+        lines.append(f"{ind}out = np.zeros((x.shape[0],) + x.shape)")
+        lines += [
+            f"{ind}out[{i}, {k}] = {_linear_sum(ts)}"
+            for (i, k), ts in sorted(j_terms.items())]
+        lines.append(f"{ind}return out")
+    else:
+        lines.append(f"{ind}return [")
+        for i in range(n):
+            row: list[str] = [
+                _linear_sum(j_terms[i, k]) if (i, k) in j_terms else "0."
+                for k in range(n)]
+            lines.append(f"{ind}    [{', '.join(row)}],")
+        lines.append(f"{ind}]")
+    lines += ["", "    return rhs, jac", ""]
+    if backend == "numpy":
+        lines[2:2] = ["import numpy as np", "", ""]
+    return "\n".join(lines)
+
+
+def _load_source(
+    name: str
+    , source: str
+) -> ModuleType:
+    mod: ModuleType = ModuleType(name)
+    exec(compile(source, f"<{name}>", "exec"), mod.__dict__)
+    return mod
+
+
+def _load_file(
+    name: str
+    , path: Path
+) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load the generated code {path}")
+    mod: ModuleType = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def compile_mass_action(
+    m: MassAction
+    , backend: Backend = "auto"
+    , cache_dir: Path | str | None = None
+    , cache: bool = True
+) -> CompiledModel:
+    """Generate, or load from the cache, the functions of a mass-action
+    system and bind its kinetic constants.
+
+    Args:
+        m (:obj:`MassAction`): System to compile.
+        backend (str, optional): "python", "numpy" or "auto", which uses
+            "numpy" when available. Defaults to "auto".
+        cache_dir (:obj:`pathlib.Path`, str or None, optional): Directory of
+            the cached code. If None, :obj:`default_cache_dir` is used.
+            Defaults to None.
+        cache (bool, optional): If False, the code is generated in memory and
+            never written. Defaults to True.
+
+    Returns:
+        :obj:`CompiledModel` of the system.
+
+    Raises:
+        :obj:`ValueError`: If the backend is unknown or not available.
+    """
+    kind: str = _resolve_backend(backend)
+    fp: str = model_fingerprint(m, kind)
+    name: str = f"rnets_model_{fp[:16]}"
+    path: Path | None = None
+    if cache:
+        folder: Path = Path(
+            default_cache_dir() if cache_dir is None else cache_dir)
+        path = folder / f"{name}.py"
+        if not path.exists():
+            folder.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name and renamed, so concurrent
+            # processes never import a partial file
+            tmp: Path = folder / f".{name}.{os.getpid()}.tmp"
+            tmp.write_text(generate_source(m, kind))
+            os.replace(tmp, path)
+        mod: ModuleType = _load_file(name, path)
+    else:
+        mod = _load_source(name, generate_source(m, kind))
+    rhs, jac = mod.build(m.engine.kt.kf, m.engine.kt.kr)
+    return CompiledModel(
+        fingerprint=fp, backend=kind, path=path, rhs=rhs, jac=jac)
+
+
+def compile_model(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , rs: Sequence[Reaction] | None = None
+    , backend: Backend = "auto"
+    , cache_dir: Path | str | None = None
+    , cache: bool = True
+) -> CompiledModel:
+    """Build the mass-action system of a network and compile it, see
+    :obj:`compile_mass_action`.
+
+    Args:
+        nw (:obj:`Network`): Network with the compounds and the reactions.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        rs (sequence of :obj:`Reaction` or None, optional): Reversible
+            reactions of the model, see :obj:`build_mass_action`. Defaults to
+            None.
+        backend (str, optional): "python", "numpy" or "auto". Defaults to
+            "auto".
+        cache_dir (:obj:`pathlib.Path`, str or None, optional): Directory of
+            the cached code. Defaults to None.
+        cache (bool, optional): If False, the code is never written.
+            Defaults to True.
+
+    Returns:
+        :obj:`CompiledModel` of the network.
+    """
+    return compile_mass_action(
+        build_mass_action(nw, chem_cfg, rs), backend, cache_dir, cache)
+
+
+def compiled_system(
+    cm: CompiledModel
+    , red: Reduction | None = None
+) -> tuple[
+    Callable[[Sequence[float]], Sequence[float]]
+    , Callable[[Sequence[float]], list[list[float]]]
+]:
+    """Wrap the functions of a compiled model like :obj:`mass_action_system`,
+    ready for :obj:`solve_ros2`.
+
+    Args:
+        cm (:obj:`CompiledModel`): Compiled model.
+        red (:obj:`Reduction` or None, optional): Elimination of the dependent
+            compounds. If given, the functions take and return the
+            independent concentrations only. Defaults to None.
+
+    Returns:
+        tuple with the derivative and the dense Jacobian functions of a single
+        state.
+    """
+    rhs: Callable[[Sequence[float]], Sequence[float]] = cm.rhs
+    jac: Callable[[Sequence[float]], list[list[float]]] = cm.jac
+    if cm.backend == "numpy":
+        if np is None:
+            raise ImportError("The numpy backend requires NumPy")
+        asarray = np.asarray
+
+        def rhs_np(y: Sequence[float]) -> array:
+            return array('d', cm.rhs(asarray(y, dtype=float)).tobytes())
+
+        def jac_np(y: Sequence[float]) -> list[list[float]]:
+            return cm.jac(asarray(y, dtype=float)).tolist()
+
+        rhs, jac = rhs_np, jac_np
+    if red is None:
+        return rhs, jac
+
+    def rhs_red(x: Sequence[float]) -> array:
+        return reduce_vector(red, rhs(expand_vector(red, x)))
+
+    def jac_red(x: Sequence[float]) -> list[list[float]]:
+        return reduce_jacobian(red, jac(expand_vector(red, x)))
+
+    return rhs_red, jac_red
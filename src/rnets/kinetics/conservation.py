@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""Conservation laws of a reaction network. A conservation law is a vector w
+such that w·S = 0, being S the stoichiometric matrix, so the weighted sum of
+the concentrations w·c remains constant for any kinetics, e.g. the mass of an
+element or the number of catalytic sites.
+
+The laws are computed exactly, using fractions, as an integer basis of the
+left null space of the stoichiometric matrix. Each law makes the
+concentration of one compound, its pivot, dependent on the others, so the
+kinetics can be solved for the independent compounds alone (see
+:obj:`build_reduction`).
+"""
+
+from array import array
+from collections.abc import Iterable, Sequence
+from fractions import Fraction
+from math import lcm
+from typing import NamedTuple
+
+from ..stoich import StoichMatrix, to_csc, to_dense
+
+
+class ConservationLaws(NamedTuple):
+    """Basis of the conservation laws of a network.
+
+    Attributes:
+        laws (tuple of tuples of int): Integer coefficients of each law, one
+            per compound.
+        pivots (tuple of int): Compound of each law whose balance equation is
+            redundant and can be replaced by the law. Each law has a
+            coefficient different from zero at its pivot and zero at the
+            pivots of the other laws.
+    """
+    laws: tuple[tuple[int, ...], ...]
+    pivots: tuple[int, ...]
+
+
+def conservation_laws(
+    s: StoichMatrix
+    , fixed: Iterable[int] = ()
+    , order: Sequence[int] | None = None
+) -> ConservationLaws:
+    """Compute an integer basis of the conservation laws of a stoichiometric
+    matrix.
+
+    Args:
+        s (:obj:`StoichMatrix`): Stoichiometric matrix, in any format.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant, e.g. reservoirs of an open system. Each one yields
+            a law of its own, with itself as pivot, and is ignored by the
+            others. Defaults to ().
+        order (sequence of int or None, optional): Permutation of the
+            compounds, which are chosen as pivots from last to first, e.g.
+            sorted by increasing concentration so the most abundant compounds
+            become dependent. If None, the compound order is used. Defaults to
+            None.
+
+    Returns:
+        :obj:`ConservationLaws` of the matrix.
+    """
+    n, m = s.shape
+    # Rows of the transposed matrix, one per reaction, reduced to row echelon
+    # form. The free columns span the null space.
+    dense: list[list[int]] = to_dense(to_csc(s))
+    for i in fixed:
+        dense[i] = [0] * m
+    rows: list[list[Fraction]] = [
+        [Fraction(dense[i][j]) for i in range(n)] for j in range(m)]
+    piv_cols: list[int] = []
+    r: int = 0
+    cols: Sequence[int] = range(n) if order is None else order
+    for col in cols:
+        p: int | None = next(
+            (i for i in range(r, len(rows)) if rows[i][col] != 0), None)
+        if p is None:
+            continue
+        rows[r], rows[p] = rows[p], rows[r]
+        inv: Fraction = 1 / rows[r][col]
+        rows[r] = [x * inv for x in rows[r]]
+        for i in range(len(rows)):
+            if i != r and rows[i][col] != 0:
+                f: Fraction = rows[i][col]
+                rows[i] = [x - f * y for x, y in zip(rows[i], rows[r])]
+        piv_cols.append(col)
+        r += 1
+        if r == len(rows):
+            break
+
+    free: list[int] = sorted(set(cols) - set(piv_cols))
+    laws: list[tuple[int, ...]] = []
+    for fc in free:
+        v: list[Fraction] = [Fraction(0)] * n
+        v[fc] = Fraction(1)
+        for i, pc in enumerate(piv_cols):
+            v[pc] = -rows[i][fc]
+        den: int = lcm(*(x.denominator for x in v))
+        w: list[int] = [int(x * den) for x in v]
+        if sum(x < 0 for x in w) > sum(x > 0 for x in w):
+            w = [-x for x in w]
+        laws.append(tuple(w))
+    return ConservationLaws(laws=tuple(laws), pivots=tuple(free))
+
+
+def conserved_totals(
+    cl: ConservationLaws
+    , c: Sequence[float]
+) -> tuple[float, ...]:
+    """Evaluate the conserved quantities of a concentration vector.
+
+    Args:
+        cl (:obj:`ConservationLaws`): Conservation laws.
+        c (sequence of float): Concentration vector.
+
+    Returns:
+        tuple of float with the value of each law.
+    """
+    return tuple(
+        sum(w * x for w, x in zip(law, c) if w) for law in cl.laws)
+
+
+class Reduction(NamedTuple):
+    """Elimination of the dependent compounds of a system using its
+    conservation laws. The concentration of each dependent compound is
+
+        c_p = base_p - sum(coef * c_i)
+
+    over the independent compounds i of its law.
+
+    Attributes:
+        free (tuple of int): Independent compounds.
+        dependent (tuple of int): Dependent compounds, the pivots of the laws.
+        base (tuple of float): Conserved total of each law divided by the
+            coefficient of its pivot.
+        coefs (tuple of tuples): Pairs of position in :attr:`free` and
+            coefficient, divided by the one of the pivot, of each law.
+    """
+    free: tuple[int, ...]
+    dependent: tuple[int, ...]
+    base: tuple[float, ...]
+    coefs: tuple[tuple[tuple[int, float], ...], ...]
+
+
+def build_reduction(
+    cl: ConservationLaws
+    , c0: Sequence[float]
+) -> Reduction:
+    """Build the elimination of the dependent compounds, keeping the conserved
+    quantities of a concentration vector.
+
+    Args:
+        cl (:obj:`ConservationLaws`): Conservation laws of the system.
+        c0 (sequence of float): Concentration vector defining the conserved
+            quantities.
+
+    Returns:
+        :obj:`Reduction` of the system.
+    """
+    dep: set[int] = set(cl.pivots)
+    free: tuple[int, ...] = tuple(i for i in range(len(c0)) if i not in dep)
+    pos: dict[int, int] = {i: q for q, i in enumerate(free)}
+    return Reduction(
+        free=free
+        , dependent=cl.pivots
+        , base=tuple(
+            t / law[p]
+            for t, law, p in zip(conserved_totals(cl, c0), cl.laws, cl.pivots))
+        , coefs=tuple(
+            tuple(
+                (pos[i], w / law[p])
+                for i, w in enumerate(law) if w and i != p)
+            for law, p in zip(cl.laws, cl.pivots)))
+
+
+def reduce_vector(
+    red: Reduction
+    , c: Sequence[float]
+) -> array:
+    """Take the concentrations of the independent compounds.
+
+    Args:
+        red (:obj:`Reduction`): Elimination of the system.
+        c (sequence of float): Full concentration vector.
+
+    Returns:
+        array of float following :attr:`Reduction.free`.
+    """
+    return array('d', (c[i] for i in red.free))
+
+
+def expand_vector(
+    red: Reduction
+    , x: Sequence[float]
+) -> array:
+    """Rebuild the full concentration vector from the independent
+    concentrations.
+
+    Args:
+        red (:obj:`Reduction`): Elimination of the system.
+        x (sequence of float): Concentrations of the independent compounds.
+
+    Returns:
+        array of float with the concentration of every compound.
+    """
+    c: array = array('d', [0.]) * (len(red.free) + len(red.dependent))
+    for i, v in zip(red.free, x):
+        c[i] = v
+    for p, b, cs in zip(red.dependent, red.base, red.coefs):
+        c[p] = b - sum(w * x[q] for q, w in cs)
+    return c
+
+
+def reduce_jacobian(
+    red: Reduction
+    , jac: Sequence[Sequence[float]]
+) -> list[list[float]]:
+    """Jacobian of the independent derivatives with respect to the
+    independent concentrations, applying the chain rule through the
+    dependent compounds.
+
+    Args:
+        red (:obj:`Reduction`): Elimination of the system.
+        jac (sequence of sequences of float): Full dense Jacobian.
+
+    Returns:
+        list of lists of float with the reduced Jacobian.
+    """
+    out: list[list[float]] = []
+    for i in red.free:
+        row: Sequence[float] = jac[i]
+        r: list[float] = [row[j] for j in red.free]
+        for p, cs in zip(red.dependent, red.coefs):
+            x: float = row[p]
+            if x:
+                for q, w in cs:
+                    r[q] -= x * w
+        out.append(r)
+    return out
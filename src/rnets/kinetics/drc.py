@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""Degree of rate control of the reactions of a network. The degree of rate
+control of a reaction measures how much the production rate of a target
+compound at steady state changes when the energy of its transition state
+changes:
+
+    X_i = -kb T d ln(r) / d E_i
+
+Each derivative is computed with central differences, re-solving the steady
+state with the energy of one reaction perturbed up and down. The solves are
+independent and run in a process pool, each one warm started from the
+unperturbed steady state.
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from math import log, nan
+from typing import NamedTuple
+
+from ..chemistry import ChemCfg, update_ktable
+from ..struct import Compound, Network, Reaction
+from .conservation import Reduction
+from .ode import (
+    MassAction
+    , build_mass_action
+    , initial_conc
+    , mass_action_rhs
+    , reduce_system
+)
+from .pool import get_problem, run_pool
+from .steady import SteadyState, solve_steady_state
+
+
+class RateControl(NamedTuple):
+    """Degrees of rate control of the reactions of a network.
+
+    Attributes:
+        base (:obj:`SteadyState`): Unperturbed steady state.
+        target (int): Index of the compound whose production rate is
+            controlled.
+        rate (float): Production rate of the target at :attr:`base`.
+        reactions (tuple of :obj:`Reaction`): Unique reactions of the model,
+            see :obj:`unique_reactions`.
+        xrc (tuple of float): Degree of rate control of each reaction of
+            :attr:`reactions`. NaN if a perturbed solve failed.
+    """
+    base: SteadyState
+    target: int
+    rate: float
+    reactions: tuple[Reaction, ...]
+    xrc: tuple[float, ...]
+
+
+class _Problem(NamedTuple):
+    """Data shared by all the perturbed solves."""
+    m: MassAction
+    c: Sequence[float]
+    red: Reduction | None
+    target: int
+    rtol: float
+    atol: float
+    max_iter: int
+
+
+def _perturbed_rate(
+    task: tuple[int, float]
+) -> float:
+    """Production rate of the target with the energy of a reaction shifted,
+    or NaN if the steady state is not found."""
+    j, shift = task
+    p: _Problem = get_problem(_Problem)
+    es: list[float] = list(p.m.engine.kt.r_energies)
+    es[j] += shift
+    m: MassAction = p.m._replace(
+        engine=update_ktable(p.m.engine, r_energies=es))
+    ss: SteadyState = solve_steady_state(
+        m, p.c, p.red, p.rtol, p.atol, p.max_iter)
+    return mass_action_rhs(m, ss.c)[p.target] if ss.success else nan
+
+
+def _xrc(
+    r_up: float
+    , r_down: float
+    , delta: float
+    , kbt: float
+) -> float:
+    if not (r_up > 0. and r_down > 0.):
+        return nan
+    return -kbt * (log(r_up) - log(r_down)) / (2. * delta)
+
+
+def degree_of_rate_control(
+    nw: Network
+    , target: int
+    , chem_cfg: ChemCfg = ChemCfg()
+    , c0: Sequence[float] | None = None
+    , fixed: Iterable[int] = ()
+    , delta: float = 1e-3
+    , rtol: float = 1e-10
+    , atol: float = 1e-18
+    , max_iter: int = 500
+    , max_workers: int | None = None
+) -> RateControl:
+    """Compute the degree of rate control of every reaction of a network.
+
+    Args:
+        nw (:obj:`Network`): Network to analyze.
+        target (int): Index of the compound whose production rate is
+            controlled, e.g. the product of an open system.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        c0 (sequence of float or None, optional): Initial concentrations. If
+            None, the concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant, see :obj:`conservation_laws`. Defaults to ().
+        delta (float, optional): Energy perturbation, in the units of
+            chem_cfg. Defaults to 1e-3.
+        rtol (float, optional): Relative tolerance of the steady states. It
+            should be well below the relative rate change caused by delta.
+            Defaults to 1e-10.
+        atol (float, optional): Absolute tolerance of the steady states.
+            Defaults to 1e-18.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, the perturbations are solved in the current process. If None,
+            the number of processors is used. Defaults to None.
+
+    Returns:
+        :obj:`RateControl` with the degree of rate control of each unique
+        reaction.
+
+    Raises:
+        :obj:`ValueError`: If the steady state is not found or if the target
+            is not produced at it.
+    """
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    c0 = initial_conc(nw) if c0 is None else c0
+    red: Reduction | None = reduce_system(m, c0, fixed)
+    base: SteadyState = solve_steady_state(m, c0, red, rtol, atol, max_iter)
+    if not base.success:
+        raise ValueError("Steady state not found")
+    rate: float = mass_action_rhs(m, base.c)[target]
+    if rate <= 0.:
+        raise ValueError(
+            f"{nw.compounds[target].name} is not produced at steady state")
+
+    n: int = len(m.engine.reactions)
+    rates: list[float] = list(run_pool(
+        _perturbed_rate
+        , _Problem(m, base.c, red, target, rtol, atol, max_iter)
+        , [(j, s) for j in range(n) for s in (delta, -delta)]
+        , max_workers))
+    kbt: float = chem_cfg.kb * chem_cfg.T
+    return RateControl(
+        base=base
+        , target=target
+        , rate=rate
+        , reactions=m.engine.reactions
+        , xrc=tuple(
+            _xrc(rates[2 * j], rates[2 * j + 1], delta, kbt)
+            for j in range(n)))
+
+
+def network_values(
+    nw: Network
+    , reactions: Sequence[Reaction]
+    , values: Sequence[float]
+) -> Iterator[float]:
+    """Map values of unique reactions, e.g. :attr:`RateControl.xrc`, onto
+    all the reactions of a network, so both directions of a reversible
+    reaction share the value. The result can be passed to the thermodynamic
+    plotter to set the widths or colors of the edges.
+
+    Args:
+        nw (:obj:`Network`): Network whose reactions will be mapped.
+        reactions (sequence of :obj:`Reaction`): Unique reactions of the
+            values.
+        values (sequence of float): Value of each reaction.
+
+    Yields:
+        float with the value of each reaction of the network, following the
+        order of :attr:`Network.reactions`.
+    """
+    # Keyed like unique_reactions, so parallel channels keep their values
+    idx: dict[tuple[tuple[tuple[Compound, ...], ...], float], int] = {}
+    for j, r in enumerate(reactions):
+        idx[r.compounds, r.energy] = j
+        idx.setdefault((tuple(reversed(r.compounds)), r.energy), j)
+    for r in nw.reactions:
+        yield values[idx[r.compounds, r.energy]]
@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""Monte Carlo propagation of the uncertainty of the energies of a network.
+Computed energies carry errors of a few tenths of eV, so the energies of the
+compounds and of the transition states are sampled from normal
+distributions centered at their values, and the kinetic constants, the
+rates or the steady state of each sample are evaluated in a process pool.
+
+The results are streamed into running percentile estimators (the P²
+algorithm of Jain and Chlamtac), so the memory does not grow with the number
+of samples. Each sample is drawn from its own seeded generator, and the
+results are consumed in sample order, so the summary does not depend on the
+number of workers.
+"""
+
+from array import array
+from collections.abc import Iterable, Sequence
+from math import ceil
+from random import Random
+from typing import Literal, NamedTuple
+
+from ..chemistry import ChemCfg, eval_rates, update_ktable
+from ..struct import Network, Reaction, relink_reactions
+from .conservation import Reduction
+from .drc import network_values
+from .ode import MassAction, build_mass_action, initial_conc, reduce_system
+from .pool import get_problem, run_pool
+from .steady import SteadyState, solve_steady_state
+
+
+type Quantity = Literal["k", "rates", "steady"]
+
+
+class P2Quantile(NamedTuple):
+    """Running estimator of a quantile with the P² algorithm, using five
+    markers whose heights follow the minimum, the quantile, the maximum and
+    two points in between. The arrays are updated in place by
+    :obj:`p2_update`.
+
+    Attributes:
+        p (float): Estimated quantile, between 0 and 1.
+        heights (array of float): Height of each marker. Holds the sorted
+            observations until five are seen.
+        pos (array of float): Position of each marker, empty until five
+            observations are seen.
+    """
+    p: float
+    heights: array
+    pos: array
+
+
+class EnsembleSummary(NamedTuple):
+    """Percentiles of an ensemble of perturbed networks.
+
+    Attributes:
+        network (:obj:`Network`): Median network, with the median energy of
+            each compound and transition state and, for steady states, the
+            median concentrations. It can be rendered by the plotters.
+        quantity (str): Evaluated quantity, "k", "rates" or "steady".
+        quantiles (tuple of float): Estimated quantiles.
+        reactions (tuple of :obj:`Reaction`): Unique reactions of the values,
+            see :obj:`unique_reactions`.
+        values (tuple of tuple of float): Quantiles of the value of each
+            reaction: the forward kinetic constant for "k" and the net rate
+            otherwise. A row per quantile.
+        energies (tuple of tuple of float): Quantiles of the energy of each
+            compound. A row per quantile.
+        ts_energies (tuple of tuple of float): Quantiles of the energy of the
+            transition state of each reaction. A row per quantile.
+        concs (tuple of tuple of float): Quantiles of the steady state
+            concentration of each compound. Empty unless the quantity is
+            "steady".
+        samples (int): Number of evaluated samples.
+        failed (int): Number of samples whose steady state was not found,
+            which are left out of the percentiles.
+    """
+    network: Network
+    quantity: str
+    quantiles: tuple[float, ...]
+    reactions: tuple[Reaction, ...]
+    values: tuple[tuple[float, ...], ...]
+    energies: tuple[tuple[float, ...], ...]
+    ts_energies: tuple[tuple[float, ...], ...]
+    concs: tuple[tuple[float, ...], ...]
+    samples: int
+    failed: int
+
+
+def p2_init(
+    p: float
+) -> P2Quantile:
+    """Build an empty :obj:`P2Quantile` estimator.
+
+    Args:
+        p (float): Quantile to estimate, between 0 and 1.
+
+    Returns:
+        :obj:`P2Quantile` without observations.
+
+    Raises:
+        :obj:`ValueError`: If p is not between 0 and 1.
+    """
+    if not 0. <= p <= 1.:
+        raise ValueError(f"Quantile {p} not between 0 and 1")
+    return P2Quantile(p=p, heights=array('d'), pos=array('d'))
+
+
+def _parabolic(
+    q: array
+    , n: array
+    , i: int
+    , s: int
+) -> float:
+    return q[i] + s / (n[i + 1] - n[i - 1]) * (
+        (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+        + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+
+def p2_update(
+    est: P2Quantile
+    , x: float
+) -> None:
+    """Add an observation to a :obj:`P2Quantile` estimator, in constant time
+    and memory.
+
+    Args:
+        est (:obj:`P2Quantile`): Estimator to update in place.
+        x (float): Observation.
+    """
+    q, n = est.heights, est.pos
+    if not n:
+        q.append(x)
+        q[:] = array('d', sorted(q))
+        if len(q) == 5:
+            n.extend((1., 2., 3., 4., 5.))
+        return
+    if x < q[0]:
+        q[0] = x
+        k: int = 0
+    elif x >= q[4]:
+        q[4] = x
+        k = 3
+    else:
+        k = next(i for i in range(4) if x < q[i + 1])
+    for i in range(k + 1, 5):
+        n[i] += 1.
+    count: float = n[4]
+    steps: tuple[float, ...] = (0., est.p / 2., est.p, (1. + est.p) / 2., 1.)
+    for i in range(1, 4):
+        d: float = 1. + (count - 1.) * steps[i] - n[i]
+        if ((d >= 1. and n[i + 1] - n[i] > 1.)
+                or (d <= -1. and n[i - 1] - n[i] < -1.)):
+            s: int = 1 if d > 0. else -1
+            h: float = _parabolic(q, n, i, s)
+            if not q[i - 1] < h < q[i + 1]:
+                h = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+            q[i] = h
+            n[i] += s
+
+
+def p2_value(
+    est: P2Quantile
+) -> float:
+    """Current estimate of a :obj:`P2Quantile`. With less than five
+    observations, the nearest rank quantile of the observations is returned.
+    Quantiles 0 and 1 are the exact minimum and maximum observations, kept by
+    the outer markers.
+
+    Args:
+        est (:obj:`P2Quantile`): Estimator.
+
+    Returns:
+        float with the estimated quantile, NaN without observations.
+    """
+    if est.pos:
+        if est.p == 0.:
+            return est.heights[0]
+        if est.p == 1.:
+            return est.heights[4]
+        return est.heights[2]
+    if not est.heights:
+        return float("nan")
+    return est.heights[max(ceil(est.p * len(est.heights)) - 1, 0)]
+
+
+class _Problem(NamedTuple):
+    """Data shared by all the samples."""
+    m: MassAction
+    c: Sequence[float]
+    red: Reduction | None
+    quantity: str
+    sigma: float
+    sigma_ts: float
+    seed: int
+    rtol: float
+    atol: float
+    max_iter: int
+
+
+def sample_energies(
+    c_energies: Sequence[float]
+    , r_energies: Sequence[float]
+    , sigma: float
+    , sigma_ts: float
+    , seed: int
+    , i: int
+) -> tuple[tuple[float, ...], tuple[float, ...]]:
+    """Draw the i-th perturbed energy set of an ensemble. Every sample has its
+    own generator, seeded from the ensemble seed and its position, so it can
+    be reproduced alone.
+
+    Args:
+        c_energies (sequence of float): Energies of the compounds.
+        r_energies (sequence of float): Energies of the transition states.
+        sigma (float): Standard deviation of the compound energies.
+        sigma_ts (float): Standard deviation of the transition state
+            energies.
+        seed (int): Seed of the ensemble.
+        i (int): Position of the sample.
+
+    Returns:
+        tuple of the form (compound energies, transition state energies).
+    """
+    rng: Random = Random(f"{seed}:{i}")
+    return (
+        tuple(e + rng.gauss(0., sigma) for e in c_energies)
+        , tuple(e + rng.gauss(0., sigma_ts) for e in r_energies))
+
+
+def _sample(
+    i: int
+) -> tuple[tuple[float, ...], tuple[float, ...], array, array | None] | None:
+    """Energies, reaction values and steady state concentrations of a sample,
+    or None if its steady state is not found."""
+    p: _Problem = get_problem(_Problem)
+    c_es, r_es = sample_energies(
+        p.m.engine.kt.c_energies, p.m.engine.kt.r_energies
+        , p.sigma, p.sigma_ts, p.seed, i)
+    m: MassAction = p.m._replace(engine=update_ktable(
+        p.m.engine, c_energies=c_es, r_energies=r_es))
+    if p.quantity == "k":
+        return (c_es, r_es, m.engine.kt.kf, None)
+    if p.quantity == "rates":
+        return (c_es, r_es, eval_rates(m.engine, p.c).net, None)
+    ss: SteadyState = solve_steady_state(
+        m, p.c, p.red, p.rtol, p.atol, p.max_iter)
+    if not ss.success:
+        return None
+    return (c_es, r_es, eval_rates(m.engine, ss.c).net, ss.c)
+
+
+def _estimators(
+    quantiles: Sequence[float]
+    , n: int
+) -> tuple[tuple[P2Quantile, ...], ...]:
+    return tuple(tuple(p2_init(p) for _ in range(n)) for p in quantiles)
+
+
+def _feed(
+    ests: tuple[tuple[P2Quantile, ...], ...]
+    , xs: Iterable[float]
+) -> None:
+    for j, x in enumerate(xs):
+        for row in ests:
+            p2_update(row[j], x)
+
+
+def _values(
+    ests: tuple[tuple[P2Quantile, ...], ...]
+) -> tuple[tuple[float, ...], ...]:
+    return tuple(tuple(map(p2_value, row)) for row in ests)
+
+
+def run_ensemble(
+    nw: Network
+    , quantity: Quantity = "k"
+    , chem_cfg: ChemCfg = ChemCfg()
+    , n_samples: int = 1000
+    , sigma: float = 0.1
+    , sigma_ts: float | None = None
+    , quantiles: Sequence[float] = (0.05, 0.5, 0.95)
+    , c0: Sequence[float] | None = None
+    , fixed: Iterable[int] = ()
+    , seed: int = 0
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+    , max_workers: int | None = None
+    , chunksize: int = 16
+) -> EnsembleSummary:
+    """Propagate the uncertainty of the energies of a network to its kinetic
+    constants, rates or steady state.
+
+    Args:
+        nw (:obj:`Network`): Reference network.
+        quantity (str, optional): Evaluated quantity of each sample: "k" for
+            the forward kinetic constants, "rates" for the net rates at the
+            initial concentrations and "steady" for the steady state and its
+            net rates. Defaults to "k".
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        n_samples (int, optional): Number of samples. Defaults to 1000.
+        sigma (float, optional): Standard deviation of the energies of the
+            compounds, in the units of chem_cfg. Defaults to 0.1.
+        sigma_ts (float or None, optional): Standard deviation of the
+            energies of the transition states. If None, sigma is used.
+            Defaults to None.
+        quantiles (sequence of float, optional): Quantiles to estimate. The
+            median network uses 0.5, whether it is in the sequence or not.
+            Defaults to (0.05, 0.5, 0.95).
+        c0 (sequence of float or None, optional): Initial concentrations. If
+            None, the concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant in the steady states, see
+            :obj:`conservation_laws`. Defaults to ().
+        seed (int, optional): Seed of the ensemble. Defaults to 0.
+        rtol (float, optional): Relative tolerance of the steady states.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance of the steady states.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, the samples are evaluated in the current process. If None, the
+            number of processors is used. Defaults to None.
+        chunksize (int, optional): Number of samples sent to a worker at
+            once. Defaults to 16.
+
+    Returns:
+        :obj:`EnsembleSummary` with the percentiles of the ensemble.
+
+    Raises:
+        :obj:`ValueError`: If the quantity is unknown, the number of samples
+            is not positive or the unperturbed steady state is not found.
+    """
+    if quantity not in ("k", "rates", "steady"):
+        raise ValueError(f"Unknown quantity {quantity}")
+    if n_samples < 1:
+        raise ValueError("At least one sample is required")
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    c: Sequence[float] = initial_conc(nw) if c0 is None else c0
+    red: Reduction | None = None
+    if quantity == "steady":
+        red = reduce_system(m, c, fixed)
+        base: SteadyState = solve_steady_state(
+            m, c, red, rtol, atol, max_iter)
+        if not base.success:
+            raise ValueError("Steady state not found")
+        # Warm start every sample from the unperturbed steady state
+        c = base.c
+
+    qs: tuple[float, ...] = tuple(quantiles)
+    all_qs: tuple[float, ...] = qs if 0.5 in qs else qs + (0.5,)
+    n_c: int = len(nw.compounds)
+    n_r: int = len(m.engine.reactions)
+    e_ests = _estimators(all_qs, n_c)
+    t_ests = _estimators(all_qs, n_r)
+    v_ests = _estimators(qs, n_r)
+    c_ests = _estimators(all_qs, n_c if quantity == "steady" else 0)
+    failed: int = 0
+    for res in run_pool(
+            _sample
+            , _Problem(
+                m, c, red, quantity, sigma
+                , sigma if sigma_ts is None else sigma_ts
+                , seed, rtol, atol, max_iter)
+            , range(n_samples), max_workers, chunksize):
+        if res is None:
+            failed += 1
+            continue
+        c_es, r_es, vs, cs = res
+        _feed(e_ests, c_es)
+        _feed(t_ests, r_es)
+        _feed(v_ests, vs)
+        if cs is not None:
+            _feed(c_ests, cs)
+
+    energies = _values(e_ests)
+    ts_energies = _values(t_ests)
+    concs = _values(c_ests)
+    med: int = all_qs.index(0.5)
+    cps = tuple(
+        cp._replace(
+            energy=energies[med][i]
+            , conc=concs[med][i] if concs[med] else cp.conc)
+        for i, cp in enumerate(nw.compounds))
+    rs = tuple(
+        r._replace(energy=e)
+        for r, e in zip(nw.reactions, network_values(
+            nw, m.engine.reactions, ts_energies[med])))
+    n: int = len(qs)
+    return EnsembleSummary(
+        network=Network(compounds=cps, reactions=relink_reactions(rs, cps))
+        , quantity=quantity
+        , quantiles=qs
+        , reactions=m.engine.reactions
+        , values=_values(v_ests)
+        , energies=energies[:n]
+        , ts_energies=ts_energies[:n]
+        , concs=concs[:n] if quantity == "steady" else ()
+        , samples=n_samples - failed
+        , failed=failed)
+
+
+def ensemble_spread(
+    es: EnsembleSummary
+    , lo: int = 0
+    , hi: int = -1
+) -> tuple[float, ...]:
+    """Spread of the value of each reaction of an ensemble between two of its
+    quantiles.
+
+    Args:
+        es (:obj:`EnsembleSummary`): Summary of the ensemble.
+        lo (int, optional): Position of the lower quantile in
+            :attr:`EnsembleSummary.quantiles`. Defaults to 0.
+        hi (int, optional): Position of the upper quantile. Defaults to -1.
+
+    Returns:
+        tuple of float with the spread of each reaction of
+        :attr:`EnsembleSummary.reactions`. Map it onto the reactions of the
+        median network with :obj:`network_values` to use it as the widths or
+        colors of the thermodynamic plot.
+    """
+    return tuple(b - a for a, b in zip(es.values[lo], es.values[hi]))
@@ -0,0 +1,686 @@
+# -*- coding: utf-8 -*-
+"""Parameter sweeps of a network over a Cartesian grid of temperatures,
+initial concentrations and pressures. The pressures are the concentrations
+of compounds held constant, e.g. the gases of a surface reaction, so they
+are kept fixed in the steady states and the trajectories.
+
+The grid points are independent and are evaluated in a process pool. When a
+cache directory is given, the result of each point is written to its own
+file as soon as it is available, keyed by the network, the evaluation
+parameters and the point, so an interrupted or extended sweep only evaluates
+the missing points.
+
+Instead of a uniform grid, :obj:`adaptive_sweep` refines a single axis only
+where the plotted widths and colors change, or a reaction changes its
+direction, between neighbouring points.
+"""
+
+import hashlib
+import json
+import os
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain, product, starmap
+from math import inf, isfinite, log
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+from ..chemistry import (
+    ChemCfg
+    , ThermoTable
+    , build_chemcfgs
+    , build_thermo_table
+    , eval_rates
+    , free_energies
+    , minmax
+    , normalizer
+    , thermo_network
+    , update_ktable
+)
+from ..struct import Network, Reaction, relink_reactions
+from .ode import (
+    MassAction
+    , Trajectory
+    , build_mass_action
+    , compound_positions
+    , initial_conc
+    , integrate_ros2
+    , reduce_system
+)
+from .pool import get_problem, run_pool_unordered
+from .steady import SteadyState, solve_steady_state
+
+
+type GridQuantity = Literal["rates", "steady", "trajectory"]
+
+# Default relative and absolute tolerances of each quantity, those of
+# solve_steady_state and integrate_ros2
+DEF_TOLS: dict[str, tuple[float, float]] = {
+    "rates": (0., 0.)
+    , "steady": (1e-8, 1e-15)
+    , "trajectory": (1e-6, 1e-11)
+}
+
+
+class GridPoint(NamedTuple):
+    """Point of a parameter grid.
+
+    Attributes:
+        cfg (:obj:`ChemCfg`): Chemical configuration, with the temperature of
+            the point.
+        c0 (tuple of float): Initial concentration of each compound,
+            following the order of :attr:`Network.compounds`, including the
+            pressures of the fixed compounds.
+    """
+    cfg: ChemCfg
+    c0: tuple[float, ...]
+
+
+class SweepGrid(NamedTuple):
+    """Cartesian grid of parameters.
+
+    Attributes:
+        axes (tuple of (str, tuple of float)): Name and values of each axis,
+            "T" for the temperatures and the compound names for the
+            concentrations and pressures.
+        points (tuple of :obj:`GridPoint`): Points of the grid, the last axis
+            varying the fastest.
+        fixed (tuple of int): Position of the compounds held constant, i.e.
+            the pressure axes.
+    """
+    axes: tuple[tuple[str, tuple[float, ...]], ...]
+    points: tuple[GridPoint, ...]
+    fixed: tuple[int, ...]
+
+
+class PointResult(NamedTuple):
+    """Evaluation of a grid point.
+
+    Attributes:
+        point (:obj:`GridPoint`): Evaluated point.
+        c (array of float): Concentrations of the compounds: the initial ones
+            for "rates", the steady state for "steady" and the final ones for
+            "trajectory".
+        rates (array of float): Net rate of each unique reaction at
+            :attr:`c`.
+        success (bool): False if the steady state or the integration failed.
+    """
+    point: GridPoint
+    c: array
+    rates: array
+    success: bool
+
+
+class SweepResult(NamedTuple):
+    """Results of a parameter sweep.
+
+    Attributes:
+        grid (:obj:`SweepGrid`): Evaluated grid.
+        quantity (str): Evaluated quantity.
+        reactions (tuple of :obj:`Reaction`): Unique reactions of the rates,
+            see :obj:`unique_reactions`.
+        results (tuple of :obj:`PointResult`): Result of each point of the
+            grid, in the same order.
+        evaluated (int): Number of points evaluated, i.e. not loaded from the
+            cache.
+    """
+    grid: SweepGrid
+    quantity: str
+    reactions: tuple[Reaction, ...]
+    results: tuple[PointResult, ...]
+    evaluated: int
+
+
+def build_grid(
+    nw: Network
+    , Ts: Iterable[float]
+    , concs: Mapping[str, Iterable[float]] | None = None
+    , pressures: Mapping[str, Iterable[float]] | None = None
+    , e_units: str = "eV"
+    , kb: float | None = None
+    , h: float | None = None
+    , A: float | None = None
+) -> SweepGrid:
+    """Build the Cartesian grid of temperatures, initial concentrations and
+    pressures of a network. The compounds without axis keep the
+    concentration of the network.
+
+    Args:
+        nw (:obj:`Network`): Network to sweep.
+        Ts (iterable of float): Temperatures in Kelvin.
+        concs (mapping of str to iterable of float or None, optional):
+            Initial concentrations of each swept compound, by name. Defaults
+            to None.
+        pressures (mapping of str to iterable of float or None, optional):
+            Pressures of each swept compound, held constant. Defaults to None.
+        e_units (str, optional): Energy units. Defaults to "eV".
+        kb (float or None, optional): Boltzmann constant, see
+            :obj:`build_chemcfgs`. Defaults to None.
+        h (float or None, optional): Planck constant, see
+            :obj:`build_chemcfgs`. Defaults to None.
+        A (float or None, optional): Constant pre-exponential factor. If None,
+            it will be computed at each temperature. Defaults to None.
+
+    Returns:
+        :obj:`SweepGrid` with the points of the grid.
+
+    Raises:
+        :obj:`ValueError`: If a compound is not in the network, it has both a
+            concentration and a pressure axis, or an axis is empty.
+    """
+    c_axes: dict[str, tuple[float, ...]] = {
+        k: tuple(v) for k, v in (concs or {}).items()}
+    p_axes: dict[str, tuple[float, ...]] = {
+        k: tuple(v) for k, v in (pressures or {}).items()}
+    if set(c_axes) & set(p_axes):
+        raise ValueError("Compounds with concentration and pressure axes")
+    cfgs: tuple[ChemCfg, ...] = build_chemcfgs(Ts, e_units, kb, h, A)
+    axes: tuple[tuple[str, tuple[float, ...]], ...] = (
+        (("T", tuple(c.T for c in cfgs)),)
+        + tuple(c_axes.items()) + tuple(p_axes.items()))
+    if not all(vs for _, vs in axes):
+        raise ValueError("Empty grid axis")
+    pos: tuple[int, ...] = compound_positions(nw, chain(c_axes, p_axes))
+    base: tuple[float, ...] = tuple(initial_conc(nw))
+
+    def point(cfg: ChemCfg, xs: tuple[float, ...]) -> GridPoint:
+        c0: list[float] = list(base)
+        for i, x in zip(pos, xs):
+            c0[i] = x
+        return GridPoint(cfg, tuple(c0))
+
+    xss: Iterator[tuple[float, ...]] = product(*(vs for _, vs in axes[1:]))
+    return SweepGrid(
+        axes=axes
+        , points=tuple(starmap(point, product(cfgs, xss)))
+        , fixed=pos[len(c_axes):])
+
+
+class _Problem(NamedTuple):
+    """Data shared by all the points."""
+    m: MassAction
+    tt: ThermoTable | None
+    fixed: tuple[int, ...]
+    quantity: str
+    t_end: float
+    rtol: float
+    atol: float
+    max_iter: int
+
+
+def _point_model(
+    p: _Problem
+    , cfg: ChemCfg
+) -> MassAction:
+    """Model at the temperature of a point, with the free energies at that
+    temperature if the network has polynomials."""
+    if p.tt is None:
+        return p.m._replace(engine=update_ktable(p.m.engine, chem_cfg=cfg))
+    c_es, r_es = free_energies(p.tt, (cfg.T,))
+    return p.m._replace(engine=update_ktable(
+        p.m.engine
+        , c_energies=[e[0] for e in c_es]
+        , r_energies=[e[0] for e in r_es]
+        , chem_cfg=cfg))
+
+
+def _evaluate(
+    pt: GridPoint
+) -> tuple[array, array, bool]:
+    p: _Problem = get_problem(_Problem)
+    m: MassAction = _point_model(p, pt.cfg)
+    c: Sequence[float] = pt.c0
+    success: bool = True
+    if p.quantity == "steady":
+        ss: SteadyState = solve_steady_state(
+            m, pt.c0, reduce_system(m, pt.c0, p.fixed), p.rtol, p.atol
+            , p.max_iter)
+        c, success = ss.c, ss.success
+    elif p.quantity == "trajectory":
+        tr: Trajectory = integrate_ros2(
+            m, pt.c0, (0., p.t_end), p.rtol, p.atol
+            , red=reduce_system(m, pt.c0, p.fixed))
+        c, success = tr.y[-1], tr.success
+    return (array('d', c), eval_rates(m.engine, c).net, success)
+
+
+def _network_key(
+    nw: Network
+) -> list:
+    """JSON serializable description of the energies and the topology of a
+    network."""
+    return [
+        [(c.name, c.energy, c.g_coefs) for c in nw.compounds]
+        , [(r.name, [[c.name for c in xs] for xs in r.compounds], r.energy
+            , r.g_coefs) for r in nw.reactions]]
+
+
+def point_key(
+    nw: Network
+    , pt: GridPoint
+    , quantity: str
+    , params: Sequence[float]
+) -> str:
+    """Cache key of a grid point.
+
+    Args:
+        nw (:obj:`Network`): Swept network.
+        pt (:obj:`GridPoint`): Point of the grid.
+        quantity (str): Evaluated quantity.
+        params (sequence of float): Parameters of the evaluation, e.g. the
+            tolerances.
+
+    Returns:
+        str with the sha256 hex digest of the network, the evaluation and the
+        point.
+    """
+    return hashlib.sha256(json.dumps([
+        _network_key(nw), quantity, list(params), list(pt.cfg), list(pt.c0)
+    ]).encode()).hexdigest()
+
+
+def _load(
+    path: Path
+) -> tuple[array, array, bool] | None:
+    try:
+        d: dict = json.loads(path.read_text())
+        return (array('d', d["c"]), array('d', d["rates"]), d["success"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _store(
+    path: Path
+    , res: tuple[array, array, bool]
+) -> None:
+    """Write a result atomically, so an interrupted write is not read as a
+    valid result."""
+    tmp: Path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(
+        {"c": list(res[0]), "rates": list(res[1]), "success": res[2]}))
+    os.replace(tmp, path)
+
+
+def evaluate_points(
+    nw: Network
+    , points: Sequence[GridPoint]
+    , quantity: GridQuantity = "steady"
+    , fixed: Iterable[int] = ()
+    , t_end: float | None = None
+    , rtol: float | None = None
+    , atol: float | None = None
+    , max_iter: int = 500
+    , cache_dir: str | Path | None = None
+    , max_workers: int | None = None
+) -> tuple[tuple[PointResult, ...], int]:
+    """Evaluate arbitrary points of a parameter space, not necessarily a
+    grid, e.g. the refinements of :obj:`adaptive_sweep`.
+
+    Args:
+        nw (:obj:`Network`): Network to evaluate. If it has free energy
+            polynomials (see :attr:`Compound.g_coefs`), the energies are
+            evaluated at the temperature of each point.
+        points (sequence of :obj:`GridPoint`): Points to evaluate.
+        quantity (str, optional): Evaluated quantity, "rates", "steady" or
+            "trajectory", see :obj:`run_sweep`. Defaults to "steady".
+        fixed (iterable of int, optional): Position of the compounds held
+            constant at every point, e.g. :attr:`SweepGrid.fixed`. Defaults to
+            ().
+        t_end (float or None, optional): Final time of the trajectories.
+            Defaults to None.
+        rtol (float or None, optional): Relative tolerance. If None, the
+            default of the quantity is used (see :obj:`DEF_TOLS`). Defaults to
+            None.
+        atol (float or None, optional): Absolute tolerance. If None, the
+            default of the quantity is used. Defaults to None.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        cache_dir (str or :obj:`Path` or None, optional): Directory storing
+            the result of each point. The points already stored are not
+            evaluated again. If None, nothing is stored. Defaults to None.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, the points are evaluated in the current process. If None, the
+            number of processors is used. Defaults to None.
+
+    Returns:
+        tuple of the form (results, evaluated), with the result of each
+        point and the number of points that were not found in the cache.
+
+    Raises:
+        :obj:`ValueError`: If the quantity is unknown or t_end is missing for
+            trajectories.
+    """
+    if quantity not in ("rates", "steady", "trajectory"):
+        raise ValueError(f"Unknown quantity {quantity}")
+    # Only the parameters used by the quantity are part of the cache key
+    t: float = inf
+    if quantity == "trajectory":
+        if t_end is None:
+            raise ValueError("t_end is required for trajectories")
+        t = t_end
+    rtol = DEF_TOLS[quantity][0] if rtol is None else rtol
+    atol = DEF_TOLS[quantity][1] if atol is None else atol
+    params: tuple[float, ...] = (t, rtol, atol, max_iter, *sorted(fixed))
+    m: MassAction = build_mass_action(nw)
+    thermo: bool = any(
+        x.g_coefs is not None for x in chain(nw.compounds, nw.reactions))
+    problem: _Problem = _Problem(
+        m
+        , build_thermo_table(nw, m.engine.reactions) if thermo else None
+        , tuple(fixed), quantity, t, rtol, atol, max_iter)
+
+    out: list[tuple[array, array, bool] | None] = [None] * len(points)
+    paths: list[Path] | None = None
+    if cache_dir is not None:
+        root: Path = Path(cache_dir)
+        root.mkdir(parents=True, exist_ok=True)
+        paths = [
+            root / f"{point_key(nw, pt, quantity, params)}.json"
+            for pt in points]
+        out = list(map(_load, paths))
+    todo: list[int] = [i for i, x in enumerate(out) if x is None]
+    for j, res in run_pool_unordered(
+            _evaluate, problem, [points[i] for i in todo], max_workers):
+        i: int = todo[j]
+        out[i] = res
+        if paths is not None:
+            _store(paths[i], res)
+    results: list[PointResult] = []
+    for pt, res in zip(points, out):
+        assert res is not None
+        results.append(PointResult(pt, *res))
+    return (tuple(results), len(todo))
+
+
+def run_sweep(
+    nw: Network
+    , grid: SweepGrid
+    , quantity: GridQuantity = "steady"
+    , t_end: float | None = None
+    , rtol: float | None = None
+    , atol: float | None = None
+    , max_iter: int = 500
+    , cache_dir: str | Path | None = None
+    , max_workers: int | None = None
+) -> SweepResult:
+    """Evaluate a network at every point of a parameter grid.
+
+    Args:
+        nw (:obj:`Network`): Network to sweep. If it has free energy
+            polynomials (see :attr:`Compound.g_coefs`), the energies are
+            evaluated at the temperature of each point.
+        grid (:obj:`SweepGrid`): Grid of parameters, see :obj:`build_grid`.
+        quantity (str, optional): Evaluated quantity: "rates" for the net
+            rates at the initial concentrations, "steady" for the steady
+            state and "trajectory" for the concentrations at t_end. Defaults
+            to "steady".
+        t_end (float or None, optional): Final time of the trajectories.
+            Defaults to None.
+        rtol (float or None, optional): Relative tolerance of the steady
+            states or the integrations. If None, the default of the quantity
+            is used (see :obj:`DEF_TOLS`). Defaults to None.
+        atol (float or None, optional): Absolute tolerance of the steady
+            states or the integrations. If None, the default of the quantity
+            is used. Defaults to None.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        cache_dir (str or :obj:`Path` or None, optional): Directory storing
+            the result of each point. The points already stored are not
+            evaluated again. If None, nothing is stored. Defaults to None.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, the points are evaluated in the current process. If None, the
+            number of processors is used. Defaults to None.
+
+    Returns:
+        :obj:`SweepResult` with the result of each point.
+
+    Raises:
+        :obj:`ValueError`: If the quantity is unknown or t_end is missing for
+            trajectories.
+    """
+    results, evaluated = evaluate_points(
+        nw, grid.points, quantity, grid.fixed, t_end, rtol, atol, max_iter
+        , cache_dir, max_workers)
+    return SweepResult(
+        grid=grid
+        , quantity=quantity
+        , reactions=build_mass_action(nw).engine.reactions
+        , results=results
+        , evaluated=evaluated)
+
+
+def point_network(
+    nw: Network
+    , res: PointResult
+) -> tuple[Network, ChemCfg]:
+    """Network at a grid point, with the concentrations of the result and the
+    free energies at its temperature, and the chemical configuration of the
+    point, ready for the plotters, e.g. :obj:`kinetic.build_dotgraph`.
+
+    Args:
+        nw (:obj:`Network`): Swept network.
+        res (:obj:`PointResult`): Result of a point.
+
+    Returns:
+        tuple of the form (network, chemical configuration).
+    """
+    if any(x.g_coefs is not None for x in chain(nw.compounds, nw.reactions)):
+        nw = thermo_network(nw, res.point.cfg.T)
+    cs = tuple(c._replace(conc=x) for c, x in zip(nw.compounds, res.c))
+    return (
+        Network(compounds=cs, reactions=relink_reactions(nw.reactions, cs))
+        , res.point.cfg)
+
+
+class Frame(NamedTuple):
+    """Plotted values of a point of a sweep, as drawn by
+    :obj:`kinetic.build_dotgraph`: each value is normalized over the point.
+
+    Attributes:
+        colors (tuple of float): Normalized concentration of each compound,
+            which selects the color of its node.
+        widths (tuple of float): Normalized absolute net rate of each unique
+            reaction, which sets the width of its edge.
+        signs (tuple of int): Sign of the net rate of each unique reaction,
+            the direction of its arrow. Reactions without net rate have no
+            direction and their sign is 0.
+    """
+    colors: tuple[float, ...]
+    widths: tuple[float, ...]
+    signs: tuple[int, ...]
+
+
+def point_frame(
+    res: PointResult
+    , log_scale: bool = False
+) -> Frame:
+    """Normalized colors, widths and directions of a point result.
+
+    Args:
+        res (:obj:`PointResult`): Result of a point.
+        log_scale (bool, optional): If True, the widths are normalized on the
+            logarithm of the absolute net rates, as with
+            :attr:`EdgeCfg.log_scale`. Defaults to False.
+
+    Returns:
+        :obj:`Frame` of the point.
+    """
+    xs: tuple[float, ...] = tuple(map(abs, res.rates))
+    if log_scale:
+        xs = tuple(log(x) if x > 0. else -inf for x in xs)
+    finite: tuple[float, ...] = tuple(filter(isfinite, xs))
+    w_norm = normalizer(*minmax(finite)) if finite else lambda x: 0.
+    c_norm = normalizer(*minmax(res.c)) if res.c else lambda x: 0.
+    return Frame(
+        colors=tuple(map(c_norm, res.c))
+        , widths=tuple(map(w_norm, xs))
+        , signs=tuple((x > 0.) - (x < 0.) for x in res.rates))
+
+
+def frame_change(
+    a: Frame
+    , b: Frame
+) -> float:
+    """Change of the plot between two frames.
+
+    Args:
+        a (:obj:`Frame`): First frame.
+        b (:obj:`Frame`): Second frame.
+
+    Returns:
+        float with the maximum change of a normalized color or width, or
+        infinity if a reaction changes its direction. Reactions at
+        equilibrium in one of the frames do not change their direction.
+    """
+    if any(x * y < 0 for x, y in zip(a.signs, b.signs)):
+        return inf
+    return max(
+        (abs(x - y) for x, y in chain(
+            zip(a.colors, b.colors), zip(a.widths, b.widths)))
+        , default=0.)
+
+
+def adaptive_sweep(
+    nw: Network
+    , Ts: Iterable[float]
+    , concs: Mapping[str, Iterable[float]] | None = None
+    , pressures: Mapping[str, Iterable[float]] | None = None
+    , axis: str = "T"
+    , quantity: GridQuantity = "steady"
+    , tol: float = 0.05
+    , log_scale: bool = False
+    , min_step: float | None = None
+    , max_points: int = 129
+    , t_end: float | None = None
+    , rtol: float | None = None
+    , atol: float | None = None
+    , max_iter: int = 500
+    , e_units: str = "eV"
+    , kb: float | None = None
+    , h: float | None = None
+    , A: float | None = None
+    , cache_dir: str | Path | None = None
+    , max_workers: int | None = None
+) -> SweepResult:
+    """Sweep a network along one axis, refining it where the plot changes.
+    The values of the axis are the initial grid. At each round, the
+    intervals whose ends differ by more than tol (see :obj:`frame_change`)
+    are bisected, and all the new midpoints are evaluated together, until no
+    interval is refined.
+
+    Args:
+        nw (:obj:`Network`): Network to sweep.
+        Ts (iterable of float): Temperatures in Kelvin.
+        concs (mapping of str to iterable of float or None, optional):
+            Initial concentrations of the swept compounds, by name. Defaults
+            to None.
+        pressures (mapping of str to iterable of float or None, optional):
+            Pressures of the swept compounds, held constant. Defaults to None.
+        axis (str, optional): Refined axis, "T" or the name of a compound of
+            concs or pressures. The other axes must have a single value.
+            Defaults to "T".
+        quantity (str, optional): Evaluated quantity, see :obj:`run_sweep`.
+            Defaults to "steady".
+        tol (float, optional): Maximum change of a normalized color or width
+            between neighbouring points. Defaults to 0.05.
+        log_scale (bool, optional): If True, the widths are normalized on the
+            logarithm of the rates (see :obj:`point_frame`). Defaults to
+            False.
+        min_step (float or None, optional): Intervals shorter than this are
+            not refined. If None, 1/64 of the smallest initial interval is
+            used. Defaults to None.
+        max_points (int, optional): Maximum number of points. When a round
+            would exceed it, the intervals with the largest change are
+            refined first. Defaults to 129.
+        t_end (float or None, optional): Final time of the trajectories.
+            Defaults to None.
+        rtol (float or None, optional): Relative tolerance, see
+            :obj:`run_sweep`. Defaults to None.
+        atol (float or None, optional): Absolute tolerance, see
+            :obj:`run_sweep`. Defaults to None.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        e_units (str, optional): Energy units. Defaults to "eV".
+        kb (float or None, optional): Boltzmann constant, see
+            :obj:`build_chemcfgs`. Defaults to None.
+        h (float or None, optional): Planck constant, see
+            :obj:`build_chemcfgs`. Defaults to None.
+        A (float or None, optional): Constant pre-exponential factor. If None,
+            it will be computed at each temperature. Defaults to None.
+        cache_dir (str or :obj:`Path` or None, optional): Directory storing
+            the result of each point, see :obj:`run_sweep`. Defaults to None.
+        max_workers (int or None, optional): Number of worker processes, see
+            :obj:`run_sweep`. Defaults to None.
+
+    Returns:
+        :obj:`SweepResult` with the points sorted along the axis. Its grid
+        has a single axis, with all the evaluated values.
+
+    Raises:
+        :obj:`ValueError`: If the axis is not found, it has less than two
+            values or another axis has more than one value, or for the errors
+            of :obj:`build_grid` and :obj:`run_sweep`.
+    """
+    Ts = tuple(Ts)
+    c_axes: dict[str, tuple[float, ...]] = {
+        k: tuple(v) for k, v in (concs or {}).items()}
+    p_axes: dict[str, tuple[float, ...]] = {
+        k: tuple(v) for k, v in (pressures or {}).items()}
+
+    def axis_grid(xs: Iterable[float]) -> SweepGrid:
+        xs = tuple(xs)
+
+        def sub(axes: dict[str, tuple[float, ...]]) -> dict:
+            return {k: xs if k == axis else v for k, v in axes.items()}
+
+        return build_grid(
+            nw, xs if axis == "T" else Ts, sub(c_axes), sub(p_axes), e_units
+            , kb, h, A)
+
+    grid: SweepGrid = build_grid(
+        nw, Ts, c_axes, p_axes, e_units, kb, h, A)
+    names: tuple[str, ...] = tuple(name for name, _ in grid.axes)
+    if axis not in names:
+        raise ValueError(f"Axis {axis} not found")
+    xs: list[float] = sorted(set(dict(grid.axes)[axis]))
+    if len(xs) < 2:
+        raise ValueError(f"Axis {axis} needs at least two values")
+    if len(grid.points) != len(dict(grid.axes)[axis]):
+        raise ValueError("Only the refined axis can have several values")
+    if min_step is None:
+        min_step = min(b - a for a, b in zip(xs, xs[1:])) / 64.
+
+    def evaluate(xs: Sequence[float]) -> tuple[PointResult, ...]:
+        nonlocal evaluated
+        res, n = evaluate_points(
+            nw, axis_grid(xs).points, quantity, grid.fixed, t_end, rtol
+            , atol, max_iter, cache_dir, max_workers)
+        evaluated += n
+        return res
+
+    evaluated: int = 0
+    results: list[PointResult] = list(evaluate(xs))
+    frames: list[Frame] = [point_frame(r, log_scale) for r in results]
+    while len(xs) < max_points:
+        changes: list[tuple[float, int]] = sorted((
+            (-d, i) for i, d in enumerate(starmap(
+                frame_change, zip(frames, frames[1:])))
+            if d > tol and xs[i + 1] - xs[i] > 2. * min_step
+        ))[:max_points - len(xs)]
+        if not changes:
+            break
+        pos: list[int] = sorted(i for _, i in changes)
+        mids: list[float] = [0.5 * (xs[i] + xs[i + 1]) for i in pos]
+        new: tuple[PointResult, ...] = evaluate(mids)
+        # Insert from the end, so the positions are not shifted
+        for i, x, r in reversed(tuple(zip(pos, mids, new))):
+            xs.insert(i + 1, x)
+            results.insert(i + 1, r)
+            frames.insert(i + 1, point_frame(r, log_scale))
+
+    return SweepResult(
+        grid=axis_grid(xs)._replace(axes=((axis, tuple(xs)),))
+        , quantity=quantity
+        , reactions=build_mass_action(nw).engine.reactions
+        , results=tuple(results)
+        , evaluated=evaluated)
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""Analytic sparse Jacobian of the mass-action rate law. The sparsity pattern
+is derived once from the stoichiometry of the reactions, and the values are
+evaluated in place at each step, without finite differences.
+
+The Jacobian is stored in compressed sparse row (CSR) form. Entry (i, k) is
+only present if a reaction changes compound i and has compound k as reactant
+or product, so the pattern of large networks stays sparse.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, NamedTuple
+
+from ..chemistry import RateEngine
+from ..stoich import StoichMatrix
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+
+class JacobianPattern(NamedTuple):
+    """Fixed sparsity pattern of a mass-action Jacobian, together with the
+    plan used to fill its values.
+
+    Attributes:
+        shape (tuple of two int): Number of compounds in both dimensions.
+        indptr (array of int): Offsets of each row in :attr:`indices`.
+        indices (array of int): Column of each stored entry.
+        p_ptr (array of int): Offsets of the participants of each reaction
+            in :attr:`p_col`.
+        p_col (array of int): Unique participants (columns) of each reaction.
+        t_ptr (array of int): Offsets of the terms of each reaction in
+            :attr:`t_slot`, :attr:`t_coef` and :attr:`t_par`.
+        t_slot (array of int): Position in the data array of each term.
+        t_coef (array of int): Stoichiometric coefficient of each term.
+        t_par (array of int): Position of the participant of each term in the
+            participants of its reaction.
+    """
+    shape: tuple[int, int]
+    indptr: array
+    indices: array
+    p_ptr: array
+    p_col: array
+    t_ptr: array
+    t_slot: array
+    t_coef: array
+    t_par: array
+
+
+def build_jacobian_pattern(
+    eng: RateEngine
+    , s: StoichMatrix
+) -> JacobianPattern:
+    """Build the sparsity pattern and the evaluation plan of the Jacobian of
+    a mass-action system.
+
+    Args:
+        eng (:obj:`RateEngine`): Engine with the reactions of the system.
+        s (:obj:`StoichMatrix`): Stoichiometric matrix of the reactions of the
+            engine, in CSC format.
+
+    Returns:
+        :obj:`JacobianPattern` of the system.
+
+    Raises:
+        :obj:`ValueError`: If the matrix is not in CSC format or its columns do
+            not match the reactions of the engine.
+    """
+    if s.fmt != "csc" or s.shape[1] != len(eng.reactions):
+        raise ValueError(
+            "A CSC stoichiometric matrix of the engine reactions is required")
+    n: int = s.shape[0]
+    parts: list[list[int]] = []
+    rows: list[set[int]] = [set() for _ in range(n)]
+    for j in range(len(eng.reactions)):
+        ps: list[int] = list(dict.fromkeys(
+            list(eng.l_idx[eng.l_ptr[j]:eng.l_ptr[j + 1]])
+            + list(eng.r_idx[eng.r_ptr[j]:eng.r_ptr[j + 1]])))
+        parts.append(ps)
+        for p in range(s.indptr[j], s.indptr[j + 1]):
+            rows[s.indices[p]].update(ps)
+
+    indptr: array = array('q', [0])
+    indices: array = array('q')
+    slot: dict[tuple[int, int], int] = {}
+    for i, cols in enumerate(rows):
+        for k in sorted(cols):
+            slot[(i, k)] = len(indices)
+            indices.append(k)
+        indptr.append(len(indices))
+
+    p_ptr: array = array('q', [0])
+    p_col: array = array('q')
+    t_ptr: array = array('q', [0])
+    t_slot: array = array('q')
+    t_coef: array = array('q')
+    t_par: array = array('q')
+    for j, ps in enumerate(parts):
+        p_col.extend(ps)
+        p_ptr.append(len(p_col))
+        for p in range(s.indptr[j], s.indptr[j + 1]):
+            for q, k in enumerate(ps):
+                t_slot.append(slot[(s.indices[p], k)])
+                t_coef.append(s.data[p])
+                t_par.append(q)
+        t_ptr.append(len(t_slot))
+    return JacobianPattern(
+        shape=(n, n), indptr=indptr, indices=indices, p_ptr=p_ptr
+        , p_col=p_col, t_ptr=t_ptr, t_slot=t_slot, t_coef=t_coef
+        , t_par=t_par)
+
+
+def _side_partials(
+    k: float
+    , c: Sequence[float]
+    , idx: Sequence[int]
+    , sign: float
+    , pos: Mapping[int, int]
+    , out: list[float]
+) -> None:
+    """Add the partial derivatives of k times the product of the
+    concentrations of idx to out, indexed by the position of each compound
+    given by pos. Each occurrence of a repeated compound contributes once,
+    which yields the derivative of the corresponding power."""
+    for p, i in enumerate(idx):
+        x: float = sign * k
+        for q, jj in enumerate(idx):
+            if q != p:
+                x *= c[jj]
+        out[pos[i]] += x
+
+
+def eval_jacobian(
+    pat: JacobianPattern
+    , eng: RateEngine
+    , c: Sequence[float]
+    , out: array | None = None
+) -> array:
+    """Evaluate the values of the Jacobian of a mass-action system.
+
+    Args:
+        pat (:obj:`JacobianPattern`): Pattern of the system.
+        eng (:obj:`RateEngine`): Engine used to build the pattern, providing
+            the kinetic constants.
+        c (sequence of float): Concentration vector.
+        out (array of float or None, optional): Data array to fill in place,
+            with the length of :attr:`JacobianPattern.indices`. If None, a new
+            one will be allocated. Defaults to None.
+
+    Returns:
+        array of float with the values of the stored entries, following
+        :attr:`JacobianPattern.indices`.
+    """
+    if out is None:
+        out = array('d', [0.]) * len(pat.indices)
+    else:
+        for p in range(len(out)):
+            out[p] = 0.
+    kf: array = eng.kt.kf
+    kr: array = eng.kt.kr
+    for j in range(len(pat.p_ptr) - 1):
+        pos: dict[int, int] = {
+            x: q for q, x in enumerate(
+                pat.p_col[pat.p_ptr[j]:pat.p_ptr[j + 1]])}
+        d: list[float] = [0.] * len(pos)
+        _side_partials(
+            kf[j], c, eng.l_idx[eng.l_ptr[j]:eng.l_ptr[j + 1]], 1., pos, d)
+        _side_partials(
+            kr[j], c, eng.r_idx[eng.r_ptr[j]:eng.r_ptr[j + 1]], -1., pos, d)
+        for t in range(pat.t_ptr[j], pat.t_ptr[j + 1]):
+            out[pat.t_slot[t]] += pat.t_coef[t] * d[pat.t_par[t]]
+    return out
+
+
+def jacobian_to_dense(
+    pat: JacobianPattern
+    , data: Sequence[float]
+) -> list[list[float]]:
+    """Expand the values of a Jacobian into a list of rows.
+
+    Args:
+        pat (:obj:`JacobianPattern`): Pattern of the Jacobian.
+        data (sequence of float): Values of the stored entries.
+
+    Returns:
+        list of lists of float with the shape of the Jacobian.
+    """
+    out: list[list[float]] = [[0.] * pat.shape[1] for _ in range(pat.shape[0])]
+    for i, row in enumerate(out):
+        for p in range(pat.indptr[i], pat.indptr[i + 1]):
+            row[pat.indices[p]] = data[p]
+    return out
+
+
+def jacobian_to_scipy(
+    pat: JacobianPattern
+    , data: Sequence[float]
+) -> Any:
+    """Convert the values of a Jacobian into a SciPy CSR matrix, sharing the
+    pattern buffers.
+
+    Args:
+        pat (:obj:`JacobianPattern`): Pattern of the Jacobian.
+        data (sequence of float): Values of the stored entries.
+
+    Returns:
+        :obj:`scipy.sparse.csr_matrix` with the Jacobian.
+
+    Raises:
+        :obj:`ImportError`: If SciPy is not installed.
+    """
+    if sparse is None or np is None:
+        raise ImportError("SciPy is required to convert the Jacobian")
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=float)
+         , np.frombuffer(pat.indices, dtype=np.int64)
+         , np.frombuffer(pat.indptr, dtype=np.int64))
+        , shape=pat.shape)
+
+
+def jacobian_sparsity(
+    pat: JacobianPattern
+) -> Any:
+    """Sparsity structure of a Jacobian, as expected by the jac_sparsity
+    argument of :obj:`scipy.integrate.solve_ivp`.
+
+    Args:
+        pat (:obj:`JacobianPattern`): Pattern of the Jacobian.
+
+    Returns:
+        :obj:`scipy.sparse.csr_matrix` with ones at the stored entries.
+
+    Raises:
+        :obj:`ImportError`: If SciPy is not installed.
+    """
+    return jacobian_to_scipy(pat, array('d', [1.]) * len(pat.indices))
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""Stochastic kinetics of a network with the Gillespie direct method (kinetic
+Monte Carlo). Every unique reaction contributes a forward and a reverse
+channel, as in the mass-action model (see :obj:`build_mass_action`), and the
+state is the number of molecules of each compound in a volume.
+
+After each event only the propensities of the channels whose reactants
+changed are recomputed, following a dependency graph built once, and the
+channels are selected in logarithmic time with a Fenwick tree of partial
+sums. Snapshots are streamed at the requested times, so the events are never
+stored.
+"""
+
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from math import log
+from random import Random
+from typing import NamedTuple
+
+from ..chemistry import (
+    ChemCfg
+    , RateEngine
+    , build_rate_engine
+    , unique_reactions
+)
+from ..stoich import StoichMatrix, build_stoich_matrix
+from ..struct import Network, Reaction, relink_reactions
+from .ode import initial_conc
+
+
+class KmcModel(NamedTuple):
+    """Reaction channels of a network for stochastic simulations. Channel 2j
+    is the forward direction of reaction j of the engine and channel 2j + 1
+    the reverse one.
+
+    Attributes:
+        engine (:obj:`RateEngine`): Engine with the reactions and the kinetic
+            constants.
+        omega (float): Volume factor, number of molecules per concentration
+            unit.
+        reactants (tuple of tuples): Pairs of compound and multiplicity of
+            the reactants of each channel.
+        changes (tuple of tuples): Pairs of compound and count change of each
+            channel, skipping the fixed compounds.
+        deps (tuple of tuples of int): Channels whose propensity changes
+            after each channel fires, including itself.
+        c_stoch (array of float): Stochastic rate constant of each channel.
+    """
+    engine: RateEngine
+    omega: float
+    reactants: tuple[tuple[tuple[int, int], ...], ...]
+    changes: tuple[tuple[tuple[int, int], ...], ...]
+    deps: tuple[tuple[int, ...], ...]
+    c_stoch: array
+
+
+class KmcSnapshot(NamedTuple):
+    """State of a stochastic simulation at a given time.
+
+    Attributes:
+        t (float): Time of the snapshot.
+        counts (array of int): Number of molecules of each compound, following
+            the order of :attr:`Network.compounds`.
+        events (int): Number of events since the start of the simulation.
+    """
+    t: float
+    counts: array
+    events: int
+
+
+def build_kmc_model(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , omega: float = 1e3
+    , rs: Sequence[Reaction] | None = None
+    , fixed: Iterable[int] = ()
+) -> KmcModel:
+    """Build the reaction channels and the dependency graph of a network.
+
+    Args:
+        nw (:obj:`Network`): Network with the compounds and the reactions.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        omega (float, optional): Number of molecules per concentration unit.
+            Defaults to 1e3.
+        rs (sequence of :obj:`Reaction` or None, optional): Reversible
+            reactions of the model. If None, the unique reactions of the
+            network will be used (see :obj:`unique_reactions`). Defaults to
+            None.
+        fixed (iterable of int, optional): Compounds whose number of
+            molecules is held constant, e.g. reservoirs. Defaults to ().
+
+    Returns:
+        :obj:`KmcModel` of the network.
+    """
+    rs = unique_reactions(nw.reactions) if rs is None else tuple(rs)
+    eng: RateEngine = build_rate_engine(nw, chem_cfg, rs)
+    s: StoichMatrix = build_stoich_matrix(nw, rs, "csc")
+    keep: set[int] = set(range(len(nw.compounds))) - set(fixed)
+    reactants: list[tuple[tuple[int, int], ...]] = []
+    changes: list[tuple[tuple[int, int], ...]] = []
+    c_stoch: array = array('d')
+    for j in range(len(rs)):
+        fwd: tuple[tuple[int, int], ...] = tuple(sorted(Counter(
+            eng.l_idx[eng.l_ptr[j]:eng.l_ptr[j + 1]]).items()))
+        rev: tuple[tuple[int, int], ...] = tuple(sorted(Counter(
+            eng.r_idx[eng.r_ptr[j]:eng.r_ptr[j + 1]]).items()))
+        delta: tuple[tuple[int, int], ...] = tuple(
+            (s.indices[p], s.data[p])
+            for p in range(s.indptr[j], s.indptr[j + 1])
+            if s.indices[p] in keep)
+        for side, k, sign in (
+                (fwd, eng.kt.kf[j], 1), (rev, eng.kt.kr[j], -1)):
+            reactants.append(side)
+            changes.append(tuple((i, sign * x) for i, x in delta))
+            order: int = sum(x for _, x in side)
+            c_stoch.append(k * omega ** (1 - order))
+
+    consumers: dict[int, list[int]] = {}
+    for ch_i, side in enumerate(reactants):
+        for i, _ in side:
+            consumers.setdefault(i, []).append(ch_i)
+    deps: tuple[tuple[int, ...], ...] = tuple(
+        tuple(sorted(set(
+            q for i, _ in changes[ch_i] for q in consumers.get(i, ()))))
+        for ch_i in range(len(reactants)))
+    return KmcModel(
+        engine=eng, omega=omega, reactants=tuple(reactants)
+        , changes=tuple(changes), deps=deps, c_stoch=c_stoch)
+
+
+def propensity(
+    m: KmcModel
+    , ch: int
+    , counts: Sequence[int]
+) -> float:
+    """Propensity of a channel, as the product of the falling factorials
+    n (n - 1) ... of the counts of its reactants, consistent with the
+    mass-action constants of :attr:`KmcModel.c_stoch`.
+
+    Args:
+        m (:obj:`KmcModel`): Model of the channel.
+        ch (int): Channel index.
+        counts (sequence of int): Number of molecules of each compound.
+
+    Returns:
+        float with the propensity of the channel.
+    """
+    a: float = m.c_stoch[ch]
+    for i, x in m.reactants[ch]:
+        n: int = counts[i]
+        for q in range(x):
+            a *= n - q
+        if a <= 0.:
+            return 0.
+    return a
+
+
+def _tree_build(
+    xs: Sequence[float]
+) -> array:
+    """Fenwick tree of partial sums, with 1-based nodes."""
+    tree: array = array('d', [0.]) * (len(xs) + 1)
+    for i, x in enumerate(xs, 1):
+        tree[i] += x
+        p: int = i + (i & -i)
+        if p < len(tree):
+            tree[p] += tree[i]
+    return tree
+
+
+def _tree_add(
+    tree: array
+    , i: int
+    , x: float
+) -> None:
+    i += 1
+    while i < len(tree):
+        tree[i] += x
+        i += i & -i
+
+
+def _tree_find(
+    tree: array
+    , u: float
+) -> int:
+    """Index of the first element whose cumulative sum exceeds u."""
+    pos: int = 0
+    step: int = 1 << (len(tree) - 1).bit_length()
+    while step:
+        nxt: int = pos + step
+        if nxt < len(tree) and tree[nxt] <= u:
+            pos = nxt
+            u -= tree[nxt]
+        step >>= 1
+    return pos
+
+
+def _tree_total(
+    tree: array
+) -> float:
+    i: int = len(tree) - 1
+    total: float = 0.
+    while i > 0:
+        total += tree[i]
+        i -= i & -i
+    return total
+
+
+def simulate_kmc(
+    m: KmcModel
+    , n0: Sequence[int]
+    , t_eval: Sequence[float]
+    , seed: int | None = None
+    , rebuild: int = 1 << 16
+) -> Iterator[KmcSnapshot]:
+    """Simulate a stochastic trajectory with the Gillespie direct method.
+
+    Args:
+        m (:obj:`KmcModel`): Model to simulate.
+        n0 (sequence of int): Initial number of molecules of each compound.
+        t_eval (sequence of float): Increasing times of the snapshots,
+            starting at 0.
+        seed (int or None, optional): Seed of the random number generator.
+            Defaults to None.
+        rebuild (int, optional): Number of events between rebuilds of the
+            partial sums, which discards their rounding errors. Defaults to
+            65536.
+
+    Yields:
+        :obj:`KmcSnapshot` at each time of t_eval. The snapshots after the
+        last possible event repeat the final state.
+    """
+    rng: Random = Random(seed)
+    counts: array = array('q', n0)
+    props: array = array(
+        'd', (propensity(m, ch, counts) for ch in range(len(m.reactants))))
+    tree: array = _tree_build(props)
+    total: float = _tree_total(tree)
+    t: float = 0.
+    events: int = 0
+    for t_out in t_eval:
+        while total > 0.:
+            tau: float = -log(1. - rng.random()) / total
+            if t + tau > t_out:
+                # Memoryless waiting times, the next event is redrawn
+                break
+            ch: int = _tree_find(tree, rng.random() * total)
+            if ch >= len(props) or props[ch] <= 0.:
+                # Rounding error of the partial sums
+                tree = _tree_build(props)
+                total = _tree_total(tree)
+                continue
+            t += tau
+            events += 1
+            for i, x in m.changes[ch]:
+                counts[i] += x
+            for q in m.deps[ch]:
+                a: float = propensity(m, q, counts)
+                _tree_add(tree, q, a - props[q])
+                props[q] = a
+            if events % rebuild == 0:
+                tree = _tree_build(props)
+            total = _tree_total(tree)
+        t = max(t, t_out)
+        yield KmcSnapshot(t=t_out, counts=array('q', counts), events=events)
+
+
+def run_kmc(
+    nw: Network
+    , t_eval: Sequence[float]
+    , chem_cfg: ChemCfg = ChemCfg()
+    , omega: float = 1e3
+    , c0: Sequence[float] | None = None
+    , fixed: Iterable[int] = ()
+    , seed: int | None = None
+) -> Iterator[KmcSnapshot]:
+    """Build the stochastic model of a network and simulate it.
+
+    Args:
+        nw (:obj:`Network`): Network to simulate.
+        t_eval (sequence of float): Increasing times of the snapshots,
+            starting at 0.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        omega (float, optional): Number of molecules per concentration unit.
+            Defaults to 1e3.
+        c0 (sequence of float or None, optional): Initial concentrations,
+            rounded to the nearest number of molecules. If None, the
+            concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        fixed (iterable of int, optional): Compounds whose number of
+            molecules is held constant. Defaults to ().
+        seed (int or None, optional): Seed of the random number generator.
+            Defaults to None.
+
+    Yields:
+        :obj:`KmcSnapshot` at each time of t_eval.
+    """
+    m: KmcModel = build_kmc_model(nw, chem_cfg, omega, fixed=fixed)
+    c0 = initial_conc(nw) if c0 is None else c0
+    yield from simulate_kmc(m, [round(x * omega) for x in c0], t_eval, seed)
+
+
+def kmc_networks(
+    nw: Network
+    , snaps: Iterable[KmcSnapshot]
+    , omega: float
+) -> Iterator[Network]:
+    """Convert the snapshots of a stochastic simulation into networks with
+    the concentrations of the compounds updated, ready for the kinetic
+    plotter. The snapshots are consumed lazily.
+
+    Args:
+        nw (:obj:`Network`): Simulated network.
+        snaps (iterable of :obj:`KmcSnapshot`): Snapshots of the simulation.
+        omega (float): Number of molecules per concentration unit used in the
+            simulation.
+
+    Yields:
+        :obj:`Network` at each snapshot.
+    """
+    for snap in snaps:
+        cs = tuple(
+            c._replace(conc=n / omega)
+            for c, n in zip(nw.compounds, snap.counts))
+        yield Network(cs, relink_reactions(nw.reactions, cs))
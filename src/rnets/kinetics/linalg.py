@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Small dense linear algebra helpers used by the solvers of the kinetics
+package. The LU factorization of SciPy or the solver of NumPy are used when
+available, and a pure Python LU factorization that skips null entries
+otherwise.
+
+Attributes:
+    LUFactor (type): Factorized matrix, see :obj:`lu_factor`.
+"""
+
+import warnings
+from collections.abc import Callable, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy import linalg as sla
+except ImportError:
+    sla = None
+
+
+type LUFactor = tuple[
+    list[list[tuple[int, float]]], list[list[tuple[int, float]]]
+    , list[float], list[int]]
+
+
+def lu_factor(
+    a: list[list[float]]
+) -> LUFactor:
+    """In place LU factorization with partial pivoting, skipping the null
+    entries of the pivot rows.
+
+    Args:
+        a (list of lists of float): Square matrix, overwritten during the
+            factorization.
+
+    Returns:
+        :obj:`LUFactor` with the nonzero entries of the strictly lower and
+        upper triangles per row, the diagonal and the row permutation.
+
+    Raises:
+        :obj:`ZeroDivisionError`: If the matrix is singular.
+    """
+    n: int = len(a)
+    piv: list[int] = list(range(n))
+    for k in range(n):
+        p: int = k
+        best: float = abs(a[k][k])
+        for i in range(k + 1, n):
+            v: float = abs(a[i][k])
+            if v > best:
+                p, best = i, v
+        if best == 0.:
+            raise ZeroDivisionError("Singular matrix")
+        if p != k:
+            a[k], a[p] = a[p], a[k]
+            piv[k], piv[p] = piv[p], piv[k]
+        ak: list[float] = a[k]
+        inv: float = 1. / ak[k]
+        nz: list[int] = [jj for jj in range(k + 1, n) if ak[jj] != 0.]
+        for i in range(k + 1, n):
+            ai: list[float] = a[i]
+            f: float = ai[k]
+            if f != 0.:
+                f *= inv
+                ai[k] = f
+                for jj in nz:
+                    ai[jj] -= f * ak[jj]
+    return (
+        [[(jj, a[i][jj]) for jj in range(i) if a[i][jj] != 0.]
+         for i in range(n)]
+        , [[(jj, a[i][jj]) for jj in range(i + 1, n) if a[i][jj] != 0.]
+           for i in range(n)]
+        , [a[i][i] for i in range(n)]
+        , piv)
+
+
+def lu_solve(
+    lu: LUFactor
+    , b: Sequence[float]
+) -> list[float]:
+    """Solve a linear system factorized with :obj:`lu_factor`.
+
+    Args:
+        lu (:obj:`LUFactor`): Factorized matrix.
+        b (sequence of float): Right hand side.
+
+    Returns:
+        list of float with the solution.
+    """
+    low, up, diag, piv = lu
+    x: list[float] = [b[i] for i in piv]
+    for i, row in enumerate(low):
+        for jj, v in row:
+            x[i] -= v * x[jj]
+    for i in range(len(x) - 1, -1, -1):
+        xi: float = x[i]
+        for jj, v in up[i]:
+            xi -= v * x[jj]
+        x[i] = xi / diag[i]
+    return x
+
+
+def dense_solver(
+    a: list[list[float]]
+) -> Callable[[Sequence[float]], list[float]]:
+    """Factorize a square matrix once and build a function solving linear
+    systems with it.
+
+    Args:
+        a (list of lists of float): Square matrix. It may be overwritten.
+
+    Returns:
+        Function taking a right hand side and returning the solution as a list
+        of float.
+
+    Raises:
+        :obj:`ZeroDivisionError`: If the matrix is singular. With NumPy but
+            without SciPy, it is raised by the returned function instead.
+    """
+    if sla is not None and np is not None:
+        asarray = np.asarray
+        lu_solve_sp = sla.lu_solve
+        with warnings.catch_warnings():
+            # Singular matrices are reported by the null pivots below
+            warnings.simplefilter("ignore", sla.LinAlgWarning)
+            lu = sla.lu_factor(asarray(a, dtype=float), check_finite=False)
+        if not lu[0].diagonal().all():
+            raise ZeroDivisionError("Singular matrix")
+        return lambda b: lu_solve_sp(
+            lu, asarray(b, dtype=float), check_finite=False).tolist()
+    if np is not None:
+        asarray = np.asarray
+        a_np = asarray(a, dtype=float)
+        solve = np.linalg.solve
+        error = np.linalg.LinAlgError
+
+        def np_solve(b: Sequence[float]) -> list[float]:
+            try:
+                return solve(a_np, asarray(b, dtype=float)).tolist()
+            except error:
+                raise ZeroDivisionError("Singular matrix") from None
+
+        return np_solve
+    lu_py: LUFactor = lu_factor(a)
+    return lambda b: lu_solve(lu_py, b)
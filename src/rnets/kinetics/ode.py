@@ -0,0 +1,629 @@
+# -*- coding: utf-8 -*-
+"""Mean-field microkinetic model of a reaction network. The mass-action ODE
+system is built directly from a :obj:`Network` and a :obj:`ChemCfg`, treating
+every unique reaction as reversible as in :obj:`calc_net_rate`, and integrated
+with a stiff solver. The compounds made dependent by the conservation laws of
+the network are eliminated first, so only the independent concentrations are
+integrated (see :obj:`reduce_system`).
+
+When SciPy is installed, :obj:`scipy.integrate.solve_ivp` is used with the
+analytic Jacobian. Otherwise, a linearly implicit Rosenbrock method of order 2
+(ROS2) with adaptive step size is used, relying on NumPy for the linear algebra
+when available and on the standard library alone otherwise (see
+:obj:`dense_solver`). When ROS2 is run with SciPy installed, the Jacobian of
+large systems is kept sparse and factorized with
+:obj:`scipy.sparse.linalg.splu`.
+
+Attributes:
+    SolverMethod (type): Possible integration methods.
+    ROS2_GAMMA (float): Gamma coefficient of the ROS2 method.
+    ROS2_SPARSE_SIZE (int): Smallest number of integrated concentrations for
+        which ROS2 uses the sparse LU factorization. Below it, the overhead of
+        the sparse matrices exceeds the cost of the dense factorization.
+"""
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from math import inf, sqrt
+from typing import Any, Literal, NamedTuple
+
+from ..chemistry import (
+    ChemCfg
+    , RateEngine
+    , build_rate_engine
+    , eval_rates
+    , unique_reactions
+)
+from ..stoich import StoichMatrix, build_stoich_matrix
+from ..struct import Network, Reaction, relink_reactions
+from .conservation import (
+    ConservationLaws
+    , Reduction
+    , build_reduction
+    , conservation_laws
+    , expand_vector
+    , reduce_jacobian
+    , reduce_vector
+)
+from .linalg import dense_solver
+from .jacobian import (
+    JacobianPattern
+    , build_jacobian_pattern
+    , eval_jacobian
+    , jacobian_to_dense
+    , jacobian_to_scipy
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy.integrate import solve_ivp
+except ImportError:
+    solve_ivp = None
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+except ImportError:
+    sparse = None
+    splu = None
+
+
+type SolverMethod = Literal["auto", "ros2", "LSODA", "BDF", "Radau"]
+
+ROS2_GAMMA: float = 1. + 1. / sqrt(2.)
+
+ROS2_SPARSE_SIZE: int = 40
+
+
+class MassAction(NamedTuple):
+    """Mass-action ODE system of a network.
+
+    Attributes:
+        engine (:obj:`RateEngine`): Engine evaluating the rates of the unique
+            reactions of the network.
+        stoich (:obj:`StoichMatrix`): Stoichiometric matrix of the reactions
+            of the engine, in CSC format.
+        jac (:obj:`JacobianPattern`): Sparsity pattern of the Jacobian.
+    """
+    engine: RateEngine
+    stoich: StoichMatrix
+    jac: JacobianPattern
+
+
+class Trajectory(NamedTuple):
+    """Solution of a :obj:`MassAction` system.
+
+    Attributes:
+        t (array of float): Output times.
+        y (tuple of array of float): Concentration vector at each output time,
+            following the order of :attr:`Network.compounds`.
+        success (bool): True if the integration reached the final time.
+        message (str): Description of the termination reason.
+        nfev (int): Number of evaluations of the right hand side.
+        njev (int): Number of evaluations of the Jacobian.
+    """
+    t: array
+    y: tuple[array, ...]
+    success: bool
+    message: str
+    nfev: int = 0
+    njev: int = 0
+
+
+def build_mass_action(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , rs: Sequence[Reaction] | None = None
+) -> MassAction:
+    """Build the mass-action ODE system of a network.
+
+    Args:
+        nw (:obj:`Network`): Network with the compounds and the reactions.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        rs (sequence of :obj:`Reaction` or None, optional): Reversible
+            reactions of the model. If None, the unique reactions of the
+            network will be used (see :obj:`unique_reactions`). Defaults to
+            None.
+
+    Returns:
+        :obj:`MassAction` of the network.
+    """
+    rs = unique_reactions(nw.reactions) if rs is None else tuple(rs)
+    eng: RateEngine = build_rate_engine(nw, chem_cfg, rs)
+    s: StoichMatrix = build_stoich_matrix(nw, rs, "csc")
+    return MassAction(
+        engine=eng, stoich=s, jac=build_jacobian_pattern(eng, s))
+
+
+def mass_action_rhs(
+    m: MassAction
+    , c: Sequence[float]
+) -> array:
+    """Evaluate the time derivative of the concentrations.
+
+    Args:
+        m (:obj:`MassAction`): System to evaluate.
+        c (sequence of float): Concentration vector.
+
+    Returns:
+        array of float with the derivative of each concentration.
+    """
+    net: array = eval_rates(m.engine, c).net
+    s: StoichMatrix = m.stoich
+    out: array = array('d', [0.]) * s.shape[0]
+    for j, x in enumerate(net):
+        for p in range(s.indptr[j], s.indptr[j + 1]):
+            out[s.indices[p]] += s.data[p] * x
+    return out
+
+
+def mass_action_jacobian(
+    m: MassAction
+    , c: Sequence[float]
+) -> list[list[float]]:
+    """Evaluate the Jacobian of :obj:`mass_action_rhs` as a dense matrix. See
+    :obj:`eval_jacobian` for the sparse version.
+
+    Args:
+        m (:obj:`MassAction`): System to evaluate.
+        c (sequence of float): Concentration vector.
+
+    Returns:
+        list of rows with the partial derivative of the derivative of each
+        concentration (row) with respect to each concentration (column).
+    """
+    return jacobian_to_dense(m.jac, eval_jacobian(m.jac, m.engine, c))
+
+
+def _linear_solver(
+    jac: Any
+    , h: float
+) -> Callable[[Sequence[float]], list[float]]:
+    """Build a solver of (I - gamma h J) x = b, with J given as a list of rows
+    or as a SciPy sparse matrix."""
+    gh: float = ROS2_GAMMA * h
+    if not isinstance(jac, list):
+        if sparse is None or splu is None or np is None:
+            raise ImportError("SciPy is required to solve sparse systems")
+        try:
+            lu = splu(sparse.identity(jac.shape[0], format="csc") - gh * jac)
+        except RuntimeError:
+            raise ZeroDivisionError("Singular matrix") from None
+        asarray = np.asarray
+        return lambda b: lu.solve(asarray(b, dtype=float)).tolist()
+    return dense_solver([
+        [(1. if i == jj else 0.) - gh * x for jj, x in enumerate(row)]
+        for i, row in enumerate(jac)])
+
+
+def mass_action_system(
+    m: MassAction
+    , red: Reduction | None = None
+) -> tuple[
+    Callable[[Sequence[float]], Sequence[float]]
+    , Callable[[Sequence[float]], list[list[float]]]
+]:
+    """Build the functions evaluating the time derivative and the dense
+    Jacobian of a system, sharing the Jacobian buffer between calls.
+
+    Args:
+        m (:obj:`MassAction`): System to evaluate.
+        red (:obj:`Reduction` or None, optional): Elimination of the dependent
+            compounds. If given, the functions take and return the
+            independent concentrations only. Defaults to None.
+
+    Returns:
+        tuple with the derivative and the Jacobian functions.
+    """
+    data: array = array('d', [0.]) * len(m.jac.indices)
+
+    def jac(y: Sequence[float]) -> list[list[float]]:
+        return jacobian_to_dense(
+            m.jac, eval_jacobian(m.jac, m.engine, y, data))
+
+    if red is None:
+        return (lambda y: mass_action_rhs(m, y)), jac
+
+    def rhs_red(x: Sequence[float]) -> array:
+        return reduce_vector(red, mass_action_rhs(m, expand_vector(red, x)))
+
+    def jac_red(x: Sequence[float]) -> list[list[float]]:
+        return reduce_jacobian(red, jac(expand_vector(red, x)))
+
+    return rhs_red, jac_red
+
+
+def _sparse_jacobian(
+    m: MassAction
+    , red: Reduction | None = None
+) -> Callable[[Sequence[float]], Any]:
+    """Build the Jacobian function of :obj:`mass_action_system` returning
+    SciPy sparse matrices."""
+    if sparse is None or np is None:
+        raise ImportError("SciPy is required to build sparse Jacobians")
+    data: array = array('d', [0.]) * len(m.jac.indices)
+
+    def jac(y: Sequence[float]) -> Any:
+        return jacobian_to_scipy(
+            m.jac, eval_jacobian(m.jac, m.engine, y, data))
+
+    if red is None:
+        return jac
+
+    # Sparse form of reduce_jacobian, J[free] E, with E the derivative of the
+    # full concentrations with respect to the independent ones
+    rows: list[int] = list(red.free)
+    cols: list[int] = list(range(len(red.free)))
+    vals: list[float] = [1.] * len(red.free)
+    for p, cs in zip(red.dependent, red.coefs):
+        for q, w in cs:
+            rows.append(p)
+            cols.append(q)
+            vals.append(-w)
+    e = sparse.csr_matrix(
+        (vals, (rows, cols)), shape=(m.jac.shape[0], len(red.free)))
+    free = np.asarray(red.free, dtype=np.int64)
+
+    def jac_red(x: Sequence[float]) -> Any:
+        return jac(expand_vector(red, x))[free] @ e
+
+    return jac_red
+
+
+def reduce_system(
+    m: MassAction
+    , c0: Sequence[float]
+    , fixed: Iterable[int] = ()
+) -> Reduction | None:
+    """Eliminate the dependent compounds of a system, choosing the most
+    abundant compound of each conservation law as the dependent one, which
+    keeps the rebuilt concentrations accurate.
+
+    Args:
+        m (:obj:`MassAction`): System to reduce.
+        c0 (sequence of float): Initial concentrations, defining the conserved
+            quantities.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant, see :obj:`conservation_laws`. Defaults to ().
+
+    Returns:
+        :obj:`Reduction` of the system, or None if it has no conservation
+        laws.
+    """
+    cl: ConservationLaws = conservation_laws(
+        m.stoich, fixed, sorted(range(len(c0)), key=lambda i: c0[i]))
+    return build_reduction(cl, c0) if cl.laws else None
+
+
+def solve_ros2(
+    rhs: Callable[[Sequence[float]], Sequence[float]]
+    , jac: Callable[[Sequence[float]], Any]
+    , y0: Sequence[float]
+    , t_eval: Sequence[float]
+    , rtol: float = 1e-6
+    , atol: float = 1e-11
+    , max_step: float = inf
+    , h0: float | None = None
+) -> Trajectory:
+    """Integrate an autonomous ODE system with the ROS2 Rosenbrock method,
+    an L-stable linearly implicit method suited for stiff systems, with
+    adaptive step size control based on its embedded first order solution.
+
+    Args:
+        rhs (callable): Time derivative of the state.
+        jac (callable): Jacobian of rhs, as a list of rows or as a SciPy
+            sparse matrix.
+        y0 (sequence of float): Initial state, at t_eval[0].
+        t_eval (sequence of float): Increasing output times.
+        rtol (float, optional): Relative tolerance. Defaults to 1e-6.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-11.
+        max_step (float, optional): Maximum step size. Defaults to inf.
+        h0 (float or None, optional): Initial step size. If None, it will be
+            estimated from the initial derivatives. Defaults to None.
+
+    Returns:
+        :obj:`Trajectory` with the states at t_eval. Steps whose error
+        estimate is not finite are rejected.
+    """
+    y: list[float] = list(y0)
+    n: int = len(y)
+    t: float = t_eval[0]
+    ys: list[array] = [array('d', y)]
+    nfev: int = 0
+    njev: int = 0
+    f0: Sequence[float] = rhs(y)
+    nfev += 1
+    if h0 is None:
+        scale: float = max(
+            abs(f0[i]) / (atol + rtol * abs(y[i])) for i in range(n)
+        ) if n else 0.
+        h0 = 0.01 / scale if scale > 0. else (t_eval[-1] - t) * 1e-3
+    h: float = min(h0, max_step)
+
+    for t_out in t_eval[1:]:
+        while t < t_out:
+            step: float = min(h, t_out - t)
+            hit: bool = step == t_out - t
+            njev += 1
+            solve = _linear_solver(jac(y), step)
+            k1: list[float] = solve(f0)
+            f1: Sequence[float] = rhs([y[i] + step * k1[i] for i in range(n)])
+            nfev += 1
+            k2: list[float] = solve([f1[i] - 2. * k1[i] for i in range(n)])
+            y_new: list[float] = [
+                y[i] + step * (1.5 * k1[i] + 0.5 * k2[i]) for i in range(n)]
+            est: list[float] = solve(
+                [0.5 * step * (k1[i] + k2[i]) for i in range(n)])
+            err: float = sqrt(sum(
+                (est[i] / (atol + rtol * max(abs(y[i]), abs(y_new[i])))) ** 2
+                for i in range(n)) / max(n, 1))
+            fac: float = min(5., max(0.2, 0.9 / sqrt(err))) if err else 5.
+            if not err <= 1.:
+                h = step * fac
+                if t + h == t:
+                    return Trajectory(
+                        array('d', t_eval[:len(ys)]), tuple(ys), False
+                        , f"Step size too small at t={t}", nfev, njev)
+                continue
+            t = t_out if hit else t + step
+            y = y_new
+            f0 = rhs(y)
+            nfev += 1
+            if not hit or fac < 1.:
+                h = min(max_step, step * fac)
+        ys.append(array('d', y))
+    return Trajectory(
+        array('d', t_eval), tuple(ys), True
+        , "The solver successfully reached the end of the integration "
+        "interval.", nfev, njev)
+
+
+def integrate_ros2(
+    m: MassAction
+    , c0: Sequence[float]
+    , t_eval: Sequence[float]
+    , rtol: float = 1e-6
+    , atol: float = 1e-11
+    , max_step: float = inf
+    , h0: float | None = None
+    , red: Reduction | None = None
+) -> Trajectory:
+    """Integrate a :obj:`MassAction` system with the ROS2 Rosenbrock method,
+    see :obj:`solve_ros2`.
+
+    Args:
+        m (:obj:`MassAction`): System to integrate.
+        c0 (sequence of float): Initial concentrations, at t_eval[0].
+        t_eval (sequence of float): Increasing output times.
+        rtol (float, optional): Relative tolerance. Defaults to 1e-6.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-11.
+        max_step (float, optional): Maximum step size. Defaults to inf.
+        h0 (float or None, optional): Initial step size. If None, it will be
+            estimated from the initial derivatives. Defaults to None.
+        red (:obj:`Reduction` or None, optional): Elimination of the dependent
+            compounds, built from c0 (see :obj:`reduce_system`). If given,
+            only the independent concentrations are integrated. Defaults to
+            None.
+
+    Returns:
+        :obj:`Trajectory` with the concentrations at t_eval.
+
+    Note:
+        If SciPy is installed and the system has at least
+        :obj:`ROS2_SPARSE_SIZE` integrated concentrations, the linear systems
+        are solved with a sparse LU factorization of the Jacobian.
+    """
+    rhs, jac = mass_action_system(m, red)
+    n: int = len(c0) if red is None else len(red.free)
+    if splu is not None and n >= ROS2_SPARSE_SIZE:
+        jac = _sparse_jacobian(m, red)
+    if red is None:
+        return solve_ros2(rhs, jac, c0, t_eval, rtol, atol, max_step, h0)
+    tr: Trajectory = solve_ros2(
+        rhs, jac, reduce_vector(red, c0), t_eval, rtol, atol, max_step, h0)
+    return tr._replace(y=(array('d', c0),) + tuple(
+        expand_vector(red, x) for x in tr.y[1:]))
+
+
+def integrate_scipy(
+    m: MassAction
+    , c0: Sequence[float]
+    , t_eval: Sequence[float]
+    , rtol: float = 1e-6
+    , atol: float = 1e-11
+    , max_step: float = inf
+    , method: str = "LSODA"
+    , red: Reduction | None = None
+) -> Trajectory:
+    """Integrate a :obj:`MassAction` system with
+    :obj:`scipy.integrate.solve_ivp`, using the analytic Jacobian. The
+    Jacobian is passed as a sparse matrix to the methods supporting it (BDF
+    and Radau) and as a dense one otherwise.
+
+    Args:
+        m (:obj:`MassAction`): System to integrate.
+        c0 (sequence of float): Initial concentrations, at t_eval[0].
+        t_eval (sequence of float): Increasing output times.
+        rtol (float, optional): Relative tolerance. Defaults to 1e-6.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-11.
+        max_step (float, optional): Maximum step size. Defaults to inf.
+        method (str, optional): Stiff method of solve_ivp. Defaults to
+            "LSODA".
+        red (:obj:`Reduction` or None, optional): Elimination of the dependent
+            compounds, built from c0 (see :obj:`reduce_system`). If given,
+            only the independent concentrations are integrated, with a dense
+            Jacobian. Defaults to None.
+
+    Returns:
+        :obj:`Trajectory` with the concentrations at t_eval.
+
+    Raises:
+        :obj:`ImportError`: If SciPy is not installed.
+    """
+    if solve_ivp is None or np is None:
+        raise ImportError("SciPy is required to use the SciPy integrators")
+    asarray, frombuffer = np.asarray, np.frombuffer
+    jac: Callable[[float, Sequence[float]], Any]
+    fun: Callable[[float, Sequence[float]], Any]
+    if red is None:
+        data: array = array('d', [0.]) * len(m.jac.indices)
+
+        def jac_full(_: float, y: Sequence[float]) -> Any:
+            eval_jacobian(m.jac, m.engine, y, data)
+            if method in ("BDF", "Radau"):
+                return jacobian_to_scipy(m.jac, data)
+            return asarray(jacobian_to_dense(m.jac, data))
+
+        def fun_full(_: float, y: Sequence[float]) -> Any:
+            return frombuffer(mass_action_rhs(m, y))
+
+        jac, fun = jac_full, fun_full
+    else:
+        rhs_red, jac_red = mass_action_system(m, red)
+
+        def jac_reduced(_: float, x: Sequence[float]) -> Any:
+            return asarray(jac_red(x))
+
+        def fun_reduced(_: float, x: Sequence[float]) -> Any:
+            return frombuffer(rhs_red(x))
+
+        jac, fun = jac_reduced, fun_reduced
+
+    sol = solve_ivp(
+        fun=fun
+        , jac=jac
+        , y0=np.asarray(
+            c0 if red is None else reduce_vector(red, c0), dtype=float)
+        , t_span=(t_eval[0], t_eval[-1])
+        , t_eval=np.asarray(t_eval, dtype=float)
+        , method=method
+        , max_step=max_step
+        , rtol=rtol
+        , atol=atol)
+    return Trajectory(
+        array('d', sol.t.tobytes())
+        , tuple(
+            array('d', col.tobytes()) if red is None
+            else expand_vector(red, col.tolist())
+            for col in sol.y.T)
+        , bool(sol.success), sol.message, sol.nfev, sol.njev)
+
+
+def initial_conc(
+    nw: Network
+) -> array:
+    """Initial concentration vector of a network, using 0 for the compounds
+    without concentration.
+
+    Args:
+        nw (:obj:`Network`): Network with the concentrations.
+
+    Returns:
+        array of float following the order of :attr:`Network.compounds`.
+    """
+    return array('d', (c.conc or 0. for c in nw.compounds))
+
+
+def compound_positions(
+    nw: Network
+    , names: Iterable[str]
+    , skip_missing: bool = False
+) -> tuple[int, ...]:
+    """Positions in :attr:`Network.compounds` of the compounds with the given
+    names.
+
+    Args:
+        nw (:obj:`Network`): Network with the compounds.
+        names (iterable of str): Names of the compounds.
+        skip_missing (bool, optional): If True, the names not found in the
+            network are skipped. Defaults to False.
+
+    Returns:
+        tuple of int with the positions, following the order of names.
+
+    Raises:
+        :obj:`ValueError`: If a name is not found and skip_missing is False.
+    """
+    pos: dict[str, int] = {c.name: i for i, c in enumerate(nw.compounds)}
+    if skip_missing:
+        return tuple(pos[x] for x in names if x in pos)
+    try:
+        return tuple(pos[x] for x in names)
+    except KeyError as e:
+        raise ValueError(f"Compound {e.args[0]} not found") from None
+
+
+def solve_kinetics(
+    nw: Network
+    , t_eval: Sequence[float]
+    , chem_cfg: ChemCfg = ChemCfg()
+    , c0: Sequence[float] | None = None
+    , method: SolverMethod = "auto"
+    , rtol: float = 1e-6
+    , atol: float = 1e-11
+    , max_step: float = inf
+    , reduce: bool = True
+) -> Trajectory:
+    """Build and integrate the mass-action model of a network.
+
+    Args:
+        nw (:obj:`Network`): Network to simulate.
+        t_eval (sequence of float): Increasing output times, the first one
+            being the initial time.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        c0 (sequence of float or None, optional): Initial concentrations. If
+            None, the concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        method (:obj:`SolverMethod`, optional): Integration method. "auto"
+            uses LSODA if SciPy is installed and ROS2 otherwise. Defaults to
+            "auto".
+        rtol (float, optional): Relative tolerance. Defaults to 1e-6.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-11.
+        max_step (float, optional): Maximum step size. Defaults to inf.
+        reduce (bool, optional): If True, the compounds made dependent by the
+            conservation laws are eliminated and only the independent ones
+            are integrated (see :obj:`reduce_system`). Defaults to True.
+
+    Returns:
+        :obj:`Trajectory` of the concentrations.
+
+    Raises:
+        :obj:`ValueError`: If less than two output times are given.
+    """
+    if len(t_eval) < 2:
+        raise ValueError("At least two output times are required")
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    y0: Sequence[float] = initial_conc(nw) if c0 is None else c0
+    if method == "auto":
+        method = "ros2" if solve_ivp is None else "LSODA"
+    red: Reduction | None = reduce_system(m, y0) if reduce else None
+    if method == "ros2":
+        return integrate_ros2(
+            m, y0, t_eval, rtol, atol, max_step, red=red)
+    return integrate_scipy(
+        m, y0, t_eval, rtol, atol, max_step, method, red)
+
+
+def trajectory_networks(
+    nw: Network
+    , tr: Trajectory
+) -> Iterator[Network]:
+    """Convert a trajectory into a network per output time, with the
+    concentrations of the compounds updated, ready for the kinetic plotter.
+
+    Args:
+        nw (:obj:`Network`): Simulated network.
+        tr (:obj:`Trajectory`): Trajectory of the network.
+
+    Yields:
+        :obj:`Network` at each output time of the trajectory.
+    """
+    for y in tr.y:
+        cs = tuple(c._replace(conc=x) for c, x in zip(nw.compounds, y))
+        yield Network(cs, relink_reactions(nw.reactions, cs))
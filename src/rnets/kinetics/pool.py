@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Process pool shared by the parallel analyses of the package, e.g. the
+degree of rate control or the parameter sweeps.
+
+The data common to all the tasks of a run, its problem, is sent once to each
+worker process through the initializer of the pool and stored in a global of
+this module, so each task only carries its own arguments. The task functions
+read it with :obj:`get_problem`. With a single worker, the tasks run in the
+current process, which is easier to debug and avoids starting the pool.
+"""
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any
+
+
+_problem: Any = None
+
+
+def _init_worker(
+    problem: Any
+) -> None:
+    """Store the problem in the worker process, so it is only sent once."""
+    global _problem
+    _problem = problem
+
+
+def get_problem[P](
+    kind: type[P]
+) -> P:
+    """Problem of the current run, to be called from the task functions.
+
+    Args:
+        kind (type): Expected type of the problem.
+
+    Returns:
+        The problem given to :obj:`worker_pool`.
+
+    Raises:
+        :obj:`RuntimeError`: If no problem of the expected type was stored,
+            i.e. the function is not called from a task of a run.
+    """
+    if not isinstance(_problem, kind):
+        raise RuntimeError(f"No {kind.__name__} found in the worker")
+    return _problem
+
+
+@contextmanager
+def worker_pool(
+    problem: Any
+    , max_workers: int | None = None
+) -> Iterator[ProcessPoolExecutor | None]:
+    """Pool of worker processes sharing a problem.
+
+    Args:
+        problem (Any): Data shared by all the tasks. It must be picklable.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, no pool is started and the problem is stored in the current
+            process. If None, the number of processors is used. Defaults to
+            None.
+
+    Yields:
+        :obj:`ProcessPoolExecutor` with the problem stored in its workers, or
+        None if the tasks must run in the current process.
+    """
+    if max_workers == 1:
+        _init_worker(problem)
+        yield None
+        return
+    with ProcessPoolExecutor(
+        max_workers=max_workers
+        , initializer=_init_worker
+        , initargs=(problem,)
+    ) as ex:
+        yield ex
+
+
+def run_pool[T, R](
+    fn: Callable[[T], R]
+    , problem: Any
+    , items: Iterable[T]
+    , max_workers: int | None = None
+    , chunksize: int = 1
+) -> Iterator[R]:
+    """Apply a task function to each item, see :obj:`worker_pool`.
+
+    Args:
+        fn (callable): Task function, defined at the top level of a module so
+            it can be pickled.
+        problem (Any): Data shared by all the tasks.
+        items (iterable): Argument of each task.
+        max_workers (int or None, optional): Number of worker processes.
+            Defaults to None.
+        chunksize (int, optional): Number of items sent to a worker at once.
+            Defaults to 1.
+
+    Yields:
+        Result of each item, in the order of the items.
+    """
+    with worker_pool(problem, max_workers) as ex:
+        if ex is None:
+            yield from map(fn, items)
+        else:
+            yield from ex.map(fn, items, chunksize=chunksize)
+
+
+def run_pool_unordered[T, R](
+    fn: Callable[[T], R]
+    , problem: Any
+    , items: Sequence[T]
+    , max_workers: int | None = None
+) -> Iterator[tuple[int, R]]:
+    """Apply a task function to each item, yielding the results as soon as
+    they are completed, see :obj:`run_pool`.
+
+    Yields:
+        tuple of the form (position of the item, result).
+    """
+    with worker_pool(problem, max_workers) as ex:
+        if ex is None:
+            yield from enumerate(map(fn, items))
+            return
+        futures = {ex.submit(fn, x): i for i, x in enumerate(items)}
+        for f in as_completed(futures):
+            yield (futures[f], f.result())
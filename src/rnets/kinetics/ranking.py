@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""Ranking of many networks, e.g. the same mechanism on different surfaces,
+by their turnover frequency, keeping only the best ones.
+
+The networks are ranked in two stages. First, an upper bound of the TOF of
+every network is computed from the activation energies of its single steps
+(see :obj:`calc_activation_energy`), which is much cheaper than the TOF
+itself. Then, the networks are fully evaluated in a process pool in order of
+decreasing bound, and the evaluation stops as soon as the bound of the next
+network is not above the k-th best TOF found so far, as none of the remaining
+networks can reach the top k.
+
+Attributes:
+    Criterion (type): Possible ranking criteria.
+"""
+
+import heapq
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import (
+    FIRST_COMPLETED
+    , Future
+    , ProcessPoolExecutor
+    , wait
+)
+from math import exp, inf, isnan, nan
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+from ..chemistry import (
+    ChemCfg
+    , calc_activation_energy
+    , energetic_span
+    , find_catalytic_cycles
+)
+from ..parser import parse_network_from_file
+from ..struct import Network
+from .conservation import ConservationLaws, conservation_laws, conserved_totals
+from .ode import (
+    MassAction
+    , build_mass_action
+    , compound_positions
+    , initial_conc
+    , mass_action_rhs
+    , reduce_system
+)
+from .pool import get_problem, worker_pool
+from .steady import SteadyState, solve_steady_state
+
+
+type Criterion = Literal["span", "steady"]
+
+
+class Candidate(NamedTuple):
+    """Network of a ranking.
+
+    Attributes:
+        name (str): Name of the network, the common prefix of its files.
+        comp_file (:obj:`Path`): File with the compounds.
+        reac_file (:obj:`Path`): File with the reactions.
+        bound (float): Upper bound of the TOF, NaN if the files could not be
+            parsed.
+        tof (float or None): TOF of the network, or None if it was pruned.
+            NaN if the steady state was not found or the files could not be
+            parsed.
+    """
+    name: str
+    comp_file: Path
+    reac_file: Path
+    bound: float
+    tof: float | None = None
+
+
+class Ranking(NamedTuple):
+    """Result of a ranking.
+
+    Attributes:
+        top (tuple of :obj:`Candidate`): Best k networks, sorted by
+            decreasing TOF.
+        candidates (tuple of :obj:`Candidate`): All the networks, sorted by
+            decreasing bound.
+        evaluated (int): Number of networks whose TOF was computed.
+    """
+    top: tuple[Candidate, ...]
+    candidates: tuple[Candidate, ...]
+    evaluated: int
+
+
+def find_network_pairs(
+    root: str | Path
+    , comp_suffix: str = "_comp.csv"
+    , reac_suffix: str = "_reac.csv"
+) -> tuple[tuple[str, Path, Path], ...]:
+    """Find the pairs of compound and reaction files of a directory.
+
+    Args:
+        root (str or :obj:`Path`): Directory to search.
+        comp_suffix (str, optional): Suffix of the compound files. Defaults
+            to "_comp.csv".
+        reac_suffix (str, optional): Suffix of the reaction files. Defaults
+            to "_reac.csv".
+
+    Returns:
+        tuple of (name, compound file, reaction file), sorted by name. Files
+        without their pair are skipped.
+    """
+    out: list[tuple[str, Path, Path]] = []
+    for cf in sorted(Path(root).glob(f"*{comp_suffix}")):
+        name: str = cf.name[:-len(comp_suffix)]
+        rf: Path = cf.with_name(name + reac_suffix)
+        if rf.is_file():
+            out.append((name, cf, rf))
+    return tuple(out)
+
+
+def _max_conc(
+    m: MassAction
+    , c0: Sequence[float]
+    , fixed: Sequence[int]
+) -> list[float]:
+    """Largest concentration each compound can reach, from the conservation
+    laws with nonnegative coefficients, or infinity if it is not bounded."""
+    cl: ConservationLaws = conservation_laws(m.stoich, fixed)
+    out: list[float] = [inf] * len(c0)
+    for law, total in zip(cl.laws, conserved_totals(cl, c0)):
+        if any(w < 0 for w in law):
+            continue
+        for i, w in enumerate(law):
+            if w > 0:
+                out[i] = min(out[i], total / w)
+    return out
+
+
+def network_bound(
+    nw: Network
+    , criterion: Criterion = "span"
+    , product: str | None = None
+    , chem_cfg: ChemCfg = ChemCfg()
+    , fixed: Iterable[str] = ()
+    , max_length: int = 8
+) -> float:
+    """Upper bound of the TOF of a network (see :obj:`network_tof`) from the
+    activation energies of its steps.
+
+    For "span", the energetic span of a cycle is at least the activation
+    energy of each of its steps, so the TOF of the cycle is at most A times
+    the Boltzmann factor of its largest activation energy. For "steady", the
+    production of the product is at most the sum of the forward rates of
+    the steps producing it, with each reactant at the largest concentration
+    allowed by the conservation laws.
+
+    Args:
+        nw (:obj:`Network`): Network to bound.
+        criterion (str, optional): Ranking criterion, see
+            :obj:`network_tof`. Defaults to "span".
+        product (str or None, optional): Name of the product. Defaults to
+            None.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters. Defaults
+            to :obj:`ChemCfg`.
+        fixed (iterable of str, optional): Names of the compounds held
+            constant in the steady state. Defaults to ().
+        max_length (int, optional): Largest number of steps of a catalytic
+            cycle. Defaults to 8.
+
+    Returns:
+        float with the bound, 0 if the network cannot produce the product and
+        infinity if the concentration of a reactant is not bounded.
+    """
+    kbt: float = chem_cfg.kb * chem_cfg.T
+    if criterion == "span":
+        barrier: float = min(
+            (max(map(calc_activation_energy, cy.steps))
+             for cy in find_catalytic_cycles(nw, max_length)
+             if product is None or any(c.name == product for c in cy.products))
+            , default=inf)
+        return chem_cfg.A * exp(-barrier / kbt)
+
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    c_max: list[float] = _max_conc(
+        m, initial_conc(nw)
+        , compound_positions(nw, fixed, skip_missing=True))
+    rows: dict[int, int] = m.engine.rows
+    bound: float = 0.
+    for r in m.engine.reactions:
+        for rev in (False, True):
+            if not any(c.name == product for c in r.compounds[1 - rev]):
+                continue
+            x: float = chem_cfg.A * exp(
+                -calc_activation_energy(r, rev) / kbt)
+            for c in r.compounds[rev]:
+                x *= c_max[rows[c.idx]]
+            bound += x
+    return bound
+
+
+def network_tof(
+    nw: Network
+    , criterion: Criterion = "span"
+    , product: str | None = None
+    , chem_cfg: ChemCfg = ChemCfg()
+    , fixed: Iterable[str] = ()
+    , max_length: int = 8
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+) -> float:
+    """TOF of a network.
+
+    Args:
+        nw (:obj:`Network`): Network to evaluate.
+        criterion (str, optional): "span" for the largest energetic span TOF
+            of its catalytic cycles producing the product (see
+            :obj:`energetic_span`), or "steady" for the net production rate
+            of the product at the steady state, which should be held
+            constant. Defaults to "span".
+        product (str or None, optional): Name of the product. If None, every
+            cycle is considered for "span". Defaults to None.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters. Defaults
+            to :obj:`ChemCfg`.
+        fixed (iterable of str, optional): Names of the compounds held
+            constant in the steady state. Names not found in the network are
+            ignored. Defaults to ().
+        max_length (int, optional): Largest number of steps of a catalytic
+            cycle. Defaults to 8.
+        rtol (float, optional): Relative tolerance of the steady state.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance of the steady state.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves of the
+            steady state. Defaults to 500.
+
+    Returns:
+        float with the TOF, 0 if the network cannot produce the product and
+        NaN if its steady state is not found.
+    """
+    if criterion == "span":
+        return max(
+            (energetic_span(cy, chem_cfg).tof
+             for cy in find_catalytic_cycles(nw, max_length)
+             if product is None or any(c.name == product for c in cy.products))
+            , default=0.)
+
+    pos: tuple[int, ...] = (
+        () if product is None else compound_positions(
+            nw, (product,), skip_missing=True))
+    if not pos:
+        return 0.
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    c0: Sequence[float] = initial_conc(nw)
+    held: tuple[int, ...] = compound_positions(nw, fixed, skip_missing=True)
+    ss: SteadyState = solve_steady_state(
+        m, c0, reduce_system(m, c0, held), rtol, atol, max_iter)
+    return mass_action_rhs(m, ss.c)[pos[0]] if ss.success else nan
+
+
+class _Problem(NamedTuple):
+    """Parameters shared by all the networks."""
+    criterion: Criterion
+    product: str | None
+    cfg: ChemCfg
+    fixed: tuple[str, ...]
+    max_length: int
+    rtol: float
+    atol: float
+    max_iter: int
+
+
+def _bound(
+    files: tuple[Path, Path]
+) -> float:
+    p: _Problem = get_problem(_Problem)
+    try:
+        nw: Network = parse_network_from_file(*files)
+    except (OSError, KeyError, ValueError):
+        return nan
+    return network_bound(
+        nw, p.criterion, p.product, p.cfg, p.fixed, p.max_length)
+
+
+def _tof(
+    files: tuple[Path, Path]
+) -> float:
+    p: _Problem = get_problem(_Problem)
+    return network_tof(
+        parse_network_from_file(*files), p.criterion, p.product, p.cfg
+        , p.fixed, p.max_length, p.rtol, p.atol, p.max_iter)
+
+
+def _evaluate(
+    ex: ProcessPoolExecutor | None
+    , cands: Sequence[Candidate]
+    , k: int
+    , n_flight: int
+) -> Iterator[tuple[int, float]]:
+    """Evaluate the candidates in order of decreasing bound, keeping at most
+    n_flight evaluations running, and stop once the next bound cannot reach
+    the top k. Yields the position and the TOF of the evaluated candidates.
+    """
+    best: list[float] = []
+
+    def threshold() -> float:
+        return best[0] if len(best) == k else -inf
+
+    def push(x: float) -> None:
+        x = -inf if isnan(x) else x
+        if len(best) < k:
+            heapq.heappush(best, x)
+        elif x > best[0]:
+            heapq.heapreplace(best, x)
+
+    if ex is None:
+        for i, c in enumerate(cands):
+            if not c.bound > threshold():
+                return
+            x: float = _tof((c.comp_file, c.reac_file))
+            push(x)
+            yield (i, x)
+        return
+
+    running: dict[Future, int] = {}
+    nxt: int = 0
+    while True:
+        while (len(running) < n_flight and nxt < len(cands)
+               and cands[nxt].bound > threshold()):
+            c: Candidate = cands[nxt]
+            running[ex.submit(_tof, (c.comp_file, c.reac_file))] = nxt
+            nxt += 1
+        if not running:
+            return
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for f in done:
+            i: int = running.pop(f)
+            push(f.result())
+            yield (i, f.result())
+        # Drop the queued evaluations that can no longer reach the top k
+        for f, i in tuple(running.items()):
+            if cands[i].bound <= threshold() and f.cancel():
+                del running[f]
+
+
+def _rank(
+    ex: ProcessPoolExecutor | None
+    , pairs: Sequence[tuple[str, Path, Path]]
+    , bounds: Iterable[float]
+    , k: int
+    , n_flight: int
+) -> Ranking:
+    # Stable sort, so ties keep the order of the pairs. The unparsable
+    # networks go last, with a NaN TOF
+    cands: list[Candidate] = sorted(
+        (Candidate(n, cf, rf, b, nan if isnan(b) else None)
+         for (n, cf, rf), b in zip(pairs, bounds))
+        , key=lambda c: inf if isnan(c.bound) else -c.bound)
+    evaluated: int = 0
+    for i, x in _evaluate(ex, cands, k, n_flight):
+        cands[i] = cands[i]._replace(tof=x)
+        evaluated += 1
+
+    def key(c: Candidate) -> float:
+        return -inf if c.tof is None or isnan(c.tof) else c.tof
+
+    return Ranking(
+        top=tuple(sorted(
+            (c for c in cands if c.tof is not None), key=key
+            , reverse=True)[:k])
+        , candidates=tuple(cands)
+        , evaluated=evaluated)
+
+
+def rank_networks(
+    networks: str | Path | Iterable[tuple[str, Path, Path]]
+    , k: int = 5
+    , criterion: Criterion = "span"
+    , product: str | None = None
+    , chem_cfg: ChemCfg = ChemCfg()
+    , fixed: Iterable[str] = ()
+    , max_length: int = 8
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+    , max_workers: int | None = None
+    , chunksize: int = 16
+) -> Ranking:
+    """Find the k networks with the largest TOF, computing the TOF only of
+    the networks whose bound can reach the top k (see :obj:`network_bound`
+    and :obj:`network_tof`).
+
+    Args:
+        networks (str or :obj:`Path` or iterable of (str, :obj:`Path`,
+            :obj:`Path`)): Directory with the pairs of files (see
+            :obj:`find_network_pairs`) or the name, compound file and
+            reaction file of each network.
+        k (int, optional): Number of networks to keep. Defaults to 5.
+        criterion (str, optional): Ranking criterion, "span" or "steady".
+            Defaults to "span".
+        product (str or None, optional): Name of the product. It is required
+            for "steady". Defaults to None.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters. Defaults
+            to :obj:`ChemCfg`.
+        fixed (iterable of str, optional): Names of the compounds held
+            constant in the steady states, e.g. the gases. Defaults to ().
+        max_length (int, optional): Largest number of steps of a catalytic
+            cycle. Defaults to 8.
+        rtol (float, optional): Relative tolerance of the steady states.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance of the steady states.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, the networks are evaluated in the current process. If None,
+            the number of processors is used. Defaults to None.
+        chunksize (int, optional): Number of networks sent to a worker at
+            once when computing the bounds. Defaults to 16.
+
+    Returns:
+        :obj:`Ranking` of the networks. Networks whose steady state is not
+        found or whose files cannot be parsed have a NaN TOF and are ranked
+        last.
+
+    Raises:
+        :obj:`ValueError`: If the criterion is unknown, k is not positive or
+            the product is missing for "steady".
+    """
+    if criterion not in ("span", "steady"):
+        raise ValueError(f"Unknown criterion {criterion}")
+    if k < 1:
+        raise ValueError("k must be positive")
+    if criterion == "steady" and product is None:
+        raise ValueError("A product is required for steady states")
+    pairs: tuple[tuple[str, Path, Path], ...] = (
+        find_network_pairs(networks) if isinstance(networks, (str, Path))
+        else tuple((n, Path(cf), Path(rf)) for n, cf, rf in networks))
+    problem: _Problem = _Problem(
+        criterion, product, chem_cfg, tuple(fixed), max_length, rtol, atol
+        , max_iter)
+    files: list[tuple[Path, Path]] = [(cf, rf) for _, cf, rf in pairs]
+    with worker_pool(problem, max_workers) as ex:
+        if ex is None:
+            return _rank(None, pairs, map(_bound, files), k, 1)
+        return _rank(
+            ex, pairs, ex.map(_bound, files, chunksize=chunksize), k
+            , 2 * (max_workers or os.cpu_count() or 1))
@@ -0,0 +1,546 @@
+# -*- coding: utf-8 -*-
+"""Reduction of the mass-action model of a network by separation of time
+scales. Reactions whose relaxation is much faster than the time scale of
+interest are assumed to be in partial equilibrium, with a null net rate, and
+compounds consumed much faster by the remaining reactions are assumed to be
+in quasi-steady state, with a null time derivative.
+
+The reduced model is integrated in the slow variables, the combinations of
+concentrations that neither the fast reactions nor the quasi-steady-state
+compounds change. The full concentrations are rebuilt from the slow variables
+by projecting onto the slow manifold, where the algebraic conditions hold, so
+the fast time scales never limit the step size.
+"""
+
+from array import array
+from collections.abc import Callable, Iterable, Sequence
+from fractions import Fraction
+from math import inf, nan
+from operator import sub
+from typing import Any, NamedTuple
+
+from ..chemistry import ChemCfg, KTable, RateEngine, eval_rates
+from ..stoich import INT_TYPECODE, StoichMatrix
+from ..struct import Network
+from .conservation import (
+    ConservationLaws
+    , build_reduction
+    , conservation_laws
+)
+from .jacobian import eval_jacobian, jacobian_to_dense
+from .linalg import dense_solver
+from .ode import (
+    MassAction
+    , Trajectory
+    , build_mass_action
+    , initial_conc
+    , mass_action_rhs
+    , solve_ros2
+)
+from .steady import SteadyState, solve_steady_state
+
+
+_CHORD_ITER: int = 8
+
+
+class ReducedModel(NamedTuple):
+    """Mass-action model reduced by separation of time scales.
+
+    Attributes:
+        m (:obj:`MassAction`): Full model.
+        fast (tuple of int): Reactions of the engine in partial equilibrium.
+        qss (tuple of int): Compounds in quasi-steady state.
+        slow (tuple of tuples of int): Integer weights of the compounds in
+            each slow variable.
+        eq_reactions (tuple of int): Fast reactions whose net rate is set to
+            zero. The equilibrium of the others follows from them.
+        eq_compounds (tuple of int): Quasi-steady-state compounds whose time
+            derivative is set to zero.
+    """
+    m: MassAction
+    fast: tuple[int, ...]
+    qss: tuple[int, ...]
+    slow: tuple[tuple[int, ...], ...]
+    eq_reactions: tuple[int, ...]
+    eq_compounds: tuple[int, ...]
+
+
+def _rate_gradient(
+    eng: RateEngine
+    , j: int
+    , c: Sequence[float]
+) -> dict[int, float]:
+    """Partial derivatives of the net rate of a reaction."""
+    grad: dict[int, float] = {}
+    for idx, k, sign in (
+            (eng.l_idx[eng.l_ptr[j]:eng.l_ptr[j + 1]], eng.kt.kf[j], 1.)
+            , (eng.r_idx[eng.r_ptr[j]:eng.r_ptr[j + 1]], eng.kt.kr[j], -1.)):
+        for p, i in enumerate(idx):
+            d: float = sign * k
+            for q, jj in enumerate(idx):
+                if q != p:
+                    d *= c[jj]
+            grad[i] = grad.get(i, 0.) + d
+    return grad
+
+
+def _columns(
+    s: StoichMatrix
+    , js: Iterable[int]
+) -> list[list[tuple[int, int]]]:
+    """(compound, coefficient) pairs of some columns of a CSC matrix."""
+    return [
+        [(s.indices[p], s.data[p]) for p in range(s.indptr[j], s.indptr[j + 1])]
+        for j in js]
+
+
+def relaxation_rates(
+    m: MassAction
+    , c: Sequence[float]
+) -> array:
+    """Relaxation rate of each reaction at a given concentration vector, the
+    derivative of its net rate along its reaction coordinate. For a first
+    order reaction A <-> B it is kf + kr.
+
+    Args:
+        m (:obj:`MassAction`): Model of the reactions.
+        c (sequence of float): Concentration vector.
+
+    Returns:
+        array of float with the rate of each reaction of the engine.
+    """
+    return array('d', (
+        -sum(x * _rate_gradient(m.engine, j, c).get(i, 0.) for i, x in col)
+        for j, col in enumerate(_columns(m.stoich, range(m.stoich.shape[1])))))
+
+
+def _restrict(
+    m: MassAction
+    , keep: Iterable[int]
+) -> MassAction:
+    """Model with the kinetic constants of the reactions not kept set to
+    zero."""
+    keep = set(keep)
+    kt: KTable = m.engine.kt
+    return m._replace(engine=m.engine._replace(kt=kt._replace(
+        kf=array('d', (k if j in keep else 0. for j, k in enumerate(kt.kf)))
+        , kr=array('d', (k if j in keep else 0. for j, k in enumerate(kt.kr)))
+    )))
+
+
+def find_fast(
+    m: MassAction
+    , c: Sequence[float]
+    , tau: float
+    , eps: float = 1e-3
+) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """Find the reactions in partial equilibrium and the compounds in
+    quasi-steady state at a given concentration vector.
+
+    Args:
+        m (:obj:`MassAction`): Model to inspect.
+        c (sequence of float): Reference concentration vector.
+        tau (float): Time scale of interest, e.g. the interval between
+            output times.
+        eps (float, optional): Maximum ratio between the relaxation time of a
+            fast reaction, or the lifetime of a quasi-steady-state compound,
+            and tau. Defaults to 1e-3.
+
+    Returns:
+        tuple with the fast reactions of the engine and the quasi-steady-state
+        compounds.
+    """
+    lams: array = relaxation_rates(m, c)
+    fast: tuple[int, ...] = tuple(
+        j for j, lam in enumerate(lams) if lam * eps * tau > 1.)
+    # Consumption of each compound by the slow reactions
+    slow_m: MassAction = _restrict(
+        m, set(range(len(lams))).difference(fast))
+    jac: list[list[float]] = jacobian_to_dense(
+        slow_m.jac, eval_jacobian(slow_m.jac, slow_m.engine, c))
+    qss: tuple[int, ...] = tuple(
+        i for i, row in enumerate(jac) if -row[i] * eps * tau > 1.)
+    return fast, qss
+
+
+def _columns_matrix(
+    n: int
+    , cols: Sequence[Sequence[tuple[int, int]]]
+) -> StoichMatrix:
+    """CSC matrix from the (row, value) pairs of each column."""
+    indptr: array = array(INT_TYPECODE, [0])
+    indices: array = array(INT_TYPECODE)
+    data: array = array(INT_TYPECODE)
+    for col in cols:
+        for i, x in col:
+            indices.append(i)
+            data.append(x)
+        indptr.append(len(indices))
+    return StoichMatrix((n, len(cols)), indptr, indices, data, "csc")
+
+
+def _independent_columns(
+    n: int
+    , cols: Sequence[Sequence[tuple[int, int]]]
+) -> list[int]:
+    """Positions of a maximal set of linearly independent columns, found
+    greedily with exact arithmetic."""
+    basis: list[tuple[int, list[Fraction]]] = []
+    out: list[int] = []
+    for q, col in enumerate(cols):
+        v: list[Fraction] = [Fraction(0)] * n
+        for i, x in col:
+            v[i] += x
+        for piv, b in basis:
+            if v[piv]:
+                f: Fraction = v[piv] / b[piv]
+                v = [x - f * y for x, y in zip(v, b)]
+        piv: int | None = next((i for i, x in enumerate(v) if x), None)
+        if piv is not None:
+            basis.append((piv, v))
+            out.append(q)
+    return out
+
+
+def build_reduced_model(
+    m: MassAction
+    , fast: Iterable[int]
+    , qss: Iterable[int]
+) -> ReducedModel:
+    """Build the slow variables and the algebraic conditions of a reduced
+    model.
+
+    Args:
+        m (:obj:`MassAction`): Full model.
+        fast (iterable of int): Reactions of the engine in partial
+            equilibrium.
+        qss (iterable of int): Compounds in quasi-steady state.
+
+    Returns:
+        :obj:`ReducedModel` of the system.
+    """
+    fast = tuple(sorted(set(fast)))
+    qss = tuple(sorted(set(qss)))
+    n: int = m.stoich.shape[0]
+    cols: list[list[tuple[int, int]]] = (
+        _columns(m.stoich, fast) + [[(i, 1)] for i in qss])
+    indep: list[int] = _independent_columns(n, cols)
+    return ReducedModel(
+        m=m
+        , fast=fast
+        , qss=qss
+        , slow=conservation_laws(_columns_matrix(n, cols)).laws
+        , eq_reactions=tuple(fast[q] for q in indep if q < len(fast))
+        , eq_compounds=tuple(
+            qss[q - len(fast)] for q in indep if q >= len(fast)))
+
+
+def slow_variables(
+    rm: ReducedModel
+    , c: Sequence[float]
+) -> list[float]:
+    """Evaluate the slow variables of a concentration vector.
+
+    Args:
+        rm (:obj:`ReducedModel`): Reduced model.
+        c (sequence of float): Concentration vector.
+
+    Returns:
+        list of float with the value of each slow variable.
+    """
+    return [sum(w * x for w, x in zip(p, c) if w) for p in rm.slow]
+
+
+def _residuals(
+    rm: ReducedModel
+    , c: Sequence[float]
+) -> list[float]:
+    """Net rates of the equilibrium reactions and time derivatives of the
+    quasi-steady-state compounds."""
+    m: MassAction = rm.m
+    out: list[float] = []
+    if rm.eq_reactions:
+        net: array = eval_rates(m.engine, c).net
+        out.extend(net[j] for j in rm.eq_reactions)
+    if rm.eq_compounds:
+        f: array = mass_action_rhs(m, c)
+        out.extend(f[i] for i in rm.eq_compounds)
+    return out
+
+
+def _manifold_matrix(
+    rm: ReducedModel
+    , c: Sequence[float]
+) -> list[list[float]]:
+    """Jacobian of the slow variables and of the algebraic conditions."""
+    m: MassAction = rm.m
+    n: int = len(c)
+    rows: list[list[float]] = [list(map(float, p)) for p in rm.slow]
+    for j in rm.eq_reactions:
+        row: list[float] = [0.] * n
+        for i, d in _rate_gradient(m.engine, j, c).items():
+            row[i] = d
+        rows.append(row)
+    if rm.eq_compounds:
+        jac: list[list[float]] = jacobian_to_dense(
+            m.jac, eval_jacobian(m.jac, m.engine, c))
+        rows.extend(jac[i] for i in rm.eq_compounds)
+    return rows
+
+
+def _newton_rhs(
+    rm: ReducedModel
+    , z: Sequence[float]
+    , c: Sequence[float]
+) -> list[float]:
+    return [
+        zi - sum(w * v for w, v in zip(p, c) if w)
+        for zi, p in zip(z, rm.slow)] + [-r for r in _residuals(rm, c)]
+
+
+def _newton_update(
+    x: Sequence[float]
+    , step: Sequence[float]
+    , rtol: float
+    , atol: float
+) -> tuple[list[float], bool]:
+    """Apply a Newton step keeping the concentrations non negative, and check
+    whether it is within the tolerances."""
+    small: bool = all(
+        abs(d) <= rtol * abs(v) + atol for v, d in zip(x, step))
+    # Depleted compounds are clipped, the others may only approach zero
+    lam: float = 1. if small else min(
+        (-0.9 * v / d for v, d in zip(x, step) if v > 0. and v + d < 0.)
+        , default=1.)
+    return [max(v + lam * d, 0.) for v, d in zip(x, step)], small
+
+
+def project(
+    rm: ReducedModel
+    , z: Sequence[float]
+    , c: Sequence[float]
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 50
+) -> array | None:
+    """Find the concentrations on the slow manifold with the given slow
+    variables, with Newton iterations that keep them non negative.
+
+    Args:
+        rm (:obj:`ReducedModel`): Reduced model.
+        z (sequence of float): Slow variables.
+        c (sequence of float): Initial guess, e.g. the previous point of the
+            trajectory.
+        rtol (float, optional): Relative tolerance of the Newton step.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance of the Newton step.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of iterations. Defaults to
+            50.
+
+    Returns:
+        array of float with the concentrations, or None if the iterations do
+        not converge.
+    """
+    x: list[float] = list(c)
+    for _ in range(max_iter):
+        try:
+            step: list[float] = dense_solver(_manifold_matrix(rm, x))(
+                _newton_rhs(rm, z, x))
+        except ZeroDivisionError:
+            return None
+        x, small = _newton_update(x, step, rtol, atol)
+        if small:
+            return array('d', x)
+    return None
+
+
+def _relax_fast(
+    rm: ReducedModel
+    , c: Sequence[float]
+) -> Sequence[float]:
+    """Bring the fast reactions of a concentration vector to equilibrium by
+    solving the steady state of the fast reactions alone, a guess for
+    :obj:`project` when Newton iterations from c stall at the positivity
+    constraints."""
+    if not rm.fast:
+        return c
+    cl: ConservationLaws = conservation_laws(
+        _columns_matrix(len(c), _columns(rm.m.stoich, rm.fast))
+        , order=sorted(range(len(c)), key=lambda i: c[i]))
+    ss: SteadyState = solve_steady_state(
+        _restrict(rm.m, rm.fast), c
+        , build_reduction(cl, c) if cl.laws else None)
+    return ss.c if ss.success else c
+
+
+def integrate_reduced(
+    rm: ReducedModel
+    , c0: Sequence[float]
+    , t_eval: Sequence[float]
+    , rtol: float = 1e-6
+    , atol: float = 1e-11
+    , max_step: float = inf
+) -> Trajectory:
+    """Integrate a reduced model in the slow variables with the ROS2 method,
+    see :obj:`solve_ros2`. The initial concentrations are first projected
+    onto the slow manifold, skipping the initial fast transient.
+
+    Args:
+        rm (:obj:`ReducedModel`): Reduced model.
+        c0 (sequence of float): Initial concentrations, at t_eval[0].
+        t_eval (sequence of float): Increasing output times.
+        rtol (float, optional): Relative tolerance. Defaults to 1e-6.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-11.
+        max_step (float, optional): Maximum step size. Defaults to inf.
+
+    Returns:
+        :obj:`Trajectory` with the full concentrations at t_eval. The number
+        of Jacobian evaluations excludes those of the projections.
+
+    Raises:
+        :obj:`ValueError`: If less than two output times are given or if the
+            initial concentrations cannot be projected onto the slow manifold.
+    """
+    if len(t_eval) < 2:
+        raise ValueError("At least two output times are required")
+    # The fast reactions do not change the slow variables, leaving them out
+    # avoids the rounding errors of their large rates
+    m: MassAction = _restrict(
+        rm.m, set(range(len(rm.m.engine.reactions))).difference(rm.fast))
+    z0: list[float] = slow_variables(rm, c0)
+    # The projections are solved more tightly than the integration, so their
+    # errors do not disturb the step size control
+    p_rtol: float = rtol * 1e-2
+    p_atol: float = atol * 1e-2
+    c_init: array | None = project(rm, z0, c0, p_rtol, p_atol)
+    if c_init is None:
+        c_init = project(rm, z0, _relax_fast(rm, c0), p_rtol, p_atol)
+    if c_init is None:
+        raise ValueError("The initial state has no point on the slow manifold")
+    n: int = len(c0)
+    n_slow: int = len(rm.slow)
+    # Reference point of the chord iterations, refreshed at each Jacobian
+    # evaluation: concentrations, slow variables, factorized manifold matrix
+    # and sensitivity of the concentrations to each slow variable
+    ref: dict[str, Any] = {}
+
+    def set_ref(c: array, z: Sequence[float]) -> None:
+        solve: Callable[[Sequence[float]], list[float]] = dense_solver(
+            _manifold_matrix(rm, c))
+        ref.update(c=c, z=list(z), solve=solve, dc=[
+            solve([1. if i == k else 0. for i in range(n)])
+            for k in range(n_slow)])
+
+    def conc(z: Sequence[float]) -> array | None:
+        # First order prediction along the slow manifold
+        x: list[float] = list(ref["c"])
+        for dz, col in zip(map(sub, z, ref["z"]), ref["dc"]):
+            if dz:
+                x = [v + dz * d for v, d in zip(x, col)]
+        x = [max(v, 0.) for v in x]
+        c: array | None = None
+        for _ in range(_CHORD_ITER):
+            x, small = _newton_update(
+                x, ref["solve"](_newton_rhs(rm, z, x)), p_rtol, p_atol)
+            if small:
+                c = array('d', x)
+                break
+        else:
+            c = project(rm, z, ref["c"], p_rtol, p_atol)
+        ref["last"] = c
+        return c
+
+    def rhs(z: Sequence[float]) -> list[float]:
+        c: array | None = conc(z)
+        if c is None:
+            # Rejected by the error control of the integrator
+            return [nan] * n_slow
+        return slow_variables(rm, mass_action_rhs(m, c))
+
+    def jac(z: Sequence[float]) -> list[list[float]]:
+        c: array | None = conc(z)
+        if c is None:
+            return [[nan] * n_slow for _ in range(n_slow)]
+        set_ref(c, z)
+        j_slow: list[list[float]] = jacobian_to_dense(
+            m.jac, eval_jacobian(m.jac, m.engine, c))
+        pj: list[list[float]] = [
+            [sum(w * j_slow[i][k] for i, w in enumerate(p) if w)
+             for k in range(n)]
+            for p in rm.slow]
+        return [
+            [sum(x * y for x, y in zip(row, col)) for col in ref["dc"]]
+            for row in pj]
+
+    # Each interval is integrated on its own, so the concentrations of the
+    # last evaluation are those of the output time
+    ys: list[array] = [c_init]
+    z: Sequence[float] = z0
+    nfev: int = 0
+    njev: int = 0
+    set_ref(c_init, z0)
+    for q in range(1, len(t_eval)):
+        tr: Trajectory = solve_ros2(
+            rhs, jac, z, t_eval[q - 1:q + 1], rtol, atol, max_step)
+        nfev += tr.nfev
+        njev += tr.njev
+        if not tr.success or ref["last"] is None:
+            return tr._replace(
+                t=array('d', t_eval[:q]), y=tuple(ys), success=False
+                , nfev=nfev, njev=njev)
+        z = tr.y[-1]
+        ys.append(ref["last"])
+    return Trajectory(
+        array('d', t_eval), tuple(ys), True
+        , "The solver successfully reached the end of the integration "
+        "interval.", nfev, njev)
+
+
+def solve_reduced_kinetics(
+    nw: Network
+    , t_eval: Sequence[float]
+    , chem_cfg: ChemCfg = ChemCfg()
+    , c0: Sequence[float] | None = None
+    , tau: float | None = None
+    , eps: float = 1e-3
+    , rtol: float = 1e-6
+    , atol: float = 1e-11
+    , max_step: float = inf
+) -> tuple[ReducedModel, Trajectory]:
+    """Build the mass-action model of a network, reduce it automatically at
+    the initial concentrations and integrate it.
+
+    Args:
+        nw (:obj:`Network`): Network to simulate.
+        t_eval (sequence of float): Increasing output times, the first one
+            being the initial time.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        c0 (sequence of float or None, optional): Initial concentrations. If
+            None, the concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        tau (float or None, optional): Time scale of interest. If None, the
+            shortest interval between output times is used. Defaults to None.
+        eps (float, optional): Time scale separation, see :obj:`find_fast`.
+            Defaults to 1e-3.
+        rtol (float, optional): Relative tolerance. Defaults to 1e-6.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-11.
+        max_step (float, optional): Maximum step size. Defaults to inf.
+
+    Returns:
+        tuple with the :obj:`ReducedModel` and the :obj:`Trajectory` of the
+        full concentrations, which can be converted into networks with
+        :obj:`trajectory_networks`.
+
+    Raises:
+        :obj:`ValueError`: If less than two output times are given.
+    """
+    if len(t_eval) < 2:
+        raise ValueError("At least two output times are required")
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    y0: Sequence[float] = initial_conc(nw) if c0 is None else c0
+    if tau is None:
+        tau = min(b - a for a, b in zip(t_eval, t_eval[1:]) if b > a)
+    rm: ReducedModel = build_reduced_model(m, *find_fast(m, y0, tau, eps))
+    return rm, integrate_reduced(rm, y0, t_eval, rtol, atol, max_step)
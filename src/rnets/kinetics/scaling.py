@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""Screening of virtual catalysts with linear scaling relations. The energy
+of each compound and transition state of a reference network is a linear
+function of one or more descriptors, e.g. the adsorption energies of C and O,
+so a grid of descriptors defines a family of networks sharing the topology
+of the reference one.
+
+The energies of all the grid points are computed at once, as a matrix
+product of the descriptors with the scaling coefficients when NumPy is
+available, and the points are evaluated in a process pool. Each point
+reports a turnover frequency, so the results form a volcano plot over the
+descriptors.
+"""
+
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import product
+from math import inf, isnan, log10, nan
+from typing import Literal, NamedTuple
+
+from ..chemistry import (
+    CatalyticCycle
+    , ChemCfg
+    , energetic_span
+    , eval_rates
+    , find_catalytic_cycles
+    , unique_reactions
+    , update_ktable
+)
+from ..struct import Compound, Network, Reaction, relink_reactions
+from .conservation import Reduction
+from .drc import network_values
+from .ode import (
+    MassAction
+    , build_mass_action
+    , initial_conc
+    , mass_action_rhs
+    , reduce_system
+)
+from .pool import get_problem, run_pool
+from .steady import SteadyState, solve_steady_state
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+type ScreenQuantity = Literal["rates", "steady", "span"]
+
+
+class ScalingRelations(NamedTuple):
+    """Linear scaling relations of the compounds and transition states of a
+    network. The energy of each one is its intercept plus the sum of its
+    slopes times the descriptors. The coefficients are stored by position,
+    the intercepts first, so the energies of all of them are evaluated
+    together.
+
+    Attributes:
+        descriptors (tuple of str): Name of each descriptor.
+        c_coefs (tuple of array of float): Intercept and slope of each
+            descriptor of the compounds, following the order of
+            :attr:`Network.compounds`.
+        r_coefs (tuple of array of float): Intercept and slope of each
+            descriptor of the transition states of the reactions.
+        reactions (tuple of :obj:`Reaction`): Unique reactions of the
+            relations (see :obj:`unique_reactions`).
+    """
+    descriptors: tuple[str, ...]
+    c_coefs: tuple[array, ...]
+    r_coefs: tuple[array, ...]
+    reactions: tuple[Reaction, ...]
+
+
+class ScreeningResult(NamedTuple):
+    """Evaluation of a network over a grid of descriptors.
+
+    Attributes:
+        relations (:obj:`ScalingRelations`): Scaling relations of the
+            network.
+        quantity (str): Evaluated quantity, "rates", "steady" or "span".
+        chem_cfg (:obj:`ChemCfg`): Chemical configuration of the evaluation.
+        points (tuple of tuple of float): Descriptors of each point, the last
+            descriptor varying the fastest.
+        tof (array of float): Turnover frequency of each point, NaN if its
+            steady state is not found.
+        rates (tuple of array of float or None): Net rate of each unique
+            reaction at each point, None for "span" and the failed points.
+        concs (tuple of array of float or None): Steady state of each point,
+            None for the other quantities and the failed points.
+    """
+    relations: ScalingRelations
+    quantity: str
+    chem_cfg: ChemCfg
+    points: tuple[tuple[float, ...], ...]
+    tof: array
+    rates: tuple[array | None, ...]
+    concs: tuple[array | None, ...]
+
+
+def build_scaling(
+    nw: Network
+    , descriptors: Sequence[str]
+    , coefs: Mapping[str, Sequence[float]]
+) -> ScalingRelations:
+    """Build the scaling relations of a network.
+
+    Args:
+        nw (:obj:`Network`): Reference network.
+        descriptors (sequence of str): Name of each descriptor.
+        coefs (mapping of str to sequence of float): Intercept followed by
+            the slope of each descriptor, by compound or reaction name. The
+            two directions of a reversible reaction share its transition
+            state. The compounds and transition states without relation keep
+            the energy of the reference network.
+
+    Returns:
+        :obj:`ScalingRelations` of the network.
+
+    Raises:
+        :obj:`ValueError`: If a name is not found or is both a compound and a
+            reaction, or if a relation does not have a coefficient per
+            descriptor plus the intercept.
+    """
+    n: int = len(descriptors) + 1
+    rs: tuple[Reaction, ...] = unique_reactions(nw.reactions)
+    c_names: set[str] = {c.name for c in nw.compounds}
+    r_names: set[str] = {r.name for r in rs}
+    for k, v in coefs.items():
+        if k in c_names and k in r_names:
+            raise ValueError(f"{k} is both a compound and a reaction")
+        if k not in c_names and k not in r_names:
+            raise ValueError(f"{k} not found in the network")
+        if len(v) != n:
+            raise ValueError(f"{k} needs {n} coefficients, got {len(v)}")
+
+    def columns(xs: Iterable[Compound | Reaction]) -> tuple[array, ...]:
+        rows: list[Sequence[float]] = [
+            coefs.get(x.name, (x.energy,) + (0.,) * (n - 1)) for x in xs]
+        return tuple(array('d', col) for col in zip(*rows))
+
+    return ScalingRelations(
+        descriptors=tuple(descriptors)
+        , c_coefs=columns(nw.compounds)
+        , r_coefs=columns(rs)
+        , reactions=rs)
+
+
+def descriptor_grid(
+    *axes: Iterable[float]
+) -> tuple[tuple[float, ...], ...]:
+    """Cartesian grid of descriptors.
+
+    Args:
+        *axes (iterable of float): Values of each descriptor.
+
+    Returns:
+        tuple with the descriptors of each point, the last one varying the
+        fastest.
+    """
+    return tuple(product(*map(tuple, axes)))
+
+
+def _eval_linear(
+    coefs: Sequence[array]
+    , points: Sequence[Sequence[float]]
+) -> tuple[array, ...]:
+    """Evaluate the relations at each point, with a row per point."""
+    if not points:
+        return ()
+    if np is not None:
+        d = np.ones((len(points), len(coefs)))
+        d[:, 1:] = np.asarray(points, dtype=float).reshape(len(points), -1)
+        c = np.array(coefs, dtype=float).reshape(len(coefs), -1)
+        return tuple(array('d', row.tobytes()) for row in d @ c)
+    return tuple(
+        array('d', (
+            a + sum(s * x for s, x in zip(ss, p))
+            for a, *ss in zip(*coefs)))
+        for p in points)
+
+
+def scaled_energies(
+    sr: ScalingRelations
+    , points: Sequence[Sequence[float]]
+) -> tuple[tuple[array, ...], tuple[array, ...]]:
+    """Energies of the compounds and the transition states at each point of
+    a grid of descriptors.
+
+    Args:
+        sr (:obj:`ScalingRelations`): Scaling relations.
+        points (sequence of sequence of float): Descriptors of each point.
+
+    Returns:
+        tuple of the form (compounds, reactions), each one a matrix with a
+        row per point and a column per compound or unique reaction.
+
+    Raises:
+        :obj:`ValueError`: If a point does not have a value per descriptor.
+    """
+    n: int = len(sr.descriptors)
+    if any(len(p) != n for p in points):
+        raise ValueError(f"Each point needs {n} descriptors")
+    return (_eval_linear(sr.c_coefs, points), _eval_linear(sr.r_coefs, points))
+
+
+def _scaled_network(
+    nw: Network
+    , reactions: Sequence[Reaction]
+    , c_es: Sequence[float]
+    , r_es: Sequence[float]
+    , concs: Sequence[float] | None = None
+) -> Network:
+    """Network with the given energies of its compounds and of its unique
+    reactions, and optionally the given concentrations."""
+    cs = tuple(
+        c._replace(energy=e, conc=c.conc if concs is None else concs[i])
+        for i, (c, e) in enumerate(zip(nw.compounds, c_es)))
+    rs = tuple(
+        r._replace(energy=e)
+        for r, e in zip(nw.reactions, network_values(nw, reactions, r_es)))
+    return Network(compounds=cs, reactions=relink_reactions(rs, cs))
+
+
+class _Problem(NamedTuple):
+    """Data shared by all the points."""
+    nw: Network
+    m: MassAction
+    c: Sequence[float]
+    red: Reduction | None
+    quantity: str
+    product: int
+    cycle: CatalyticCycle | None
+    steps: tuple[int, ...]
+    cfg: ChemCfg
+    rtol: float
+    atol: float
+    max_iter: int
+
+
+def _cycle_tof(
+    p: _Problem
+    , c_es: Sequence[float]
+    , r_es: Sequence[float]
+) -> float:
+    """Energetic span TOF of the cycle with the energies of a point."""
+    nw: Network = _scaled_network(p.nw, p.m.engine.reactions, c_es, r_es)
+    cs = {c.idx: c for c in nw.compounds}
+
+    def comps(xs: Iterable[Compound]) -> tuple[Compound, ...]:
+        return tuple(cs[c.idx] for c in xs)
+
+    assert p.cycle is not None
+    cycle: CatalyticCycle = CatalyticCycle(
+        intermediates=comps(p.cycle.intermediates)
+        , steps=tuple(nw.reactions[j] for j in p.steps)
+        , reactants=comps(p.cycle.reactants)
+        , products=comps(p.cycle.products))
+    return energetic_span(cycle, p.cfg).tof
+
+
+def _screen(
+    energies: tuple[array, array]
+) -> tuple[float, array | None, array | None]:
+    """TOF, net rates and steady state of a point."""
+    p: _Problem = get_problem(_Problem)
+    c_es, r_es = energies
+    if p.quantity == "span":
+        return (_cycle_tof(p, c_es, r_es), None, None)
+    m: MassAction = p.m._replace(engine=update_ktable(
+        p.m.engine, c_energies=c_es, r_energies=r_es))
+    c: Sequence[float] = p.c
+    if p.quantity == "steady":
+        ss: SteadyState = solve_steady_state(
+            m, p.c, p.red, p.rtol, p.atol, p.max_iter)
+        if not ss.success:
+            return (nan, None, None)
+        c = ss.c
+    return (
+        mass_action_rhs(m, c)[p.product]
+        , eval_rates(m.engine, c).net
+        , array('d', c) if p.quantity == "steady" else None)
+
+
+def screen_catalysts(
+    nw: Network
+    , sr: ScalingRelations
+    , points: Sequence[Sequence[float]]
+    , quantity: ScreenQuantity = "steady"
+    , product: str | None = None
+    , cycle: CatalyticCycle | None = None
+    , chem_cfg: ChemCfg = ChemCfg()
+    , c0: Sequence[float] | None = None
+    , fixed: Iterable[int] = ()
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+    , max_workers: int | None = None
+    , chunksize: int = 16
+) -> ScreeningResult:
+    """Evaluate the turnover frequency of a network at each point of a grid
+    of descriptors.
+
+    Args:
+        nw (:obj:`Network`): Reference network.
+        sr (:obj:`ScalingRelations`): Scaling relations of the network, see
+            :obj:`build_scaling`.
+        points (sequence of sequence of float): Descriptors of each point,
+            e.g. from :obj:`descriptor_grid`.
+        quantity (str, optional): Evaluated quantity: "rates" for the net
+            rates at the initial concentrations, "steady" for the steady
+            state and its net rates and "span" for the energetic span model
+            of a catalytic cycle (see :obj:`energetic_span`). Defaults to
+            "steady".
+        product (str or None, optional): Name of the compound whose net
+            production rate is the TOF of "rates" and "steady". At the steady
+            state it should be held constant, see fixed. Defaults to None.
+        cycle (:obj:`CatalyticCycle` or None, optional): Cycle of the
+            reference network used by "span". If None, the first cycle found
+            by :obj:`find_catalytic_cycles` is used. Defaults to None.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        c0 (sequence of float or None, optional): Initial concentrations. If
+            None, the concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant in the steady states, see
+            :obj:`conservation_laws`. Defaults to ().
+        rtol (float, optional): Relative tolerance of the steady states.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance of the steady states.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves per steady
+            state. Defaults to 500.
+        max_workers (int or None, optional): Number of worker processes. If
+            1, the points are evaluated in the current process. If None, the
+            number of processors is used. Defaults to None.
+        chunksize (int, optional): Number of points sent to a worker at
+            once. Defaults to 16.
+
+    Returns:
+        :obj:`ScreeningResult` with the TOF of each point.
+
+    Raises:
+        :obj:`ValueError`: If the quantity is unknown, the product is missing
+            or not found, the network has no catalytic cycle, a step of the
+            cycle is not in the network or a point does not have a value per
+            descriptor.
+    """
+    if quantity not in ("rates", "steady", "span"):
+        raise ValueError(f"Unknown quantity {quantity}")
+    pts: tuple[tuple[float, ...], ...] = tuple(map(tuple, points))
+    c_rows, r_rows = scaled_energies(sr, pts)
+    m: MassAction = build_mass_action(nw, chem_cfg, sr.reactions)
+    c: Sequence[float] = initial_conc(nw) if c0 is None else c0
+    pos: int = -1
+    steps: tuple[int, ...] = ()
+    if quantity == "span":
+        if cycle is None:
+            cycle = next(find_catalytic_cycles(nw), None)
+        if cycle is None:
+            raise ValueError("No catalytic cycle found in the network")
+        # Matched as in the thermo plotter, so the cycle can come from
+        # another instance of the network
+        where: dict[tuple[int, str], int] = {
+            (r.idx, str(r)): j for j, r in enumerate(nw.reactions)}
+        missing: list[str] = [
+            str(r) for r in cycle.steps if (r.idx, str(r)) not in where]
+        if missing:
+            raise ValueError(
+                f"Steps of the cycle not found in the network: "
+                f"{', '.join(missing)}")
+        steps = tuple(where[(r.idx, str(r))] for r in cycle.steps)
+    else:
+        names: list[str] = [x.name for x in nw.compounds]
+        if product not in names:
+            raise ValueError(f"Product {product} not found in the network")
+        pos = names.index(product)
+    problem: _Problem = _Problem(
+        nw, m, c
+        , reduce_system(m, c, fixed) if quantity == "steady" else None
+        , quantity, pos, cycle, steps, chem_cfg, rtol, atol, max_iter)
+
+    tof: array = array('d')
+    rates: list[array | None] = []
+    concs: list[array | None] = []
+    for x, rs, cs in run_pool(
+            _screen, problem, zip(c_rows, r_rows), max_workers, chunksize):
+        tof.append(x)
+        rates.append(rs)
+        concs.append(cs)
+    return ScreeningResult(
+        relations=sr
+        , quantity=quantity
+        , chem_cfg=chem_cfg
+        , points=pts
+        , tof=tof
+        , rates=tuple(rates)
+        , concs=tuple(concs))
+
+
+def volcano_table(
+    res: ScreeningResult
+) -> tuple[tuple[str, ...], tuple[tuple[float, ...], ...]]:
+    """Volcano table of a screening, with the descriptors and the decimal
+    logarithm of the TOF of each point.
+
+    Args:
+        res (:obj:`ScreeningResult`): Result of the screening.
+
+    Returns:
+        tuple of the form (header, rows), with a row per point. The
+        logarithm is NaN for the failed points and -inf for those without
+        net production.
+    """
+    def log_tof(x: float) -> float:
+        if isnan(x):
+            return nan
+        return log10(x) if x > 0. else -inf
+
+    return (
+        res.relations.descriptors + ("log10_tof",)
+        , tuple(p + (log_tof(x),) for p, x in zip(res.points, res.tof)))
+
+
+def screening_network(
+    nw: Network
+    , res: ScreeningResult
+    , i: int
+) -> Network:
+    """Network at a point of a screening, with the scaled energies and, for
+    steady states, the concentrations of the point, ready for the plotters,
+    e.g. :obj:`kinetic.build_dotgraph` with :attr:`ScreeningResult.chem_cfg`.
+
+    Args:
+        nw (:obj:`Network`): Reference network.
+        res (:obj:`ScreeningResult`): Result of the screening.
+        i (int): Position of the point.
+
+    Returns:
+        :obj:`Network` at the point.
+    """
+    (c_es,), (r_es,) = scaled_energies(res.relations, res.points[i:i + 1])
+    return _scaled_network(
+        nw, res.relations.reactions, c_es, r_es, res.concs[i])
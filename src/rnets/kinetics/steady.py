@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""Steady state of the mass-action model of a network. The steady state is
+found with pseudo-transient continuation: damped Newton iterations on the
+balance equations whose damping vanishes as the residual decreases, so the
+first iterations follow the kinetics and the last ones converge
+quadratically. The compounds made dependent by the conservation laws are
+eliminated, so the conserved quantities of the initial concentrations, e.g.
+the total number of catalytic sites, are kept exactly.
+
+Sweeps over multiple temperatures warm start each solve from the solution of
+the previous temperature, only updating the kinetic constants of the model.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import NamedTuple
+
+from ..chemistry import ChemCfg, update_ktable
+from ..struct import Network
+from .conservation import Reduction, expand_vector, reduce_vector
+from .linalg import dense_solver
+from .ode import (
+    MassAction
+    , build_mass_action
+    , initial_conc
+    , mass_action_rhs
+    , mass_action_system
+    , reduce_system
+)
+
+
+class SteadyState(NamedTuple):
+    """Result of a steady state search.
+
+    Attributes:
+        c (array of float): Concentration vector at the steady state.
+        residual (float): Maximum absolute time derivative at :attr:`c`.
+        iterations (int): Number of linear solves.
+        success (bool): True if the tolerances were reached.
+        chem_cfg (:obj:`ChemCfg`): Chemical parameters of the model.
+    """
+    c: array
+    residual: float
+    iterations: int
+    success: bool
+    chem_cfg: ChemCfg
+
+
+def _residual(
+    f: Sequence[float]
+) -> float:
+    return max(map(abs, f), default=0.)
+
+
+def _step_norm(
+    c: Sequence[float]
+    , step: Sequence[float]
+    , rtol: float
+    , atol: float
+) -> float:
+    return max(
+        (abs(d) / (rtol * abs(x) + atol) for x, d in zip(c, step))
+        , default=0.)
+
+
+def solve_steady_state(
+    m: MassAction
+    , c0: Sequence[float]
+    , red: Reduction | None = None
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+    , dt0: float | None = None
+) -> SteadyState:
+    """Find the steady state of a mass-action system with pseudo-transient
+    continuation, keeping the conserved quantities of the initial
+    concentrations.
+
+    The time derivatives of stiff networks carry rounding errors of the order
+    of their fastest rates, so convergence is checked on the size of an
+    undamped Newton step instead.
+
+    Args:
+        m (:obj:`MassAction`): System to solve.
+        c0 (sequence of float): Initial concentrations.
+        red (:obj:`Reduction` or None, optional): Elimination of the dependent
+            compounds, defining the conserved quantities. If None, it will be
+            built from c0 with :obj:`reduce_system`. Defaults to None.
+        rtol (float, optional): Relative tolerance of the final Newton step.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance of the final Newton step.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves. Defaults to
+            500.
+        dt0 (float or None, optional): Initial pseudo time step. If None, the
+            inverse of the fastest relaxation rate will be used. Defaults to
+            None.
+
+    Returns:
+        :obj:`SteadyState` with the solution.
+    """
+    red = reduce_system(m, c0) if red is None else red
+    rhs, jac_fn = mass_action_system(m, red)
+
+    def full(x: Sequence[float]) -> Sequence[float]:
+        return x if red is None else expand_vector(red, x)
+
+    x: list[float] = list(c0 if red is None else reduce_vector(red, c0))
+    c: Sequence[float] = full(x)
+    n: int = len(x)
+    f: Sequence[float] = rhs(x)
+    res: float = _residual(mass_action_rhs(m, c))
+    dt: float | None = dt0
+    newton: bool = False
+    success: bool = False
+    it: int = 0
+    while it < max_iter and dt != 0.:
+        jac: list[list[float]] = jac_fn(x)
+        if dt is None:
+            fastest: float = max(
+                (abs(jac[i][i]) for i in range(n)), default=0.)
+            dt = 1. / fastest if fastest > 0. else 1.
+        shift: float = 0. if newton else 1. / dt
+        it += 1
+        try:
+            step: list[float] = dense_solver([
+                [(shift if i == jj else 0.) - v for jj, v in enumerate(row)]
+                for i, row in enumerate(jac)])(f)
+        except ZeroDivisionError:
+            newton = False
+            dt /= 10.
+            continue
+        small: bool = _step_norm(x, step, rtol, atol) <= 1.
+        x_new: list[float] = [v + d for v, d in zip(x, step)]
+        if any(v > 0. and w < 0. for v, w in zip(c, full(x_new))):
+            # Retry with a shorter pseudo time step, which keeps the
+            # concentrations non negative
+            newton = False
+            dt /= 4.
+            continue
+        # Depleted compounds can only overshoot to negative values by second
+        # order terms, and are clipped
+        x = [max(v, 0.) for v in x_new]
+        c = full(x)
+        f = rhs(x)
+        res_new: float = _residual(mass_action_rhs(m, c))
+        if newton and small:
+            success = True
+            res = res_new
+            break
+        # Switch to Newton once the pseudo time steps stop changing the
+        # concentrations
+        newton = small and not newton
+        if res_new > 0.:
+            # Switched evolution relaxation, growing at least geometrically
+            # while the residual does not increase
+            ratio: float = res / res_new
+            dt *= min(max(ratio, 1.5) if ratio >= 1. else max(ratio, 0.1), 1e3)
+        res = res_new
+    return SteadyState(
+        c=array('d', c), residual=res, iterations=it, success=success
+        , chem_cfg=m.engine.kt.chem_cfg)
+
+
+def steady_state(
+    nw: Network
+    , chem_cfg: ChemCfg = ChemCfg()
+    , c0: Sequence[float] | None = None
+    , fixed: Iterable[int] = ()
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+) -> SteadyState:
+    """Build the mass-action model of a network and find its steady state.
+
+    Args:
+        nw (:obj:`Network`): Network to solve.
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters used to
+            compute the kinetic constants. Defaults to :obj:`ChemCfg`.
+        c0 (sequence of float or None, optional): Initial concentrations. If
+            None, the concentrations of the network will be used, see
+            :obj:`initial_conc`. Defaults to None.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant, see :obj:`conservation_laws`. Defaults to ().
+        rtol (float, optional): Relative tolerance on the concentrations.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance on the concentrations.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves. Defaults to
+            500.
+
+    Returns:
+        :obj:`SteadyState` of the network.
+    """
+    m: MassAction = build_mass_action(nw, chem_cfg)
+    c0 = initial_conc(nw) if c0 is None else c0
+    return solve_steady_state(
+        m
+        , c0
+        , reduce_system(m, c0, fixed)
+        , rtol=rtol
+        , atol=atol
+        , max_iter=max_iter)
+
+
+def steady_state_sweep(
+    nw: Network
+    , cfgs: Iterable[ChemCfg]
+    , c0: Sequence[float] | None = None
+    , fixed: Iterable[int] = ()
+    , rtol: float = 1e-8
+    , atol: float = 1e-15
+    , max_iter: int = 500
+) -> Iterator[SteadyState]:
+    """Find the steady state of a network at multiple chemical
+    configurations, e.g. the temperatures of a sweep (see
+    :obj:`calc_k_sweep`). The model and its conservation laws are built once
+    and each solve is warm started from the previous solution.
+
+    Args:
+        nw (:obj:`Network`): Network to solve.
+        cfgs (iterable of :obj:`ChemCfg`): Chemical configurations, in
+            continuation order.
+        c0 (sequence of float or None, optional): Initial concentrations of
+            the first solve, defining the conserved quantities. If None, the
+            concentrations of the network will be used. Defaults to None.
+        fixed (iterable of int, optional): Compounds whose concentration is
+            held constant, see :obj:`conservation_laws`. Defaults to ().
+        rtol (float, optional): Relative tolerance on the concentrations.
+            Defaults to 1e-8.
+        atol (float, optional): Absolute tolerance on the concentrations.
+            Defaults to 1e-15.
+        max_iter (int, optional): Maximum number of linear solves per
+            configuration. Defaults to 500.
+
+    Yields:
+        :obj:`SteadyState` of each configuration. If a solve fails, the next
+        one restarts from the initial concentrations.
+    """
+    m: MassAction | None = None
+    red: Reduction | None = None
+    start: Sequence[float] = initial_conc(nw) if c0 is None else c0
+    guess: Sequence[float] = start
+    for cfg in cfgs:
+        if m is None:
+            m = build_mass_action(nw, cfg)
+            red = reduce_system(m, start, fixed)
+        else:
+            m = m._replace(engine=update_ktable(m.engine, chem_cfg=cfg))
+        ss: SteadyState = solve_steady_state(
+            m, guess, red, rtol, atol, max_iter)
+        if not ss.success and guess is not start:
+            ss = solve_steady_state(m, start, red, rtol, atol, max_iter)
+        guess = ss.c if ss.success else start
+        yield ss
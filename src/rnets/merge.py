@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Merge multiple reaction networks into a single one. Compounds are matched by
+name and reactions by their participants, using hash indexes, so merging takes
+time linear with the total size of the networks.
+"""
+
+from collections.abc import Iterable, Sequence
+from enum import auto, StrEnum
+
+from .struct import Compound, Network, Reaction
+
+
+type ReactionKey = tuple[tuple[str, ...], tuple[str, ...]]
+
+
+class MergePolicy(StrEnum):
+    """Policy used to settle conflicting values of matched elements.
+
+    first -> Keep the value of the first network.
+    last -> Keep the value of the last network.
+    min -> Keep the minimum value.
+    max -> Keep the maximum value.
+    mean -> Use the mean of the values.
+    strict -> Raise a :obj:`ValueError` if the values differ.
+    """
+    First = auto()
+    Last = auto()
+    Min = auto()
+    Max = auto()
+    Mean = auto()
+    Strict = auto()
+
+
+def reaction_key(
+    r: Reaction
+) -> ReactionKey:
+    """Build the key used to match reactions, consisting of the sorted names
+    of the reactants and the sorted names of the products.
+
+    Args:
+        r (:obj:`Reaction`): Reaction to index.
+
+    Returns:
+        tuple with the sorted names of the reactants and products.
+    """
+    return (
+        tuple(sorted(c.name for c in r.compounds[0]))
+        , tuple(sorted(c.name for c in r.compounds[1])))
+
+
+def settle(
+    xs: Sequence[float]
+    , policy: MergePolicy = MergePolicy.First
+    , what: str = "value"
+) -> float:
+    """Settle a set of conflicting values using a policy.
+
+    Args:
+        xs (sequence of float): Values to settle, in network order.
+        policy (:obj:`MergePolicy`, optional): Policy to apply. Defaults to
+            :obj:`MergePolicy.First`.
+        what (str, optional): Description of the values, used in the error
+            message. Defaults to "value".
+
+    Returns:
+        float with the settled value.
+
+    Raises:
+        :obj:`ValueError`: If the policy is :obj:`MergePolicy.Strict` and the
+            values differ, or if the policy is unknown.
+    """
+    match policy:
+        case MergePolicy.First: return xs[0]
+        case MergePolicy.Last: return xs[-1]
+        case MergePolicy.Min: return min(xs)
+        case MergePolicy.Max: return max(xs)
+        case MergePolicy.Mean: return sum(xs) / len(xs)
+        case MergePolicy.Strict:
+            if any(x != xs[0] for x in xs):
+                raise ValueError(f"Conflicting values for {what}: {xs}")
+            return xs[0]
+        case _:
+            raise ValueError(f"Unknown merge policy {policy}")
+
+
+def merge_networks(
+    nws: Iterable[Network]
+    , policy: MergePolicy = MergePolicy.First
+) -> Network:
+    """Union of multiple networks.
+
+    Args:
+        nws (iterable of :obj:`Network`): Networks to merge.
+        policy (:obj:`MergePolicy`, optional): Policy used to settle the
+            energies and the concentrations of the compounds and reactions
+            present in more than one network. Defaults to
+            :obj:`MergePolicy.First`.
+
+    Returns:
+        :obj:`Network` with the merged compounds and reactions. The compounds
+        are renumbered following the order of first appearance. Reactions
+        matching an already merged reaction, or its reverse from a previous
+        network, keep its idx, while the new ones receive a new idx per
+        original idx, so bidirectional pairs still share the same idx.
+
+    Raises:
+        :obj:`ValueError`: If policy is :obj:`MergePolicy.Strict` and a value
+            differs between networks.
+
+    Note:
+        Attributes other than the energy and the concentration, e.g. the
+        visibility or the options, are taken from the first appearance of the
+        element. Concentrations are only settled among the networks that
+        define them.
+    """
+    cs: dict[str, Compound] = {}
+    c_es: dict[str, list[float]] = {}
+    c_concs: dict[str, list[float]] = {}
+    rs: dict[ReactionKey, Reaction] = {}
+    r_es: dict[ReactionKey, list[float]] = {}
+    n_ridx: int = 0
+
+    for nw in nws:
+        for c in nw.compounds:
+            if c.name not in cs:
+                cs[c.name] = c._replace(idx=len(cs))
+                c_es[c.name] = []
+                c_concs[c.name] = []
+            c_es[c.name].append(c.energy)
+            if c.conc is not None:
+                c_concs[c.name].append(c.conc)
+
+        keys: list[ReactionKey] = [reaction_key(r) for r in nw.reactions]
+        g_map: dict[int, int] = {}
+        for k, r in zip(keys, nw.reactions):
+            if k in rs:
+                g_map.setdefault(r.idx, rs[k].idx)
+        # A reverse merged from a previous network forms a bidirectional pair
+        for (lhs, rhs), r in zip(keys, nw.reactions):
+            if (rhs, lhs) in rs:
+                g_map.setdefault(r.idx, rs[rhs, lhs].idx)
+        for k, r in zip(keys, nw.reactions):
+            if k in rs:
+                r_es[k].append(r.energy)
+                continue
+            if r.idx not in g_map:
+                g_map[r.idx] = n_ridx
+                n_ridx += 1
+            rs[k] = r._replace(idx=g_map[r.idx])
+            r_es[k] = [r.energy]
+
+    m_cs: dict[str, Compound] = {
+        n: c._replace(
+            energy=settle(c_es[n], policy, f"energy of {n}")
+            , conc=settle(c_concs[n], policy, f"concentration of {n}")
+                if c_concs[n] else None)
+        for n, c in cs.items()}
+
+    def relink(xs: tuple[Compound, ...]) -> tuple[Compound, ...]:
+        return tuple(m_cs[x.name] for x in xs)
+
+    m_rs: list[Reaction] = [
+        r._replace(
+            compounds=(relink(r.compounds[0]), relink(r.compounds[1]))
+            , energy=settle(r_es[k], policy, f"energy of {r.name}"))
+        for k, r in rs.items()]
+    m_rs.sort(key=lambda r: r.idx)
+
+    return Network(compounds=tuple(m_cs.values()), reactions=tuple(m_rs))
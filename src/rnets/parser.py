@@ -7,11 +7,12 @@ Attributes:
     O (type): Type variable.
 """
 
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from enum import auto, StrEnum
 from functools import reduce
 from itertools import chain
 from pathlib import Path
+from .chemistry import DEF_T, eval_free_energy
 from .struct import Compound, FFlags, Network, Reaction, Visibility
 
 
@@ -23,6 +24,9 @@ class CompoundCol(StrEnum):
     Opts = auto()
     Fflags = auto()
     Conc = auto()
+    Enthalpy = auto()
+    Entropy = auto()
+    Gpoly = auto()
 
 
 class Direction(StrEnum):
@@ -41,17 +45,18 @@ class ReactionCol(StrEnum):
     Visible = auto()
     Name = auto()
     Opts = auto()
+    Enthalpy = auto()
+    Entropy = auto()
+    Gpoly = auto()
 
 
-REQ_COMP_COL: set[CompoundCol] = set((
-    CompoundCol.Name
-    , CompoundCol.Energy
-))
+# The energy can be replaced by the enthalpy and the entropy or by a free
+# energy polynomial, see parse_energy
+REQ_COMP_COL: set[CompoundCol] = set((CompoundCol.Name,))
 
 REQ_REACT_COL: set[ReactionCol] = set((
     ReactionCol.CLeft
     , ReactionCol.CRight
-    , ReactionCol.Energy
 ))
 
 
@@ -190,18 +195,95 @@ def parse_compound_line(
         Check :obj:`Compound` for possible values and :obj:`REQ_COMP_COL` for
             required values.
     """
-    kw: dict[CompoundCol, str] = dict(
-            zip(h, l.split(','))
+    kw: dict[str, str] = dict(
+            zip(h, split_fields(l))
         )
     vis: str | None = kw.get(CompoundCol.Visible)
+    g: tuple[float, ...] | None = parse_thermo(kw)
     return Compound(
         name=kw[CompoundCol.Name]
-        , energy=float(kw[CompoundCol.Energy])
+        , energy=parse_energy(kw, g)
         , idx=idx
         , visible=Visibility.TRUE if vis is None else parse_vis(vis)
         , fflags=apply_maybe(parse_fflags, kw.get(CompoundCol.Fflags))
         , conc=apply_maybe(parse_conc, kw.get(CompoundCol.Conc))
-        , opts=apply_maybe(parse_opts, kw.get(CompoundCol.Opts)))
+        , opts=apply_maybe(parse_opts, kw.get(CompoundCol.Opts))
+        , g_coefs=g)
+
+
+def parse_gpoly(
+    s: str
+) -> tuple[float, ...] | None:
+    """Parse the coefficients of a free energy polynomial of the temperature.
+
+    Args:
+        s (str): String to parse. Should contain the coefficients in
+            increasing degree separated by colons, e.g. 0.1:-1e-3.
+
+    Returns:
+        tuple of float with the coefficients, or None if s is empty.
+    """
+    if s == '':
+        return None
+    return tuple(map(float, s.split(':')))
+
+
+def parse_thermo(
+    kw: Mapping[str, str]
+) -> tuple[float, ...] | None:
+    """Parse the free energy polynomial of a compound or a reaction from its
+    gpoly column or from its enthalpy and entropy columns, G = H - T S.
+
+    Args:
+        kw (mapping of str as keys and str as values): Values of the line, by
+            column name.
+
+    Returns:
+        tuple of float with the polynomial coefficients (see
+        :attr:`Compound.g_coefs`), or None if the columns are missing or
+        empty.
+
+    Raises:
+        :obj:`ValueError`: If the entropy is given without the enthalpy.
+    """
+    g: tuple[float, ...] | None = apply_maybe(parse_gpoly, kw.get("gpoly"))
+    if g is not None:
+        return g
+    h: str = kw.get("enthalpy", '')
+    s: str = kw.get("entropy", '')
+    if h == '' and s != '':
+        raise ValueError("Entropy value given without enthalpy")
+    if h == '':
+        return None
+    return (float(h),) if s == '' else (float(h), -float(s))
+
+
+def parse_energy(
+    kw: Mapping[str, str]
+    , g: tuple[float, ...] | None
+) -> float:
+    """Parse the energy of a compound or a reaction. If the energy column is
+    missing or empty, the free energy polynomial is evaluated at the standard
+    temperature.
+
+    Args:
+        kw (mapping of str as keys and str as values): Values of the line,
+            by column name.
+        g (tuple of float or None): Free energy polynomial of the line (see
+            :obj:`parse_thermo`).
+
+    Returns:
+        float with the energy.
+
+    Raises:
+        :obj:`ValueError`: If there is neither an energy nor a polynomial.
+    """
+    e: str = kw.get("energy", '')
+    if e != '':
+        return float(e)
+    if g is None:
+        raise ValueError("Missing energy, enthalpy or gpoly value")
+    return eval_free_energy(g, DEF_T)
 
 
 def parse_conc(
@@ -242,6 +324,27 @@ def parse_fflags(
         , list(FFlags)))
 
 
+def split_fields(
+    l: str
+) -> list[str]:
+    """Split a line in its comma separated values, removing the double quotes
+    around a value, e.g. "name","energy" as written by some spreadsheets.
+
+    Args:
+        l (str): Line to split.
+
+    Returns:
+        list of str with the values of the line.
+
+    Note:
+        Commas inside quoted values are not supported.
+    """
+    return [
+        x[1:-1] if len(x) > 1 and x[0] == x[-1] == '"' else x
+        for x in l.split(',')
+    ]
+
+
 def parse_lines[T, S: StrEnum](
     s: str
     , h: type[S]
@@ -261,7 +364,7 @@ def parse_lines[T, S: StrEnum](
         of :attr:fn.
     """
     rh, *ls = s.splitlines()
-    ph: list[S] = list(map(h, rh.split(',')))
+    ph: list[S] = list(map(h, split_fields(rh)))
 
     if not r.issubset(h):
         raise ValueError(
@@ -426,7 +529,7 @@ def parse_reaction_line(
 
     (cl, cr), arg = reduce(
         reduce_fn
-        , zip(h, l.split(','))
+        , zip(h, split_fields(l))
         , (([], []), [])
     )
     kw: dict[str, str] = dict(arg)
@@ -441,13 +544,15 @@ def parse_reaction_line(
         case _:
             ncs = ((tuple(cl), tuple(cr)),)
 
+    g: tuple[float, ...] | None = parse_thermo(kw)
     return tuple(map(
         lambda xs: Reaction(
             name=str(kw[ReactionCol.Name])
             , compounds=xs
-            , energy=float(kw[ReactionCol.Energy])
+            , energy=parse_energy(kw, g)
             , idx=int(idx)
             , visible=Visibility.TRUE if vis is None else parse_vis(vis)
-            , opts=apply_maybe(parse_opts, kw.get(CompoundCol.Opts)))
+            , opts=apply_maybe(parse_opts, kw.get(CompoundCol.Opts))
+            , g_coefs=g)
         , ncs
     ))
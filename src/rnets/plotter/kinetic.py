@@ -4,18 +4,19 @@ kinetic behavior of the system. The background of the nodes is colored
 depending on their concentration, while the width of the edges and the
 direction of the arrows is decided based on the calculated net rate.
 """
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from itertools import chain, repeat, starmap
-from functools import partial, reduce
-from typing import Callable, Iterator, Iterable
+from math import inf
+from typing import Callable, Iterator
 
 from ..colors.utils import Color, ColorSpace, interp_cs
 from ..chemistry import (
-    calc_net_rate
-    , normalizer
-    , minmax
-    , ChemCfg
+    ChemCfg
     , network_conc_normalizer
+    , network_rate_normalizer
+    , network_stats
+    , NetworkStats
+    , unique_reactions
 )
 from ..addons.colorbar import build_colorbar, build_anchor, ColorbarCfg
 from ..dot import Edge, Graph, Node
@@ -36,6 +37,8 @@ def get_colorbar(
     , graph_cfg: GraphCfg
     , colorbar_cfg: ColorbarCfg
     , colorspace: ColorSpace="lab"
+    , chem_cfg: ChemCfg = ChemCfg()
+    , stats: NetworkStats | None = None
 ) -> tuple[Node, Edge | tuple[()]]:
     """Build a colorbar for the thermodynamic plot.
 
@@ -46,17 +49,21 @@ def get_colorbar(
             parameters of the system. Defaults to None.
         colorspace (ColorSpace, optional): Colorspace of the colorbar. Defaults
             to "lab".
+        chem_cfg (:obj:`ChemCfg`, optional): Chemical parameters fo the
+            system, used to retrieve the cached network statistics. Defaults
+            to :obj:`ChemCfg`.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network. If None, the cached statistics will be
+            used. Defaults to None.
 
     Returns:
         tuple of two values, the first one being a obj:`Node` representing the
         color bar and the second value being an invisible edge that anchors the
         colorbar to another node.
     """
-    def f_none[T](xs: Iterable[T | None]) -> Iterable[T]:
-        return (x for x in xs if x is not None)
-    c_range = minmax(starmap(
-            getattr
-            , zip(f_none(nw.compounds), repeat("conc"))))
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
+    c_range = stats.c_range
     anchor: Edge | tuple[()] = ()
     if colorbar_cfg.anchor is not None:
         anchor = build_anchor(colorbar_cfg.anchor, colorbar_cfg.node_name)
@@ -82,12 +89,7 @@ def filter_unique_react(
     Returns:
         Tuple containing the unique :obj:`Reaction` s.
     """
-    def r_fn(xs: tuple[Reaction, ...], x: Reaction) -> tuple[Reaction, ...]:
-        cmp_hash: int = hash(tuple(reversed(x.compounds)))
-        fn_check = lambda y: hash(y.compounds) == cmp_hash
-        return xs if any(map(fn_check, xs)) else xs + (x,)
-
-    return reduce(r_fn, rs, ())
+    return unique_reactions(rs)
 
 
 def build_dotgraph(
@@ -95,6 +97,9 @@ def build_dotgraph(
     , graph_cfg: GraphCfg = GraphCfg()
     , chem_cfg: ChemCfg = ChemCfg()
     , colorbar_cfg: ColorbarCfg | None = None
+    , stats: NetworkStats | None = None
+    , node_values: Sequence[float] | None = None
+    , node_fmt: str = "{:.2e}"
 ) -> Graph:
     """Build a kinetic dotgraph from a reaction network.
 
@@ -106,20 +111,41 @@ def build_dotgraph(
             system. Defaults to :obj:`ChemCfg`
         colorbar_cfg (:obj:`ColorbarCfg` or None, optional): Colorbar
             parameters of the system. Defaults to None.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network, e.g. one temperature of a sweep (see
+            :obj:`sweep_network_stats`). If None, the cached statistics of
+            the network will be used. Defaults to None.
+        node_values (sequence of float or None, optional): Value of each
+            compound of the network, e.g. its production flux (see
+            :obj:`network_flux_balance`), written next to its node. Defaults
+            to None.
+        node_fmt (str, optional): Format of the node values. Defaults to
+            "{:.2e}".
 
     Returns:
         Dot :obj:`Graph` representing the kinetic information with the colors
         and shapes of the network.
+
+    Raises:
+        :obj:`ValueError`: If node_values does not have a value per compound.
     """
+    if node_values is not None and len(node_values) != len(nw.compounds):
+        raise ValueError(
+            f"Got {len(node_values)} node values for {len(nw.compounds)} "
+            "compounds")
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
     if colorbar_cfg is None:
         cb_node, cb_edge = ((),())
     else:
         cb_node, cb_edge = get_colorbar(
             nw
             , graph_cfg
-            , colorbar_cfg)
+            , colorbar_cfg
+            , chem_cfg=chem_cfg
+            , stats=stats)
     c_norm: Callable[[float], Color] = color_interp(
-        norm_fn=network_conc_normalizer(nw)
+        norm_fn=network_conc_normalizer(nw, chem_cfg, stats)
         , cs=graph_cfg.colorscheme
         , offset=graph_cfg.color_offset
     )
@@ -140,9 +166,11 @@ def build_dotgraph(
         # TODO: Draw it with lines
         e_dir = repeat(False)
     else:
-        rates: tuple[float, ...] = tuple(map(
-            partial(calc_net_rate, T=chem_cfg.T, A=chem_cfg.A, kb=chem_cfg.kb)
-            , u_react))
+        r_map: dict[Reaction, float | None] = dict(zip(
+            nw.reactions, stats.rates))
+        # Reactions without a net rate get the minimum width
+        rates: tuple[float, ...] = tuple(
+            0. if x is None else x for x in map(r_map.__getitem__, u_react))
 
         def e_width_aux(x: float) -> float:
             assert graph_cfg.edge.max_width is not None
@@ -151,17 +179,38 @@ def build_dotgraph(
         e_widths: Iterator[float] = map(
             e_width_aux
             , map(
-                normalizer(*minmax(map(abs, rates)))
+                network_rate_normalizer(nw, chem_cfg, stats)
                 , rates)
         )
         e_dir = map(lambda x: x < 0, rates)
+        if graph_cfg.edge.log_scale:
+            l_map: dict[Reaction, tuple[float | None, int]] = dict(zip(
+                nw.reactions, zip(stats.log_rates, stats.rate_signs)))
+            l_rates: tuple[tuple[float | None, int], ...] = tuple(
+                map(l_map.__getitem__, u_react))
+            e_widths = map(
+                e_width_aux
+                , map(
+                    network_rate_normalizer(nw, chem_cfg, stats, True)
+                    , (-inf if x is None else x for x, _ in l_rates))
+            )
+            e_dir = map(lambda x: x[1] < 0, l_rates)
+
+    def annotate(n: Node, x: float | None) -> Node:
+        if x is None:
+            return n
+        return n._replace(options=(n.options or {}) | {
+            "xlabel": f'"{node_fmt.format(x)}"'})
 
+    n_values: Iterable[float | None] = (
+        repeat(None) if node_values is None else node_values)
     return Graph(
         kind=graph_cfg.kind
-        , nodes=tuple(map(
-            lambda c: build_dotnode(c, *n_color_fn(c.conc, c.visible))
-            , filter(lambda c: c.visible != Visibility.FALSE, nw.compounds)
-        )) + ((cb_node,) if cb_node else cb_node)
+        , nodes=tuple(
+            annotate(build_dotnode(c, *n_color_fn(c.conc, c.visible)), x)
+            for c, x in zip(nw.compounds, n_values)
+            if c.visible != Visibility.FALSE
+        ) + ((cb_node,) if cb_node else cb_node)
         , edges=tuple(chain.from_iterable(starmap(
             build_dotedges
             , filter(
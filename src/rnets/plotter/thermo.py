@@ -5,17 +5,23 @@ the fill color of the edges is set depending on their energies, while the width
 of the edges is based on their computed kinetic constants.
 """
 from itertools import chain, repeat, starmap
-from typing import Callable, Iterator
+from math import isfinite
+from typing import Callable, Iterator, Sequence
 
-from ..colors.utils import Color, ColorSpace, interp_cs
+from ..colors.palettes import css
+from ..colors.utils import Color, ColorSpace, interp_cs, rgb_to_hexstr
 from ..chemistry import (
-    network_energy_normalizer
-    , minmax
-    , calc_reactions_k_norms
+    minmax
+    , network_energy_normalizer
+    , network_k_normalizer
+    , network_stats
+    , normalizer
+    , EnergeticSpan
+    , NetworkStats
     , ChemCfg
 )
 from ..dot import Edge, Node, Graph
-from ..struct import Network, Visibility
+from ..struct import Compound, Network, Reaction, Visibility
 
 from ..addons.colorbar import build_colorbar, build_anchor, ColorbarCfg
 from .utils import (
@@ -29,12 +35,16 @@ from .utils import (
 )
 
 
+C_HIGHLIGHT: Color = css["crimson"]
+
+
 def get_colorbar(
     nw: Network
     , graph_cfg: GraphCfg
     , chem_cfg: ChemCfg
     , colorbar_cfg: ColorbarCfg
     , colorspace: ColorSpace="lab"
+    , stats: NetworkStats | None = None
 ) -> tuple[Node, Edge | tuple[()]]:
     """Build a colorbar for the thermodynamic plot.
 
@@ -47,17 +57,18 @@ def get_colorbar(
             parameters of the system. Defaults to None.
         colorspace (ColorSpace, optional): Colorspace of the colorbar. Defaults
             to "lab".
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network. If None, the cached statistics will be
+            used. Defaults to None.
 
     Returns:
         tuple of two values, the first one being a obj:`Node` representing the
         color bar and the second value being an invisible edge that anchors the
         colorbar to another node.
     """
-    c_range = minmax(chain.from_iterable(map(
-        lambda xs: starmap(
-            getattr
-            , zip(xs, repeat("energy")))
-        , (nw.compounds, nw.reactions))))
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
+    c_range = stats.e_range
     anchor: Edge | tuple[()] = ()
     if colorbar_cfg.anchor is not None:
         anchor = build_anchor(colorbar_cfg.anchor, colorbar_cfg.node_name)
@@ -70,11 +81,62 @@ def get_colorbar(
         , anchor)
 
 
+def highlighter(
+    es: EnergeticSpan | None
+    , color: Color = C_HIGHLIGHT
+) -> tuple[Callable[[Compound, Node], Node], Callable[[Reaction], Reaction]]:
+    """Build the functions marking the catalytic cycle of an energetic span
+    in a thermodynamic graph.
+
+    Args:
+        es (:obj:`EnergeticSpan` or None): Energetic span to highlight. If
+            None, nothing is marked.
+        color (:obj:`Color`, optional): Color of the cycle. Defaults to
+            :obj:`C_HIGHLIGHT`.
+
+    Returns:
+        tuple of functions, the first taking a :obj:`Compound` and its
+        :obj:`Node` and returning the node, boxed and labeled if it is the TOF
+        determining intermediate, and the second taking a :obj:`Reaction` and
+        returning it with the color of the cycle if it is one of its steps,
+        labeling the TOF determining transition state.
+    """
+    if es is None:
+        return (lambda c, n: n, lambda r: r)
+    hex_c: str = f'"{rgb_to_hexstr(color, inc_hash=True)}"'
+    tdi: int = es.cycle.intermediates[es.tdi].idx
+    steps: dict[tuple[int, str], int] = {
+        (r.idx, str(r)): k for k, r in enumerate(es.cycle.steps)}
+
+    def hl_node(c: Compound, n: Node) -> Node:
+        if c.idx != tdi:
+            return n
+        return n._replace(options=(n.options or {}) | {
+            "shape": "box"
+            , "color": hex_c
+            , "penwidth": "2"
+            , "xlabel": '"TDI"'})
+
+    def hl_react(r: Reaction) -> Reaction:
+        k: int | None = steps.get((r.idx, str(r)))
+        if k is None:
+            return r
+        return r._replace(opts=(r.opts or {}) | {"color": hex_c} | (
+            {"xlabel": '"TDTS"'} if k == es.tdts else {}))
+
+    return (hl_node, hl_react)
+
+
 def build_dotgraph(
     nw: Network
     , graph_cfg: GraphCfg = GraphCfg()
     , chem_cfg: ChemCfg = ChemCfg()
     , colorbar_cfg: ColorbarCfg | None = None
+    , stats: NetworkStats | None = None
+    , width_values: Sequence[float] | None = None
+    , color_values: Sequence[float] | None = None
+    , highlight: EnergeticSpan | None = None
+    , highlight_color: Color = C_HIGHLIGHT
 ) -> Graph:
     """Build a dotgraph from a reaction network.
     
@@ -87,10 +149,35 @@ def build_dotgraph(
             system. Defaults to :obj:`ChemCfg`
         colorbar_cfg (:obj:`ColorbarCfg` or None, optional): Colorbar
             parameters of the system. Defaults to None.
+        stats (:obj:`NetworkStats` or None, optional): Precomputed
+            statistics of the network, e.g. one temperature of a sweep (see
+            :obj:`sweep_network_stats`). If None, the cached statistics of
+            the network will be used. Defaults to None.
+        width_values (sequence of float or None, optional): Value of each
+            reaction of the network, e.g. its degree of rate control (see
+            :obj:`network_values`), used for the edge widths instead of the
+            kinetic constants when the maximum edge width is set. The widths
+            grow with the absolute values. Reactions without a finite value
+            get the minimum width. Defaults to None.
+        color_values (sequence of float or None, optional): Value of each
+            reaction of the network used for the edge colors instead of the
+            energies, normalized between their finite minimum and maximum.
+            Reactions without a finite value get the color of the minimum.
+            The colorbar keeps showing the energies of the nodes. Defaults to
+            None.
+        highlight (:obj:`EnergeticSpan` or None, optional): Energetic span of
+            a catalytic cycle to highlight (see :obj:`energetic_span`). The
+            steps of the cycle are drawn with the highlight color, and the
+            TOF determining intermediate and transition state are labeled as
+            TDI and TDTS. Defaults to None.
+        highlight_color (:obj:`Color`, optional): Color of the highlighted
+            cycle. Defaults to :obj:`C_HIGHLIGHT`.
 
     Returns:
         Dot :obj:`Graph` with the colors and shapes of the netwkork.
     """
+    if stats is None:
+        stats = network_stats(nw, chem_cfg)
     if colorbar_cfg is None:
         cb_node, cb_edge = ((),())
     else:
@@ -98,9 +185,10 @@ def build_dotgraph(
             nw
             , graph_cfg
             , chem_cfg
-            , colorbar_cfg)
+            , colorbar_cfg
+            , stats=stats)
     c_norm: Callable[[float], Color] = color_interp(
-        norm_fn=network_energy_normalizer(nw)
+        norm_fn=network_energy_normalizer(nw, chem_cfg, stats)
         , cs=graph_cfg.colorscheme
         , offset=graph_cfg.color_offset
     )
@@ -114,24 +202,44 @@ def build_dotgraph(
     e_widths: Iterator[float]
     if graph_cfg.edge.max_width is None:
         e_widths = repeat(graph_cfg.edge.width)
+    elif width_values is not None:
+        w_abs: tuple[float, ...] = tuple(
+            abs(x) if isfinite(x) else 0. for x in width_values)
+        w_norm: Callable[[float], float] = normalizer(
+            0., max(w_abs, default=0.))
+        w_min: float = graph_cfg.edge.width
+        w_ran: float = graph_cfg.edge.max_width - w_min
+        e_widths = map(lambda x: w_norm(x) * w_ran + w_min, w_abs)
     else:
-        e_widths = calc_reactions_k_norms(
-            rs=nw.reactions
-            , T=chem_cfg.T
-            , A=chem_cfg.A
-            , kb=chem_cfg.kb
-            , norm_range=(graph_cfg.edge.width, graph_cfg.edge.max_width)
-          )
+        log_scale: bool = graph_cfg.edge.log_scale
+        k_norm: Callable[[float], float] = network_k_normalizer(
+            nw, chem_cfg, stats, log_scale)
+        w_min: float = graph_cfg.edge.width
+        w_ran: float = graph_cfg.edge.max_width - w_min
+        e_widths = map(
+            lambda k: k_norm(k) * w_ran + w_min
+            , stats.log_ks if log_scale else stats.ks)
     e_colors: Iterator[Color]
-    if graph_cfg.edge.solid_color is None:
-        e_colors = map(lambda r: c_norm(r.energy), nw.reactions)
-    else:
+    if graph_cfg.edge.solid_color is not None:
         e_colors = repeat(graph_cfg.edge.solid_color)
+    elif color_values is not None:
+        finite: tuple[float, ...] = tuple(filter(isfinite, color_values))
+        lo, hi = minmax(finite) if finite else (0., 0.)
+        e_colors = map(
+            color_interp(
+                norm_fn=normalizer(lo, hi)
+                , cs=graph_cfg.colorscheme
+                , offset=graph_cfg.color_offset)
+            , (x if isfinite(x) else lo for x in color_values))
+    else:
+        e_colors = map(lambda r: c_norm(r.energy), nw.reactions)
 
+    hl_node, hl_react = highlighter(highlight, highlight_color)
     return Graph(
         kind=graph_cfg.kind
         , nodes=tuple(map(
-            lambda c: build_dotnode(c, *n_color_fn(c.energy, c.visible))
+            lambda c: hl_node(
+                c, build_dotnode(c, *n_color_fn(c.energy, c.visible)))
             , filter(lambda c: c.visible != Visibility.FALSE, nw.compounds)
         )) + ((cb_node,) if cb_node else cb_node)
         , edges=tuple(chain.from_iterable(starmap(
@@ -139,7 +247,7 @@ def build_dotgraph(
             , filter(
                 # Tuple for __getitem__
                 lambda xs: EdgeArgs(*xs).react.visible != Visibility.FALSE
-                , zip(nw.reactions, e_widths, e_colors)
+                , zip(map(hl_react, nw.reactions), e_widths, e_colors)
             )
         ))) + ((cb_edge,) if cb_edge else cb_edge)
         , options=build_glob_opt(graph_cfg)
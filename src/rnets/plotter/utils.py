@@ -123,11 +123,15 @@ class EdgeCfg(NamedTuple):
             :obj:`calc_pseudo_k_constant`), using width as the minimum width
             and this max_width as the maximum width, if None, all the arrows
             will be draw with constant width.
+        log_scale (bool, optional): If True, the widths will be normalized
+            using the logarithm of the kinetic constants or the net rates,
+            useful when they span many orders of magnitude. Defaults to False.
     """
     opts: Opts | None = EDGE_ATTR_DEF
     solid_color: Color | None = None
     width: float = 1.
     max_width: float | None = 5.
+    log_scale: bool = False
 
 
 class GraphCfg(NamedTuple):
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""Sparse stoichiometric matrix of a reaction network. The matrix has a row per
+compound, following the order of :attr:`Network.compounds`, and a column per
+reaction. Each coefficient is the net number of times the compound appears in
+the reaction, being negative for the reactants and positive for the products,
+so a compound appearing in both sides, e.g. a catalyst, is not stored.
+
+The matrix is stored in compressed sparse row (CSR) or column (CSC) form using
+:obj:`array.array` buffers, that can be shared without copies with NumPy and
+SciPy when they are installed.
+
+Attributes:
+    StoichFmt (type): Possible storage formats.
+    INT_TYPECODE (str): Typecode of the index and coefficient arrays.
+"""
+
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any, Literal, NamedTuple
+
+from .chemistry import unique_reactions
+from .struct import Network, Reaction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+
+type StoichFmt = Literal["csr", "csc"]
+
+INT_TYPECODE: str = 'q'
+
+
+class StoichMatrix(NamedTuple):
+    """Compressed sparse stoichiometric matrix.
+
+    Attributes:
+        shape (tuple of two int): Number of compounds and number of reactions.
+        indptr (array of int): Offsets of each compressed row (CSR) or column
+            (CSC) in :attr:`indices` and :attr:`data`.
+        indices (array of int): Column (CSR) or row (CSC) of each stored
+            coefficient.
+        data (array of int): Stored coefficients.
+        fmt (:obj:`StoichFmt`): Storage format.
+    """
+    shape: tuple[int, int]
+    indptr: array
+    indices: array
+    data: array
+    fmt: StoichFmt = "csr"
+
+
+def row_index(
+    nw: Network
+) -> dict[int, int]:
+    """Map the idx of the compounds of a network to their matrix row.
+
+    Args:
+        nw (:obj:`Network`): Network to index.
+
+    Returns:
+        dict with the compound idx as keys and the row number as values.
+    """
+    return {c.idx: i for i, c in enumerate(nw.compounds)}
+
+
+def reaction_coefficients(
+    r: Reaction
+    , rows: dict[int, int]
+) -> list[tuple[int, int]]:
+    """Compute the net stoichiometric coefficients of a reaction.
+
+    Args:
+        r (:obj:`Reaction`): Reaction to inspect.
+        rows (dict of int as keys and int as values): Map between compound idx
+            and matrix row. See :obj:`row_index`.
+
+    Returns:
+        list of tuples of the form (row, coefficient), sorted by row and
+        without null coefficients.
+
+    Raises:
+        :obj:`ValueError`: If a compound of the reaction is not in rows.
+    """
+    try:
+        cnt: Counter[int] = Counter(rows[c.idx] for c in r.compounds[1])
+        cnt.subtract(rows[c.idx] for c in r.compounds[0])
+    except KeyError as e:
+        raise ValueError(
+            f"Compound with idx {e.args[0]} of reaction {r.name} not found "
+            "in the network"
+        ) from None
+    return sorted((k, v) for k, v in cnt.items() if v != 0)
+
+
+def build_stoich_matrix(
+    nw: Network
+    , rs: Sequence[Reaction] | None = None
+    , fmt: StoichFmt = "csr"
+) -> StoichMatrix:
+    """Build the stoichiometric matrix of a network.
+
+    Args:
+        nw (:obj:`Network`): Network whose compounds define the rows.
+        rs (sequence of :obj:`Reaction` or None, optional): Reactions defining
+            the columns. If None, :attr:`Network.reactions` will be
+            used. Defaults to None.
+        fmt (:obj:`StoichFmt`, optional): Storage format. Defaults to "csr".
+
+    Returns:
+        :obj:`StoichMatrix` in the requested format.
+    """
+    rows: dict[int, int] = row_index(nw)
+    rs = nw.reactions if rs is None else rs
+    indptr: array = array(INT_TYPECODE, [0])
+    indices: array = array(INT_TYPECODE)
+    data: array = array(INT_TYPECODE)
+    for r in rs:
+        for i, v in reaction_coefficients(r, rows):
+            indices.append(i)
+            data.append(v)
+        indptr.append(len(indices))
+    m: StoichMatrix = StoichMatrix(
+        (len(rows), len(rs)), indptr, indices, data, "csc")
+    return m if fmt == "csc" else transpose_format(m)
+
+
+def transpose_format(
+    m: StoichMatrix
+) -> StoichMatrix:
+    """Convert a CSR matrix into CSC or a CSC matrix into CSR, in time linear
+    with the number of stored coefficients.
+
+    Args:
+        m (:obj:`StoichMatrix`): Matrix to convert.
+
+    Returns:
+        :obj:`StoichMatrix` representing the same matrix in the other format,
+        with sorted indices.
+    """
+    n_out: int = m.shape[1] if m.fmt == "csr" else m.shape[0]
+    counts: list[int] = [0] * (n_out + 1)
+    for j in m.indices:
+        counts[j + 1] += 1
+    for i in range(n_out):
+        counts[i + 1] += counts[i]
+    indptr: array = array(INT_TYPECODE, counts)
+    nxt: list[int] = counts[:-1]
+    indices: array = array(INT_TYPECODE, [0]) * len(m.indices)
+    data: array = array(INT_TYPECODE, [0]) * len(m.data)
+    for i in range(len(m.indptr) - 1):
+        for p in range(m.indptr[i], m.indptr[i + 1]):
+            j: int = m.indices[p]
+            q: int = nxt[j]
+            indices[q] = i
+            data[q] = m.data[p]
+            nxt[j] = q + 1
+    return StoichMatrix(
+        m.shape, indptr, indices, data, "csc" if m.fmt == "csr" else "csr")
+
+
+def to_csr(
+    m: StoichMatrix
+) -> StoichMatrix:
+    """Return the matrix in CSR format, converting it only if needed."""
+    return m if m.fmt == "csr" else transpose_format(m)
+
+
+def to_csc(
+    m: StoichMatrix
+) -> StoichMatrix:
+    """Return the matrix in CSC format, converting it only if needed."""
+    return m if m.fmt == "csc" else transpose_format(m)
+
+
+def to_dense(
+    m: StoichMatrix
+) -> list[list[int]]:
+    """Expand the matrix into a list of rows.
+
+    Args:
+        m (:obj:`StoichMatrix`): Matrix to expand.
+
+    Returns:
+        list of lists of int with the shape of the matrix.
+    """
+    out: list[list[int]] = [[0] * m.shape[1] for _ in range(m.shape[0])]
+    for i in range(len(m.indptr) - 1):
+        for p in range(m.indptr[i], m.indptr[i + 1]):
+            if m.fmt == "csr":
+                out[i][m.indices[p]] = m.data[p]
+            else:
+                out[m.indices[p]][i] = m.data[p]
+    return out
+
+
+def to_numpy(
+    m: StoichMatrix
+) -> Any:
+    """Convert the matrix into a dense NumPy array.
+
+    Args:
+        m (:obj:`StoichMatrix`): Matrix to convert.
+
+    Returns:
+        :obj:`numpy.ndarray` of int64 with the shape of the matrix.
+
+    Raises:
+        :obj:`ImportError`: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError("NumPy is required to convert the matrix")
+    out = np.zeros(m.shape, dtype=np.int64)
+    ptr = np.frombuffer(m.indptr, dtype=np.int64)
+    major = np.repeat(np.arange(len(ptr) - 1), np.diff(ptr))
+    minor = np.frombuffer(m.indices, dtype=np.int64)
+    data = np.frombuffer(m.data, dtype=np.int64)
+    if m.fmt == "csr":
+        out[major, minor] = data
+    else:
+        out[minor, major] = data
+    return out
+
+
+def to_scipy(
+    m: StoichMatrix
+) -> Any:
+    """Convert the matrix into a SciPy sparse matrix, sharing the underlying
+    buffers.
+
+    Args:
+        m (:obj:`StoichMatrix`): Matrix to convert.
+
+    Returns:
+        :obj:`scipy.sparse.csr_matrix` or :obj:`scipy.sparse.csc_matrix`
+        depending on the format of the matrix.
+
+    Raises:
+        :obj:`ImportError`: If SciPy is not installed.
+    """
+    if sparse is None or np is None:
+        raise ImportError("SciPy is required to convert the matrix")
+    cls = sparse.csr_matrix if m.fmt == "csr" else sparse.csc_matrix
+    return cls(
+        (np.frombuffer(m.data, dtype=np.int64)
+         , np.frombuffer(m.indices, dtype=np.int64)
+         , np.frombuffer(m.indptr, dtype=np.int64))
+        , shape=m.shape)
+
+
+class FluxBalance(NamedTuple):
+    """Production and consumption fluxes of the compounds of a network,
+    following the order of :attr:`Network.compounds`.
+
+    Attributes:
+        production (array of float): Sum of the fluxes producing each
+            compound.
+        consumption (array of float): Sum of the fluxes consuming each
+            compound, as positive values.
+        net (array of float): Net production of each compound, i.e. its time
+            derivative.
+    """
+    production: array
+    consumption: array
+    net: array
+
+
+def flux_balance(
+    m: StoichMatrix
+    , rates: Sequence[float | None]
+) -> FluxBalance:
+    """Compute the production and consumption flux of each compound from the
+    net rates of the reactions, in a single pass over the coefficients.
+
+    Args:
+        m (:obj:`StoichMatrix`): Stoichiometric matrix. It is converted to CSC
+            if needed.
+        rates (sequence of float or None): Net rate of each reaction (column)
+            of the matrix. None rates, e.g. of non-elementary reactions, are
+            skipped.
+
+    Returns:
+        :obj:`FluxBalance` of the compounds (rows) of the matrix.
+    """
+    m = to_csc(m)
+    prod: array = array('d', [0.]) * m.shape[0]
+    cons: array = array('d', [0.]) * m.shape[0]
+    for j, x in enumerate(rates):
+        if x is None:
+            continue
+        for p in range(m.indptr[j], m.indptr[j + 1]):
+            v: float = m.data[p] * x
+            if v > 0.:
+                prod[m.indices[p]] += v
+            else:
+                cons[m.indices[p]] -= v
+    return FluxBalance(
+        production=prod
+        , consumption=cons
+        , net=array('d', (a - b for a, b in zip(prod, cons))))
+
+
+def network_flux_balance(
+    nw: Network
+    , rates: Sequence[float | None]
+) -> FluxBalance:
+    """Compute the flux balance of a network from the net rates of all its
+    reactions, e.g. :attr:`NetworkStats.rates`. Only the first reaction of
+    each reversible pair is counted, so both directions are not added twice
+    (see :obj:`unique_reactions`).
+
+    Args:
+        nw (:obj:`Network`): Network with the compounds and the reactions.
+        rates (sequence of float or None): Net rate of each reaction,
+            following the order of :attr:`Network.reactions`.
+
+    Returns:
+        :obj:`FluxBalance` of the compounds of the network.
+    """
+    keep: set[int] = set(map(id, unique_reactions(nw.reactions)))
+    rs, xs = zip(*(
+        (r, x) for r, x in zip(nw.reactions, rates) if id(r) in keep)
+        ) if keep else ((), ())
+    return flux_balance(build_stoich_matrix(nw, rs, "csc"), xs)
@@ -1,11 +1,19 @@
 # -*- coding: utf-8 -*-
 """Proxy structures to store parsed compounds, reactions and networks.
+
+Attributes:
+    FFLAGS_ORDER (tuple of :obj:`FFlags`): Bit order of the format flags when
+        packing a network.
 """
 
-from collections.abc import Sequence
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from copy import deepcopy
 from enum import auto, Enum, StrEnum
-from itertools import repeat, starmap
-from typing import NamedTuple
+from itertools import accumulate, chain, repeat, starmap
+from pickle import PickleBuffer
+from typing import Any, NamedTuple
 
 
 class FFlags(StrEnum):
@@ -48,6 +56,10 @@ class Compound(NamedTuple):
         opts (dict of str as keys and str as values or None, optional):
             Additional options for the compound. Will be later used by the
             writer to decide additional options. Defaults to None.
+        g_coefs (tuple of float or None, optional): Coefficients of the free
+            energy as a polynomial of the temperature, in increasing degree,
+            e.g. (H, -S). If None, the energy does not depend on the
+            temperature. Defaults to None.
 
     """
     name: str
@@ -57,6 +69,7 @@ class Compound(NamedTuple):
     fflags: set[FFlags] | None = None
     conc: float | None = None
     opts: dict[str, str] | None = None
+    g_coefs: tuple[float, ...] | None = None
 
 
     def __str__(self): return self.name
@@ -81,6 +94,9 @@ class Reaction(NamedTuple):
             writer to decide additional options. Defaults to None.
         visible (obj:`Visible`, optional): Wether the compound will be visible,
             grey or not visible. Defaults to :obj:`Visible.TRUE`.
+        g_coefs (tuple of float or None, optional): Coefficients of the free
+            energy of the transition state as a polynomial of the
+            temperature, see :attr:`Compound.g_coefs`. Defaults to None.
     """
     name: str
     compounds: tuple[tuple[Compound, ...], tuple[Compound, ...]]
@@ -88,6 +104,7 @@ class Reaction(NamedTuple):
     idx: int
     opts: dict[str, str] | None = None
     visible: Visibility = Visibility.TRUE
+    g_coefs: tuple[float, ...] | None = None
 
     def __str__(self):
         return "->".join(map(
@@ -109,6 +126,253 @@ class Network(NamedTuple):
     Attributes:
         compounds (sequence of :obj:`Compound`): Compounds of the network.
         reactions (sequence of :obj:`Reaction`): Reactions in the network.
+
+    Note:
+        Networks are pickled in a compact form (see :obj:`pack_network`) in
+        which each compound is stored once and the numeric values travel as
+        arrays, out-of-band when using pickle protocol 5. The unpickled
+        network stores its compounds and reactions as tuples. :obj:`copy.copy`
+        and :obj:`copy.deepcopy` do not use this form, so the copies keep the
+        sequence types of the original.
     """
     compounds: Sequence[Compound]
     reactions: Sequence[Reaction]
+
+    def __reduce_ex__(self, protocol):
+        return (unpack_network, pack_network(self, protocol >= 5))
+
+    def __copy__(self):
+        return type(self)(self.compounds, self.reactions)
+
+    def __deepcopy__(self, memo):
+        cs, rs = deepcopy((self.compounds, self.reactions), memo)
+        return type(self)(cs, rs)
+
+
+def relink_reactions(
+    rs: Iterable[Reaction]
+    , cs: Iterable[Compound]
+) -> tuple[Reaction, ...]:
+    """Replace the compounds referenced by the reactions with the compounds of
+    the given sequence that share the same idx. Useful after updating the
+    compounds of a network, as :obj:`Reaction` stores its own copy of the
+    :obj:`Compound` objects.
+
+    Args:
+        rs (iterable of :obj:`Reaction`): Reactions to relink.
+        cs (iterable of :obj:`Compound`): Compounds that will replace the ones
+            referenced by the reactions.
+
+    Returns:
+        tuple of :obj:`Reaction` with the relinked compounds, preserving the
+        order of rs.
+
+    Raises:
+        :obj:`ValueError`: If a reaction references a compound idx that is not
+            present in cs.
+    """
+    c_map: dict[int, Compound] = {c.idx: c for c in cs}
+
+    def relink(xs: tuple[Compound, ...]) -> tuple[Compound, ...]:
+        try:
+            return tuple(c_map[x.idx] for x in xs)
+        except KeyError as e:
+            raise ValueError(
+                f"Compound with idx {e.args[0]} referenced in reactions not "
+                "found in compounds"
+            ) from None
+
+    return tuple(
+        r._replace(compounds=(relink(r.compounds[0]), relink(r.compounds[1])))
+        for r in rs
+    )
+
+
+FFLAGS_ORDER: tuple[FFlags, ...] = tuple(FFlags)
+
+_HAS_FFLAGS: int = 1 << len(FFLAGS_ORDER)
+_HAS_CONC: int = _HAS_FFLAGS << 1
+_VIS_SHIFT: int = len(FFLAGS_ORDER) + 2
+_VIS_VALUES: dict[Visibility, int] = {v: v.value for v in Visibility}
+
+
+def _pack_flags(
+    c: Compound
+) -> int:
+    """Pack the format flags, the concentration presence and the visibility
+    of a compound in a single byte."""
+    x: int = _VIS_VALUES[c.visible] << _VIS_SHIFT
+    if c.conc is not None:
+        x |= _HAS_CONC
+    if c.fflags is not None:
+        x |= _HAS_FFLAGS
+        for i, f in enumerate(FFLAGS_ORDER):
+            if f in c.fflags:
+                x |= 1 << i
+    return x
+
+
+def _int_array(
+    xs: Iterable[int]
+) -> array:
+    """Store integers in the smallest unsigned array typecode that fits them,
+    or as signed 64 bit integers if negative values are present."""
+    a: array = array('q', xs)
+    lo, hi = (min(a), max(a)) if a else (0, 0)
+    if lo < 0:
+        return a
+    tc: str = next(
+        t for t in ('B', 'H', 'I', 'Q') if hi < 1 << (8 * array(t).itemsize))
+    return array(tc, a)
+
+
+def pack_network(
+    nw: Network
+    , oob: bool = False
+) -> tuple[Any, ...]:
+    """Flatten a network into a table of unique strings, a sparse table of
+    options and a set of numeric arrays. The compounds of the reactions are
+    stored as positions in :attr:`Network.compounds`, so each :obj:`Compound`
+    is stored only once. Used by the pickle protocol of :obj:`Network`.
+
+    Args:
+        nw (:obj:`Network`): Network to pack.
+        oob (bool, optional): Wrap the numeric arrays in
+            :obj:`pickle.PickleBuffer`, allowing pickle protocol 5 to send them
+            out-of-band. Defaults to False.
+
+    Returns:
+        tuple with the arguments of :obj:`unpack_network`.
+
+    Raises:
+        :obj:`ValueError`: If a reaction references a compound, by name and
+            idx, not present in the network.
+    """
+    # Parsed networks share the compound objects with the reactions, making
+    # the identity lookup the fast path.
+    pos_id: dict[int, int] = {id(c): i for i, c in enumerate(nw.compounds)}
+    pos: dict[tuple[str, int], int] | None = None
+
+    def c_pos(c: Compound) -> int:
+        nonlocal pos
+        if (i := pos_id.get(id(c))) is not None:
+            return i
+        if pos is None:
+            pos = {(x.name, x.idx): i for i, x in enumerate(nw.compounds)}
+        try:
+            return pos[(c.name, c.idx)]
+        except KeyError:
+            raise ValueError(
+                f"Compound {c.name} with idx {c.idx} referenced in reactions "
+                "not found in the network"
+            ) from None
+
+    r_cs: list[int] = [
+        c_pos(c) for r in nw.reactions for xs in r.compounds for c in xs]
+    r_ptr: list[int] = list(accumulate(
+        (len(xs) for r in nw.reactions for xs in r.compounds), initial=0))
+    strings: dict[str, int] = {}
+    names: array = _int_array(
+        strings.setdefault(x.name, len(strings))
+        for x in chain(nw.compounds, nw.reactions))
+    arrays: tuple[array, ...] = (
+        names
+        , _int_array(c.idx for c in nw.compounds)
+        , array('d', (c.energy for c in nw.compounds))
+        , array('d', (0. if c.conc is None else c.conc for c in nw.compounds))
+        , array('B', map(_pack_flags, nw.compounds))
+        , _int_array(r.idx for r in nw.reactions)
+        , array('d', (r.energy for r in nw.reactions))
+        , array('B', map(_VIS_VALUES.__getitem__, (
+            r.visible for r in nw.reactions)))
+        , _int_array(r_ptr)
+        , _int_array(r_cs)
+        , _int_array(accumulate(
+            (len(x.g_coefs or ()) for x in chain(nw.compounds, nw.reactions))
+            , initial=0))
+        , array('d', chain.from_iterable(
+            x.g_coefs or () for x in chain(nw.compounds, nw.reactions)))
+    )
+    opts: tuple[tuple[int, dict[str, str]], ...] = tuple(
+        (i, x.opts) for i, x in enumerate(chain(nw.compounds, nw.reactions))
+        if x.opts is not None)
+    return (
+        tuple(strings)
+        , opts
+        , sys.byteorder
+        , ''.join(a.typecode for a in arrays)
+        , *(PickleBuffer(a) if oob else a.tobytes() for a in arrays)
+    )
+
+
+def unpack_network(
+    strings: tuple[str, ...]
+    , opts: tuple[tuple[int, dict[str, str]], ...]
+    , byteorder: str
+    , typecodes: str
+    , *buffers: Any
+) -> Network:
+    """Inverse of :obj:`pack_network`.
+
+    Args:
+        strings (tuple of str): Unique names of the compounds and reactions.
+        opts (tuple of (int, dict)): Options of the elements that define them,
+            indexed by the position of the element, compounds first.
+        byteorder (str): Byte order of the machine that packed the network.
+        typecodes (str): Typecode of each numeric array.
+        *buffers (bytes-like objects): Numeric arrays of the network.
+
+    Returns:
+        :obj:`Network` with the reactions referencing its compounds.
+    """
+    def load(tc: str, b: Any) -> array:
+        a: array = array(tc)
+        a.frombytes(memoryview(b).cast('B'))
+        if byteorder != sys.byteorder:
+            a.byteswap()
+        return a
+
+    (names, c_idx, c_e, c_conc, c_flags, r_idx, r_e, r_vis, r_ptr
+     , r_cs, *thermo) = map(load, typecodes, buffers)
+    o_map: dict[int, dict[str, str]] = dict(opts)
+    nc: int = len(c_idx)
+
+    def g_coefs(i: int) -> tuple[float, ...] | None:
+        # Networks packed before the free energy polynomials have no thermo
+        # arrays
+        if not thermo or thermo[0][i] == thermo[0][i + 1]:
+            return None
+        return tuple(thermo[1][thermo[0][i]:thermo[0][i + 1]])
+
+    vis: dict[int, Visibility] = {v: k for k, v in _VIS_VALUES.items()}
+
+    def fflags(x: int) -> set[FFlags] | None:
+        if not x & _HAS_FFLAGS:
+            return None
+        return {f for i, f in enumerate(FFLAGS_ORDER) if x & (1 << i)}
+
+    cs: tuple[Compound, ...] = tuple(
+        Compound(
+            strings[names[i]]
+            , c_e[i]
+            , c_idx[i]
+            , vis[c_flags[i] >> _VIS_SHIFT]
+            , fflags(c_flags[i])
+            , c_conc[i] if c_flags[i] & _HAS_CONC else None
+            , o_map.get(i)
+            , g_coefs(i))
+        for i in range(nc))
+    c_get = cs.__getitem__
+
+    rs: tuple[Reaction, ...] = tuple(
+        Reaction(
+            strings[names[nc + i]]
+            , (tuple(map(c_get, r_cs[r_ptr[2 * i]:r_ptr[2 * i + 1]]))
+               , tuple(map(c_get, r_cs[r_ptr[2 * i + 1]:r_ptr[2 * i + 2]])))
+            , r_e[i]
+            , r_idx[i]
+            , o_map.get(nc + i)
+            , vis[r_vis[i]]
+            , g_coefs(nc + i))
+        for i in range(len(r_idx)))
+    return Network(compounds=cs, reactions=rs)
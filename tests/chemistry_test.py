@@ -0,0 +1,231 @@
+import math
+import pickle
+import unittest
+
+from rnets import chemistry as ch
+from rnets.parser import parse_network
+from rnets.struct import relink_reactions
+
+COMPS = """name,energy,conc
+A,0.,0.5
+B,0.1,0.2
+C,-0.2,0.1
+D,0.3,
+"""
+
+REACTS = """cleft,cleft,cright,cright,energy,direction,name
+A,A,B,,0.5,<->,R0
+B,C,A,C,0.7,->,R1
+A,,D,,0.4,->,R2
+"""
+
+THERMO_COMPS = """name,enthalpy,entropy,conc
+A,0.,0.,1.
+B,-0.2,-1e-3,0.
+"""
+
+THERMO_REACTS = """cleft,cright,direction,name,gpoly
+A,B,<->,R0,0.8:-5e-4
+"""
+
+CYCLE_COMPS = """name,energy
+Cat,0.
+A,0.
+CatA,-0.1
+B,-0.3
+"""
+
+CYCLE_REACTS = """cleft,cleft,cright,cright,energy,direction,name
+Cat,A,CatA,,0.5,<->,R0
+CatA,,Cat,B,0.7,<->,R1
+"""
+
+
+class ChemistryTestCase(unittest.TestCase):
+    """A test case for the chemistry module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.cfg = ch.ChemCfg(T=298.15)
+
+    def test_unique_reactions(self):
+        u = ch.unique_reactions(self.nw.reactions)
+        self.assertEqual(u, self.nw.reactions[:1] + self.nw.reactions[2:])
+        # Opposite reactions through different transition states
+        nw = parse_network(
+            COMPS
+            , "cleft,cright,energy,direction,name\n"
+            "A,B,0.5,->,R0\nB,A,0.9,->,R1\n")
+        self.assertEqual(ch.unique_reactions(nw.reactions), nw.reactions)
+        kt = ch.build_rate_engine(nw, self.cfg).kt
+        self.assertEqual(len(kt.kf), 2)
+        self.assertGreater(kt.kf[0], kt.kr[1])
+
+    def test_batch_net_rates(self):
+        rates = ch.calc_net_rates(self.nw, self.cfg, self.nw.reactions)
+        for r, x in zip(self.nw.reactions, rates):
+            y = ch.calc_net_rate(r, self.cfg.T, self.cfg.A, self.cfg.kb)
+            if y is None:
+                self.assertIsNone(x)
+            else:
+                self.assertAlmostEqual(x / y, 1.)
+        self.assertIsNone(rates[-1])
+
+    def test_ktable_reuse(self):
+        eng = ch.build_rate_engine(self.nw, self.cfg)
+        cs = tuple(c._replace(conc=1.) for c in self.nw.compounds)
+        self.assertIs(
+            ch.sync_rate_engine(eng, self.nw._replace(compounds=cs)), eng)
+        self.assertIs(ch.build_rate_engine(self.nw, self.cfg).kt, eng.kt)
+
+        hot = ch.update_ktable(eng, chem_cfg=self.cfg._replace(T=500.))
+        self.assertGreater(hot.kt.kf[0], eng.kt.kf[0])
+        self.assertEqual(hot.l_idx, eng.l_idx)
+
+        cs = tuple(c._replace(energy=c.energy + 0.1) for c in self.nw.compounds)
+        moved = ch.sync_rate_engine(eng, self.nw._replace(compounds=cs))
+        self.assertGreater(moved.kt.kf[0], eng.kt.kf[0])
+
+    def test_network_stats(self):
+        stats = ch.network_stats(self.nw, self.cfg)
+        self.assertIs(stats, ch.network_stats(self.nw, self.cfg))
+        self.assertEqual(stats.e_range, (-0.2, 0.7))
+        self.assertEqual(stats.c_range, (0.1, 0.5))
+        self.assertEqual(len(stats.ks), len(self.nw.reactions))
+        # The cached statistics match a fresh computation, also for networks
+        # that are not cached
+        self.assertEqual(stats, ch.calc_network_stats(self.nw, self.cfg))
+        listed = self.nw._replace(
+            compounds=list(self.nw.compounds)
+            , reactions=list(self.nw.reactions))
+        self.assertEqual(ch.network_stats(listed, self.cfg), stats)
+
+    def test_normalizers(self):
+        # Ranges of the normalizers computed without the statistics
+        es = [x.energy for x in (*self.nw.compounds, *self.nw.reactions)]
+        cs = [c.conc for c in self.nw.compounds if c.conc is not None]
+        ks = [
+            ch.calc_pseudo_k_constant(
+                ch.calc_activation_energy(r), self.cfg.T, self.cfg.A
+                , self.cfg.kb)
+            for r in self.nw.reactions]
+        rates = [
+            abs(x) for r in self.nw.reactions
+            if (x := ch.calc_net_rate(
+                r, self.cfg.T, self.cfg.A, self.cfg.kb)) is not None]
+        for fn, xs in (
+                (ch.network_energy_normalizer, es)
+                , (ch.network_conc_normalizer, cs)
+                , (ch.network_k_normalizer, ks)
+                , (ch.network_rate_normalizer, rates)):
+            norm = fn(self.nw, self.cfg)
+            ref = ch.normalizer(*ch.minmax(xs))
+            for x in xs:
+                self.assertAlmostEqual(norm(x), ref(x))
+
+    def test_k_sweep(self):
+        Ts = (250., 298.15, 400.)
+        sw = ch.calc_k_sweep(self.nw, Ts)
+        self.assertEqual(len(sw.kf), len(self.nw.reactions))
+        self.assertTrue(all(len(row) == len(Ts) for row in sw.kf))
+        for i, T in enumerate(Ts):
+            cfg = ch.build_chemcfg(T)
+            self.assertEqual(sw.cfgs[i], cfg)
+            ref = ch.calc_network_stats(self.nw, cfg)
+            st = ch.sweep_network_stats(self.nw, sw, i)
+            for x, y in zip(st.ks, ref.ks):
+                self.assertAlmostEqual(x / y, 1.)
+            self.assertEqual(st.rates, ref.rates)
+            self.assertEqual(min(r[i] for r in sw.k_norms), 0.)
+            self.assertEqual(max(r[i] for r in sw.k_norms), 1.)
+
+    def test_log_rates(self):
+        eng = ch.build_rate_engine(self.nw, self.cfg, self.nw.reactions)
+        lin = ch.eval_rates(eng, ch.conc_vector(self.nw))
+        lrs = ch.eval_log_rates(eng, ch.log_conc_vector(self.nw))
+        for k, lk in zip(eng.kt.kf, eng.kt.lkf):
+            self.assertAlmostEqual(math.log(k), lk)
+        for x, lx, sg in zip(lin.net[:3], lrs.net, lrs.sign):
+            self.assertAlmostEqual(math.log(abs(x)), lx)
+            self.assertEqual(sg, 1 if x > 0 else -1)
+        self.assertTrue(math.isnan(lrs.net[-1]))
+
+    def test_log_extreme(self):
+        cs = list(self.nw.compounds)
+        cs[2] = cs[2]._replace(energy=-60.)
+        rs = relink_reactions(self.nw.reactions, cs)
+        nw = self.nw._replace(compounds=tuple(cs), reactions=rs)
+        stats = ch.calc_network_stats(nw, self.cfg)
+        self.assertEqual(stats.ks[2], 0.)
+        self.assertAlmostEqual(stats.log_ks[2], ch.calc_log_pseudo_k_constant(
+            60.6, self.cfg.T, self.cfg.A, self.cfg.kb))
+        self.assertTrue(math.isfinite(stats.log_rates[2]))
+        norm = ch.network_k_normalizer(nw, self.cfg, stats, log_scale=True)
+        self.assertEqual(norm(stats.log_ks[2]), 0.)
+        self.assertGreater(norm(stats.log_ks[0]), 0.)
+
+        sw = ch.calc_k_sweep(nw, (300., 600.), log_scale=True)
+        st = ch.sweep_network_stats(nw, sw, 0)
+        ref = ch.calc_network_stats(nw, sw.cfgs[0])
+        for x, y in zip(st.log_ks, ref.log_ks):
+            self.assertAlmostEqual(x, y)
+
+    def test_free_energies(self):
+        nw = parse_network(THERMO_COMPS, THERMO_REACTS)
+        self.assertEqual(nw.compounds[1].g_coefs, (-0.2, 1e-3))
+        self.assertAlmostEqual(nw.compounds[1].energy, -0.2 + 1e-3 * ch.DEF_T)
+        self.assertEqual(nw.reactions[0].g_coefs, (0.8, -5e-4))
+        self.assertEqual(pickle.loads(pickle.dumps(nw, 5)), nw)
+
+        Ts = (300., 600.)
+        c_es, r_es = ch.free_energies(ch.build_thermo_table(nw), Ts)
+        for i, T in enumerate(Ts):
+            self.assertAlmostEqual(c_es[1][i], -0.2 + 1e-3 * T)
+            self.assertAlmostEqual(r_es[0][i], 0.8 - 5e-4 * T)
+        sw = ch.calc_k_sweep(nw, Ts)
+        for i, T in enumerate(Ts):
+            at_t = ch.thermo_network(nw, T)
+            self.assertAlmostEqual(at_t.compounds[1].energy, c_es[1][i])
+            c = at_t.reactions[0].compounds[1][0]
+            self.assertIs(c, at_t.compounds[c.idx])
+            stats = ch.calc_network_stats(at_t, sw.cfgs[i])
+            for x, y in zip(stats.ks, (row[i] for row in sw.kf)):
+                self.assertAlmostEqual(x / y, 1.)
+
+        with self.assertRaises(ValueError):
+            parse_network(
+                THERMO_COMPS.replace("A,0.,0.", "A,,0."), THERMO_REACTS)
+
+    def test_energetic_span(self):
+        nw = parse_network(CYCLE_COMPS, CYCLE_REACTS)
+        cycles = list(ch.find_catalytic_cycles(nw))
+        self.assertEqual(len(cycles), 2)
+        fwd, rev = sorted(
+            map(lambda c: ch.energetic_span(c, self.cfg), cycles)
+            , key=lambda es: es.reaction_energy)
+        self.assertEqual([c.name for c in fwd.cycle.reactants], ["A"])
+        self.assertEqual([c.name for c in fwd.cycle.products], ["B"])
+        self.assertAlmostEqual(fwd.reaction_energy, -0.3)
+        self.assertAlmostEqual(fwd.span, 0.8)
+        self.assertEqual(fwd.cycle.intermediates[fwd.tdi].name, "CatA")
+        self.assertEqual(fwd.cycle.steps[fwd.tdts].name, "R1")
+        self.assertAlmostEqual(sum(fwd.x_ts), 1.)
+        self.assertAlmostEqual(sum(fwd.x_int), 1.)
+
+        # Steady state of the two step cycle
+        k = [
+            ch.calc_pseudo_k_constant(e, self.cfg.T, self.cfg.A, self.cfg.kb)
+            for e in (0.5, 0.6, 0.8, 1.)]
+        tof = (k[0] * k[2] - k[1] * k[3]) / sum(k)
+        self.assertAlmostEqual(fwd.tof / tof, 1.)
+        self.assertAlmostEqual(rev.tof / tof, -1.)
+
+        # Largest span over all the pairs of states
+        i_es, t_es, dg = ch.cycle_profile(fwd.cycle)
+        self.assertAlmostEqual(fwd.span, max(
+            t - i + (dg if k < j else 0.)
+            for k, t in enumerate(t_es) for j, i in enumerate(i_es)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+
+from rnets import chemistry as ch
+from rnets.kinetics import codegen, ode
+from rnets.parser import parse_network
+
+COMPS = """name,energy,conc
+A,0.,1.
+B,-0.05,0.
+C,0.02,0.
+"""
+
+REACTS = """cleft,cleft,cright,energy,direction,name
+A,,B,0.6,<->,R0
+A,A,C,0.65,<->,R1
+"""
+
+
+class CodegenTestCase(unittest.TestCase):
+    """A test case for the codegen module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.cfg = ch.ChemCfg(T=300.)
+        self.m = ode.build_mass_action(self.nw, self.cfg)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_python(self):
+        cm = codegen.compile_mass_action(
+            self.m, "python", cache_dir=self.tmp.name)
+        c = [0.5, 0.3, 0.1]
+        self.assertEqual(list(cm.rhs(c)), list(ode.mass_action_rhs(self.m, c)))
+        for r0, r1 in zip(cm.jac(c), ode.mass_action_jacobian(self.m, c)):
+            for a, b in zip(r0, r1):
+                self.assertAlmostEqual(a, b, delta=1e-12 * abs(b))
+
+    def test_cache(self):
+        cm = codegen.compile_mass_action(
+            self.m, "python", cache_dir=self.tmp.name)
+        self.assertTrue(cm.path.exists())
+        self.assertIn(cm.fingerprint[:16], cm.path.name)
+        # Only the kinetic constants change with the temperature
+        m = self.m._replace(engine=ch.update_ktable(
+            self.m.engine, chem_cfg=ch.ChemCfg(T=400.)))
+        self.assertEqual(
+            codegen.model_fingerprint(m), codegen.model_fingerprint(self.m))
+        hot = codegen.compile_mass_action(m, "python", cache_dir=self.tmp.name)
+        self.assertEqual(hot.path, cm.path)
+        c = [0.5, 0.3, 0.1]
+        self.assertEqual(list(hot.rhs(c)), list(ode.mass_action_rhs(m, c)))
+        mem = codegen.compile_mass_action(m, "python", cache=False)
+        self.assertIsNone(mem.path)
+        self.assertEqual(mem.rhs(c), hot.rhs(c))
+
+    def test_integration(self):
+        ts = [0., 1e-3, 1e-2, 1e-1]
+        c0 = [1., 0., 0.]
+        ref = ode.integrate_ros2(self.m, c0, ts)
+        cm = codegen.compile_mass_action(
+            self.m, "python", cache_dir=self.tmp.name)
+        red = ode.reduce_system(self.m, c0)
+        tr = ode.solve_ros2(*codegen.compiled_system(cm), c0, ts)
+        tr_red = ode.solve_ros2(
+            *codegen.compiled_system(cm, red), [c0[i] for i in red.free], ts)
+        self.assertEqual(tr.nfev, ref.nfev)
+        for y0, y1, y2 in zip(ref.y, tr.y, tr_red.y):
+            for a, b in zip(y0, y1):
+                self.assertAlmostEqual(a, b, places=12)
+            self.assertEqual(len(y2), len(red.free))
+
+    @unittest.skipIf(codegen.np is None, "NumPy is not installed")
+    def test_numpy(self):
+        np = codegen.np
+        cm = codegen.compile_mass_action(
+            self.m, "numpy", cache_dir=self.tmp.name)
+        xs = np.array([[0.5, 0.2], [0.3, 0.4], [0.1, 0.]])
+        f = cm.rhs(xs)
+        jac = cm.jac(xs)
+        for q in range(2):
+            c = list(xs[:, q])
+            for a, b in zip(f[:, q], ode.mass_action_rhs(self.m, c)):
+                self.assertAlmostEqual(a, b, delta=1e-12 * abs(b))
+            for r0, r1 in zip(
+                    jac[:, :, q], ode.mass_action_jacobian(self.m, c)):
+                for a, b in zip(r0, r1):
+                    self.assertAlmostEqual(a, b, delta=1e-12 * abs(b))
+
+    def test_backend(self):
+        with self.assertRaises(ValueError):
+            codegen.compile_mass_action(self.m, "fortran", cache=False)
+        if codegen.np is None:
+            with self.assertRaises(ValueError):
+                codegen.compile_mass_action(self.m, "numpy", cache=False)
+            self.assertEqual(
+                codegen.compile_mass_action(self.m, cache=False).backend
+                , "python")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+from rnets import delta
+from rnets.parser import parse_network
+from rnets.struct import Visibility
+
+COMPS = """name,energy,conc
+A,0.,1.
+B,0.1,0.5
+C,-0.2,0.1
+"""
+
+REACTS = """cleft,cright,energy,direction,name
+A,B,0.5,<->,R0
+B,C,0.7,->,R1
+"""
+
+
+class DeltaTestCase(unittest.TestCase):
+    """A test case for the delta module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+
+    def test_empty_delta(self):
+        d = delta.compute_delta(self.nw, self.nw)
+        self.assertFalse(d)
+        self.assertIs(delta.apply_delta(self.nw, d), self.nw)
+
+    def test_updates(self):
+        cs = list(self.nw.compounds)
+        cs[1] = cs[1]._replace(energy=0.3, conc=2.)
+        rs = list(self.nw.reactions)
+        rs[2] = rs[2]._replace(visible=Visibility.GREY)
+        new = self.nw._replace(compounds=tuple(cs), reactions=tuple(rs))
+
+        d = delta.compute_delta(self.nw, new)
+        self.assertEqual(d.c_energy, ((1, 0.3),))
+        self.assertEqual(d.c_conc, ((1, 2.),))
+        self.assertEqual(d.r_visible, (((1, (1,), (2,), 0), Visibility.GREY),))
+        self.assertFalse(d.c_add or d.c_del or d.r_add or d.r_del)
+
+        out = delta.apply_delta(self.nw, d)
+        self.assertEqual(out.compounds, tuple(cs))
+        self.assertEqual(out.reactions[2].visible, Visibility.GREY)
+        self.assertEqual(out.reactions[0].compounds[0][0].energy, 0.3)
+
+    def test_add_remove(self):
+        new = parse_network(
+            COMPS.replace("C,-0.2,0.1", "D,0.4,")
+            , REACTS.replace("B,C,0.7,->,R1", "A,D,0.2,->,R2"))
+        d = delta.compute_delta(self.nw, new)
+        self.assertEqual(delta.apply_delta(self.nw, d), new)
+
+    def test_remove_direction(self):
+        # Removing one direction keeps the key of the other one
+        new = self.nw._replace(reactions=self.nw.reactions[1:])
+        d = delta.compute_delta(self.nw, new)
+        self.assertEqual(d.r_del, ((0, (1,), (0,), 0),))
+        self.assertFalse(d.r_add or d.r_energy or d.r_visible)
+        self.assertEqual(delta.apply_delta(self.nw, d), new)
+        self.assertEqual(delta.load_delta(delta.dump_delta(d)), d)
+
+    def test_compose(self):
+        cs = list(self.nw.compounds)
+        cs[0] = cs[0]._replace(conc=4.)
+        mid = self.nw._replace(compounds=tuple(cs))
+        new = parse_network(
+            COMPS + "D,0.4,\n"
+            , REACTS.replace("->,R1", "<->,R1"))
+        d = delta.compose_delta(
+            delta.compute_delta(self.nw, mid)
+            , delta.compute_delta(mid, new))
+        self.assertEqual(delta.apply_delta(self.nw, d), new)
+
+    def test_dump_load(self):
+        new = parse_network(
+            COMPS + "D,0.4,\n"
+            , REACTS + "D,A,0.3,->,R2\n")
+        d = delta.compute_delta(self.nw, new)
+        self.assertEqual(delta.load_delta(delta.dump_delta(d)), d)
+
+        cs = list(self.nw.compounds)
+        cs[0] = cs[0]._replace(energy=1.)
+        d = delta.compute_delta(
+            self.nw, self.nw._replace(compounds=tuple(cs)))
+        self.assertLess(len(delta.dump_delta(d)), 64)
+
+    def test_dump_load_g_coefs(self):
+        new = parse_network(
+            COMPS + "D,0.4,\n"
+            , REACTS + "D,A,0.3,->,R2\n")
+        cs = list(new.compounds)
+        cs[3] = cs[3]._replace(g_coefs=(0.4, -1e-3))
+        rs = list(new.reactions)
+        rs[3] = rs[3]._replace(g_coefs=(0.3, -5e-4))
+        new = new._replace(compounds=tuple(cs), reactions=tuple(rs))
+        d = delta.load_delta(delta.dump_delta(
+            delta.compute_delta(self.nw, new)))
+        out = delta.apply_delta(self.nw, d)
+        self.assertEqual(out.compounds[3].g_coefs, (0.4, -1e-3))
+        self.assertEqual(out.reactions[3].g_coefs, (0.3, -5e-4))
+        self.assertIsNone(out.reactions[0].g_coefs)
+
+
+if __name__ == "__main__":
+    unittest.main()
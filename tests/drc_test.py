@@ -0,0 +1,49 @@
+import unittest
+
+from rnets.kinetics import drc
+from rnets.parser import parse_network
+
+import networks
+
+
+class DrcTestCase(networks.NetworkTestCase):
+    """A test case for the drc module"""
+
+    def test_sum_rule(self):
+        rc = drc.degree_of_rate_control(
+            self.nw, 2, self.cfg, fixed=(0, 2), max_workers=1)
+        self.assertEqual(len(rc.xrc), 2)
+        self.assertGreater(rc.rate, 0.)
+        self.assertAlmostEqual(sum(rc.xrc), 1., places=6)
+        self.assertTrue(all(0. < x < 1. for x in rc.xrc))
+
+    def test_parallel(self):
+        serial = drc.degree_of_rate_control(
+            self.nw, 2, self.cfg, fixed=(0, 2), max_workers=1)
+        parallel = drc.degree_of_rate_control(
+            self.nw, 2, self.cfg, fixed=(0, 2), max_workers=2)
+        for x, y in zip(serial.xrc, parallel.xrc):
+            self.assertAlmostEqual(x, y)
+
+    def test_network_values(self):
+        rc = drc.degree_of_rate_control(
+            self.nw, 2, self.cfg, fixed=(0, 2), max_workers=1)
+        vs = tuple(drc.network_values(self.nw, rc.reactions, rc.xrc))
+        self.assertEqual(len(vs), len(self.nw.reactions))
+        self.assertEqual(vs, (rc.xrc[0], rc.xrc[0], rc.xrc[1], rc.xrc[1]))
+        # Opposite reactions through different transition states
+        nw = parse_network(
+            networks.CHAIN_COMPS
+            , "cleft,cright,energy,direction,name\n"
+            "A,B,0.6,->,R0\nB,A,0.8,->,R1\n")
+        self.assertEqual(
+            tuple(drc.network_values(nw, nw.reactions, (1., 2.))), (1., 2.))
+
+    def test_not_produced(self):
+        with self.assertRaises(ValueError):
+            drc.degree_of_rate_control(
+                self.nw, 0, self.cfg, fixed=(0, 2), max_workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
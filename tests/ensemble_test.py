@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from rnets import chemistry as ch
+from rnets.kinetics import ensemble
+
+import networks
+
+
+class EnsembleTestCase(networks.NetworkTestCase):
+    """A test case for the ensemble module"""
+
+    def test_p2(self):
+        rng = random.Random(3)
+        xs = [rng.gauss(0., 1.) for _ in range(5000)]
+        ests = [ensemble.p2_init(p) for p in (0.05, 0.5, 0.95)]
+        for x in xs:
+            for est in ests:
+                ensemble.p2_update(est, x)
+        xs.sort()
+        for est, ref in zip(ests, (xs[250], xs[2500], xs[4750])):
+            self.assertAlmostEqual(ensemble.p2_value(est), ref, delta=0.05)
+
+        est = ensemble.p2_init(0.5)
+        for x in (3., 1., 2.):
+            ensemble.p2_update(est, x)
+        self.assertEqual(ensemble.p2_value(est), 2.)
+        with self.assertRaises(ValueError):
+            ensemble.p2_init(1.5)
+
+    def test_p2_extremes(self):
+        rng = random.Random(3)
+        xs = [rng.gauss(0., 1.) for _ in range(1000)]
+        for p, extreme in ((0., min), (1., max)):
+            est = ensemble.p2_init(p)
+            for x in xs[:3]:
+                ensemble.p2_update(est, x)
+            self.assertEqual(ensemble.p2_value(est), extreme(xs[:3]))
+            for x in xs[3:]:
+                ensemble.p2_update(est, x)
+            self.assertEqual(ensemble.p2_value(est), extreme(xs))
+
+    def test_unperturbed(self):
+        es = ensemble.run_ensemble(
+            self.nw, "k", self.cfg, n_samples=10, sigma=0., max_workers=1)
+        kt = ch.build_rate_engine(self.nw, self.cfg).kt
+        for row in es.values:
+            for x, k in zip(row, kt.kf):
+                self.assertAlmostEqual(x / k, 1.)
+        self.assertEqual(es.concs, ())
+        self.assertEqual(es.samples, 10)
+        self.assertEqual(
+            [r.energy for r in es.network.reactions]
+            , [r.energy for r in self.nw.reactions])
+        self.assertEqual(ensemble.ensemble_spread(es), (0., 0.))
+
+    def test_steady(self):
+        es = ensemble.run_ensemble(
+            self.nw, "steady", self.cfg, n_samples=200, fixed=(0, 2)
+            , max_workers=1)
+        self.assertEqual(es.failed, 0)
+        self.assertEqual(len(es.concs), 3)
+        lo, med, hi = es.concs
+        self.assertTrue(lo[1] < med[1] < hi[1])
+        self.assertEqual(es.network.compounds[1].conc, med[1])
+        self.assertTrue(all(x > 0. for x in ensemble.ensemble_spread(es)))
+
+    def test_parallel(self):
+        serial = ensemble.run_ensemble(
+            self.nw, "rates", self.cfg, n_samples=50, max_workers=1)
+        parallel = ensemble.run_ensemble(
+            self.nw, "rates", self.cfg, n_samples=50, max_workers=2
+            , chunksize=4)
+        self.assertEqual(serial, parallel)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            ensemble.run_ensemble(self.nw, "drc", self.cfg)
+        with self.assertRaises(ValueError):
+            ensemble.run_ensemble(self.nw, "k", self.cfg, n_samples=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
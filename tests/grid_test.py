@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+from math import exp, inf
+
+from rnets import chemistry as ch
+from rnets.kinetics import grid, steady
+
+import networks
+
+
+class GridTestCase(networks.NetworkTestCase):
+    """A test case for the grid module"""
+
+    def setUp(self):
+        super().setUp()
+        self.grid = grid.build_grid(
+            self.nw, (300., 350.), concs={"B": (0., 0.1)}
+            , pressures={"A": (1., 2.)}, A=1e13)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_grid(self):
+        g = self.grid
+        self.assertEqual(len(g.points), 8)
+        self.assertEqual(g.fixed, (0,))
+        self.assertEqual([name for name, _ in g.axes], ["T", "B", "A"])
+        self.assertEqual(g.points[1].c0, (2., 0., 0.))
+        self.assertEqual(g.points[-1].cfg.T, 350.)
+        with self.assertRaises(ValueError):
+            grid.build_grid(self.nw, (300.,), concs={"D": (1.,)})
+        with self.assertRaises(ValueError):
+            grid.build_grid(
+                self.nw, (300.,), concs={"A": (1.,)}, pressures={"A": (1.,)})
+
+    def test_steady(self):
+        res = grid.run_sweep(self.nw, self.grid, "steady", max_workers=1)
+        self.assertEqual(res.evaluated, 8)
+        for r in res.results:
+            self.assertTrue(r.success)
+            self.assertEqual(r.c[0], r.point.c0[0])
+        r = res.results[3]
+        ref = steady.steady_state(
+            self.nw, r.point.cfg, r.point.c0, fixed=(0,))
+        for a, b in zip(r.c, ref.c):
+            self.assertAlmostEqual(a / b, 1.)
+        nw, cfg = grid.point_network(self.nw, r)
+        self.assertEqual(cfg.T, 300.)
+        self.assertEqual([c.conc for c in nw.compounds], list(r.c))
+
+    def test_cache(self):
+        first = grid.run_sweep(
+            self.nw, self.grid, "rates", cache_dir=self.tmp.name
+            , max_workers=2)
+        self.assertEqual(first.evaluated, 8)
+        again = grid.run_sweep(
+            self.nw, self.grid, "rates", cache_dir=self.tmp.name
+            , max_workers=1)
+        self.assertEqual(again.evaluated, 0)
+        self.assertEqual(again.results, first.results)
+        # Extending an axis only evaluates the new points
+        wider = grid.build_grid(
+            self.nw, (300., 350., 400.), concs={"B": (0., 0.1)}
+            , pressures={"A": (1., 2.)}, A=1e13)
+        self.assertEqual(grid.run_sweep(
+            self.nw, wider, "rates", cache_dir=self.tmp.name
+            , max_workers=1).evaluated, 4)
+
+    def test_adaptive(self):
+        res = grid.adaptive_sweep(
+            self.nw, (300.,), concs={"B": (0., 25., 50., 75., 100.)}
+            , axis="B", quantity="rates", tol=0.2, A=1e13, max_workers=1)
+        (name, xs), = res.grid.axes
+        self.assertEqual(name, "B")
+        self.assertEqual(list(xs), sorted(xs))
+        self.assertEqual(res.evaluated, len(xs))
+        self.assertEqual([r.point.c0[1] for r in res.results], list(xs))
+        # The direction of R0 flips at B = K A, bracketed within min_step
+        K = exp(0.1 / (ch.DEF_KB * 300.))
+        frames = [grid.point_frame(r) for r in res.results]
+        i = next(
+            i for i, (a, b) in enumerate(zip(frames, frames[1:]))
+            if grid.frame_change(a, b) == inf)
+        self.assertLess(xs[i], K)
+        self.assertGreater(xs[i + 1], K)
+        self.assertLessEqual(xs[i + 1] - xs[i], 2. * 25. / 64.)
+        for a, b, x0, x1 in zip(frames, frames[1:], xs, xs[1:]):
+            self.assertTrue(
+                grid.frame_change(a, b) <= 0.2 or x1 - x0 <= 2. * 25. / 64.)
+        capped = grid.adaptive_sweep(
+            self.nw, (300.,), concs={"B": (0., 25., 50., 75., 100.)}
+            , axis="B", quantity="rates", tol=0.2, max_points=8, A=1e13
+            , max_workers=1)
+        self.assertEqual(len(capped.results), 8)
+        with self.assertRaises(ValueError):
+            grid.adaptive_sweep(self.nw, (300., 400.), axis="B")
+        with self.assertRaises(ValueError):
+            grid.adaptive_sweep(
+                self.nw, (300., 400.), concs={"B": (0., 1.)})
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            grid.run_sweep(self.nw, self.grid, "trajectory")
+        with self.assertRaises(ValueError):
+            grid.run_sweep(self.nw, self.grid, "drc")
+
+
+if __name__ == "__main__":
+    unittest.main()
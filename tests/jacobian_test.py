@@ -0,0 +1,60 @@
+import unittest
+
+from rnets import chemistry as ch
+from rnets.kinetics import jacobian, ode
+from rnets.parser import parse_network
+
+COMPS = """name,energy,conc
+A,0.,1.
+B,-0.05,0.
+C,0.02,0.
+D,0.1,0.
+E,0.3,0.
+"""
+
+REACTS = """cleft,cleft,cright,cright,energy,direction,name
+A,,B,,0.6,<->,R0
+A,A,C,,0.65,<->,R1
+C,B,D,B,0.7,->,R2
+D,,E,,0.9,->,R3
+"""
+
+
+class JacobianTestCase(unittest.TestCase):
+    """A test case for the jacobian module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.m = ode.build_mass_action(self.nw, ch.ChemCfg(T=300.))
+
+    def test_pattern(self):
+        pat = self.m.jac
+        self.assertEqual(pat.shape, (5, 5))
+        self.assertLess(len(pat.indices), 25)
+        # E only appears in R3, so only D and E depend on it
+        cols = {
+            (i, pat.indices[p])
+            for i in range(5) for p in range(pat.indptr[i], pat.indptr[i + 1])}
+        self.assertNotIn((0, 4), cols)
+        self.assertNotIn((1, 2), cols)
+        self.assertIn((3, 1), cols)
+
+    def test_values(self):
+        c = [0.3, 0.2, 0.1, 0.05, 0.01]
+        out = jacobian.eval_jacobian(self.m.jac, self.m.engine, c)
+        dense = jacobian.jacobian_to_dense(self.m.jac, out)
+        f0 = ode.mass_action_rhs(self.m, c)
+        for j in range(5):
+            cp = list(c)
+            cp[j] += 1e-7
+            f1 = ode.mass_action_rhs(self.m, cp)
+            for i in range(5):
+                self.assertAlmostEqual(
+                    (f1[i] - f0[i]) / 1e-7, dense[i][j]
+                    , delta=1e-5 * abs(dense[i][j]) + 1e-9)
+        self.assertIs(
+            jacobian.eval_jacobian(self.m.jac, self.m.engine, c, out), out)
+
+
+if __name__ == "__main__":
+    unittest.main()
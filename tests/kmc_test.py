@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from rnets.kinetics import kmc, ode
+
+import networks
+
+
+class KmcTestCase(networks.DimerTestCase):
+    """A test case for the kmc module"""
+
+    def test_tree(self):
+        rng = random.Random(0)
+        xs = [rng.random() for _ in range(37)]
+        tree = kmc._tree_build(xs)
+        self.assertAlmostEqual(kmc._tree_total(tree), sum(xs))
+        xs[5] += 2.
+        kmc._tree_add(tree, 5, 2.)
+        acc = 0.
+        for i, x in enumerate(xs):
+            self.assertEqual(kmc._tree_find(tree, acc + 0.5 * x), i)
+            acc += x
+
+    def test_model(self):
+        m = kmc.build_kmc_model(self.nw, self.cfg, omega=10.)
+        self.assertEqual(len(m.reactants), 4)
+        # Channel 3 is the reverse direction of C <-> A + A
+        self.assertEqual(m.reactants[3], ((0, 2),))
+        self.assertEqual(
+            kmc.propensity(m, 3, [4, 0, 0]), m.c_stoch[3] * 4 * 3)
+        # B -> A updates every channel consuming A or B
+        self.assertEqual(m.deps[0], (0, 1, 3))
+
+    def test_mean_field(self):
+        omega = 1e4
+        ts = [0., 1e-3, 1e-2]
+        snaps = list(kmc.run_kmc(self.nw, ts, self.cfg, omega, seed=1))
+        tr = ode.solve_kinetics(self.nw, ts, self.cfg, method="ros2")
+        self.assertEqual([s.t for s in snaps], ts)
+        for snap, y in zip(snaps, tr.y):
+            n = snap.counts
+            self.assertEqual(n[0] + n[1] + 2 * n[2], omega)
+            for x, c in zip(n, y):
+                self.assertAlmostEqual(x / omega, c, delta=0.02)
+        nws = list(kmc.kmc_networks(self.nw, snaps, omega))
+        self.assertEqual(nws[-1].compounds[1].conc, snaps[-1].counts[1] / omega)
+
+    def test_fixed(self):
+        snaps = list(kmc.run_kmc(
+            self.nw, [0., 1e-3], self.cfg, 1e3, fixed=(0,), seed=2))
+        self.assertEqual(snaps[-1].counts[0], 1000)
+        self.assertGreater(snaps[-1].events, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
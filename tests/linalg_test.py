@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from rnets.kinetics import linalg
+
+A = [[4., 1., 0.], [1., 3., 1.], [0., 2., 5.]]
+X = [1., -2., 0.5]
+B = [sum(a * x for a, x in zip(row, X)) for row in A]
+
+
+class LinalgTestCase(unittest.TestCase):
+    """A test case for the linalg module"""
+
+    def backends(self):
+        """Solve with the available backends, from SciPy to pure Python."""
+        yield "default"
+        with mock.patch.object(linalg, "sla", None):
+            yield "numpy"
+            with mock.patch.object(linalg, "np", None):
+                yield "python"
+
+    def test_solve(self):
+        for name in self.backends():
+            with self.subTest(backend=name):
+                solve = linalg.dense_solver([list(row) for row in A])
+                for _ in range(2):
+                    for x, y in zip(solve(B), X):
+                        self.assertAlmostEqual(x, y)
+
+    def test_singular(self):
+        for name in self.backends():
+            with self.subTest(backend=name):
+                with self.assertRaises(ZeroDivisionError):
+                    linalg.dense_solver([[1., 2.], [2., 4.]])([1., 1.])
+
+    def test_lu(self):
+        lu = linalg.lu_factor([list(row) for row in A])
+        for x, y in zip(linalg.lu_solve(lu, B), X):
+            self.assertAlmostEqual(x, y)
+
+
+if __name__ == "__main__":
+    unittest.main()
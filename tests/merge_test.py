@@ -0,0 +1,95 @@
+import unittest
+
+from rnets import merge
+from rnets.chemistry import unique_reactions
+from rnets.parser import parse_network
+
+COMPS_1 = """name,energy,conc
+A,0.,1.
+B,-0.1,
+"""
+
+REACTS_1 = """cleft,cright,energy,direction,name
+A,B,0.5,<->,R0
+"""
+
+COMPS_2 = """name,energy,conc
+B,-0.3,0.5
+C,0.2,
+A,0.,
+"""
+
+REACTS_2 = """cleft,cright,energy,direction,name
+B,C,0.6,->,R0
+B,A,0.7,->,R1
+"""
+
+
+class MergeTestCase(unittest.TestCase):
+    """A test case for the merge module"""
+
+    def setUp(self):
+        self.nw1 = parse_network(COMPS_1, REACTS_1)
+        self.nw2 = parse_network(COMPS_2, REACTS_2)
+
+    def test_settle(self):
+        xs = (0.2, -0.1, 0.5)
+        expected = {
+            merge.MergePolicy.First: 0.2
+            , merge.MergePolicy.Last: 0.5
+            , merge.MergePolicy.Min: -0.1
+            , merge.MergePolicy.Max: 0.5
+            , merge.MergePolicy.Mean: 0.2}
+        for policy, x in expected.items():
+            self.assertAlmostEqual(merge.settle(xs, policy), x)
+        self.assertEqual(
+            merge.settle((0.1, 0.1), merge.MergePolicy.Strict), 0.1)
+        with self.assertRaises(ValueError):
+            merge.settle(xs, merge.MergePolicy.Strict)
+        with self.assertRaises(ValueError):
+            merge.settle(xs, "median")
+
+    def test_merge(self):
+        nw = merge.merge_networks((self.nw1, self.nw2))
+        self.assertEqual([c.name for c in nw.compounds], ["A", "B", "C"])
+        self.assertEqual([c.idx for c in nw.compounds], [0, 1, 2])
+        self.assertEqual(nw.compounds[1].energy, -0.1)
+        self.assertEqual(nw.compounds[1].conc, 0.5)
+        self.assertIsNone(nw.compounds[2].conc)
+        for r in nw.reactions:
+            for c in r.compounds[0] + r.compounds[1]:
+                self.assertIs(c, nw.compounds[c.idx])
+
+        last = merge.merge_networks(
+            (self.nw1, self.nw2), merge.MergePolicy.Last)
+        self.assertEqual(last.compounds[1].energy, -0.3)
+        mean = merge.merge_networks(
+            (self.nw1, self.nw2), merge.MergePolicy.Mean)
+        self.assertAlmostEqual(mean.compounds[1].energy, -0.2)
+        with self.assertRaises(ValueError):
+            merge.merge_networks(
+                (self.nw1, self.nw2), merge.MergePolicy.Strict)
+        self.assertEqual(
+            merge.merge_networks(
+                (self.nw1, self.nw1), merge.MergePolicy.Strict)
+            , self.nw1)
+
+    def test_reverse(self):
+        # B -> A of the second network is already merged from A <-> B
+        nw = merge.merge_networks((self.nw1, self.nw2))
+        self.assertEqual(len(nw.reactions), 3)
+        idx = {str(r): r.idx for r in nw.reactions}
+        self.assertEqual(idx["A->B"], idx["B->A"])
+        self.assertNotEqual(idx["A->B"], idx["B->C"])
+        self.assertEqual(len(unique_reactions(nw.reactions)), 2)
+        # Each direction is given by a different network
+        head = "cleft,cright,energy,direction,name\n"
+        rev = merge.merge_networks((
+            parse_network(COMPS_1, head + "A,B,0.5,->,R0\n")
+            , parse_network(COMPS_2, head + "B,C,0.6,->,R0\nB,A,0.5,->,R1\n")))
+        idx = {str(r): r.idx for r in rev.reactions}
+        self.assertEqual(idx, {"A->B": 0, "B->C": 1, "B->A": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
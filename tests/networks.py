@@ -0,0 +1,46 @@
+"""Networks shared by the kinetics tests."""
+import unittest
+
+from rnets import chemistry as ch
+from rnets.parser import parse_network
+
+# A <-> B <-> C, whose two steps have close barriers
+CHAIN_COMPS = """name,energy,conc
+A,0.,1.
+B,-0.1,0.
+C,-0.3,0.
+"""
+
+CHAIN_REACTS = """cleft,cleft,cright,energy,direction,name
+A,,B,0.6,<->,R0
+B,,C,0.62,<->,R1
+"""
+
+# A <-> B and the second order 2 A <-> C
+DIMER_COMPS = """name,energy,conc
+A,0.,1.
+B,-0.05,0.
+C,0.02,0.
+"""
+
+DIMER_REACTS = """cleft,cleft,cright,energy,direction,name
+A,,B,0.6,<->,R0
+A,A,C,0.65,<->,R1
+"""
+
+
+class NetworkTestCase(unittest.TestCase):
+    """Base test case parsing a network at 300 K into self.nw and
+    self.cfg"""
+    comps: str = CHAIN_COMPS
+    reacts: str = CHAIN_REACTS
+
+    def setUp(self):
+        self.nw = parse_network(self.comps, self.reacts)
+        self.cfg = ch.ChemCfg(T=300.)
+
+
+class DimerTestCase(NetworkTestCase):
+    """Base test case parsing the dimerization network"""
+    comps = DIMER_COMPS
+    reacts = DIMER_REACTS
@@ -0,0 +1,97 @@
+import math
+import unittest
+
+from rnets import chemistry as ch
+from rnets.kinetics import ode
+from rnets.parser import parse_network
+
+import networks
+
+
+class OdeTestCase(networks.DimerTestCase):
+    """A test case for the ode module"""
+
+    def test_first_order(self):
+        nw = parse_network(
+            networks.DIMER_COMPS
+            , "\n".join(networks.DIMER_REACTS.splitlines()[:2]))
+        m = ode.build_mass_action(nw, self.cfg)
+        kf, kr = (
+            ch.calc_pseudo_k_constant(ea, self.cfg.T, self.cfg.A, self.cfg.kb)
+            for ea in (0.6, 0.65))
+        tr = ode.integrate_ros2(
+            m, [1., 0., 0.], [0., 1e-3, 1e-2, 1e-1], rtol=1e-8, atol=1e-12)
+        self.assertTrue(tr.success)
+        a_eq = kr / (kf + kr)
+        for t, y in zip(tr.t, tr.y):
+            ref = a_eq + (1. - a_eq) * math.exp(-(kf + kr) * t)
+            self.assertAlmostEqual(y[0], ref, places=6)
+
+    def test_jacobian(self):
+        m = ode.build_mass_action(self.nw, self.cfg)
+        c = [0.3, 0.2, 0.1]
+        jac = ode.mass_action_jacobian(m, c)
+        f0 = ode.mass_action_rhs(m, c)
+        for j in range(3):
+            cp = list(c)
+            cp[j] += 1e-7
+            f1 = ode.mass_action_rhs(m, cp)
+            for i in range(3):
+                self.assertAlmostEqual(
+                    (f1[i] - f0[i]) / 1e-7, jac[i][j]
+                    , delta=1e-5 * abs(jac[i][j]) + 1e-9)
+
+    def test_mass_balance(self):
+        tr = ode.solve_kinetics(
+            self.nw, [0., 1e-4, 1e-2, 1.], self.cfg, method="ros2")
+        self.assertTrue(tr.success)
+        for y in tr.y:
+            self.assertAlmostEqual(y[0] + y[1] + 2 * y[2], 1.)
+        *_, last = ode.trajectory_networks(self.nw, tr)
+        self.assertEqual(last.compounds[0].conc, tr.y[-1][0])
+        for x in ch.calc_net_rates(last, self.cfg):
+            self.assertAlmostEqual(x, 0., places=6)
+
+    def test_reduced(self):
+        ts = [0., 1e-4, 1e-2, 1.]
+        full = ode.solve_kinetics(
+            self.nw, ts, self.cfg, method="ros2", reduce=False)
+        red = ode.solve_kinetics(self.nw, ts, self.cfg, method="ros2")
+        self.assertTrue(red.success)
+        for y0, y1 in zip(full.y, red.y):
+            self.assertEqual(len(y1), 3)
+            self.assertAlmostEqual(y1[0] + y1[1] + 2 * y1[2], 1., places=12)
+            for a, b in zip(y0, y1):
+                self.assertAlmostEqual(a, b, places=5)
+
+    def test_large(self):
+        # Large enough for the sparse factorization when SciPy is installed
+        n = ode.ROS2_SPARSE_SIZE + 5
+        nw = parse_network(
+            "name,energy,conc\n" + "".join(
+                f"C{i},{-0.01 * i},{float(i == 0)}\n" for i in range(n))
+            , "cleft,cright,energy,direction,name\n" + "".join(
+                f"C{i},C{i + 1},0.75,<->,R{i}\n" for i in range(n - 1)))
+        ts = [0., 1e-4, 1e-3]
+        full = ode.solve_kinetics(
+            nw, ts, self.cfg, method="ros2", reduce=False)
+        red = ode.solve_kinetics(nw, ts, self.cfg, method="ros2")
+        self.assertTrue(full.success)
+        self.assertTrue(red.success)
+        for y0, y1 in zip(full.y, red.y):
+            self.assertAlmostEqual(sum(y0), 1., places=8)
+            self.assertAlmostEqual(sum(y1), 1., places=12)
+            for a, b in zip(y0, y1):
+                self.assertAlmostEqual(a, b, places=6)
+
+    def test_positions(self):
+        self.assertEqual(ode.compound_positions(self.nw, ("C", "A")), (2, 0))
+        self.assertEqual(
+            ode.compound_positions(self.nw, ("D", "B"), skip_missing=True)
+            , (1,))
+        with self.assertRaises(ValueError):
+            ode.compound_positions(self.nw, ("D", "B"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from rnets import chemistry as ch
+from rnets.addons.colorbar import ColorbarCfg
+from rnets.parser import parse_network
+from rnets.plotter import kinetic, thermo
+from rnets.plotter.utils import EdgeCfg, GraphCfg
+
+COMPS = """name,energy,conc
+A,0.,0.5
+B,0.1,0.2
+C,-0.2,0.1
+D,0.3,0.05
+"""
+
+REACTS = """cleft,cleft,cright,cright,energy,direction,name
+A,A,B,,0.5,<->,R0
+B,C,A,C,0.7,->,R1
+A,,D,,0.4,->,R2
+"""
+
+# A three compound side is not elementary and has no net rate
+REACTS_NE = """cleft,cleft,cleft,cright,energy,direction,name
+A,,,B,0.5,<->,R0
+A,B,C,D,0.6,->,R1
+"""
+
+
+class PlotterTestCase(unittest.TestCase):
+    """A test case for the thermo and kinetic plotters"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.cfg = ch.ChemCfg(T=298.15)
+        # Networks storing lists are not cached
+        self.listed = self.nw._replace(
+            compounds=list(self.nw.compounds)
+            , reactions=list(self.nw.reactions))
+
+    def test_cached_stats(self):
+        fresh = ch.calc_network_stats(self.nw, self.cfg)
+        for mod in (thermo, kinetic):
+            for log_scale in (False, True):
+                g_cfg = GraphCfg(edge=EdgeCfg(log_scale=log_scale))
+                for cb in (None, ColorbarCfg()):
+                    with self.subTest(
+                            plotter=mod.__name__, log_scale=log_scale
+                            , colorbar=cb is not None):
+                        graph = str(mod.build_dotgraph(
+                            self.nw, g_cfg, self.cfg, cb))
+                        self.assertEqual(graph, str(mod.build_dotgraph(
+                            self.nw, g_cfg, self.cfg, cb, stats=fresh)))
+                        self.assertEqual(graph, str(mod.build_dotgraph(
+                            self.listed, g_cfg, self.cfg, cb)))
+
+    def test_non_finite_values(self):
+        g_cfg = GraphCfg(edge=EdgeCfg(max_width=5.))
+        xs = [0.5, float("nan"), 1., float("-inf")]
+        graph = thermo.build_dotgraph(
+            self.nw, g_cfg, self.cfg, width_values=xs, color_values=xs)
+        ref = thermo.build_dotgraph(
+            self.nw, g_cfg, self.cfg, width_values=[0.5, 0., 1., 0.]
+            , color_values=[0.5, 0.5, 1., 0.5])
+        self.assertEqual(str(graph), str(ref))
+        self.assertNotIn("nan", str(graph))
+
+    def test_missing_rates(self):
+        nw = parse_network(COMPS, REACTS_NE)
+        for log_scale in (False, True):
+            g_cfg = GraphCfg(edge=EdgeCfg(max_width=5., log_scale=log_scale))
+            with self.subTest(log_scale=log_scale):
+                graph = kinetic.build_dotgraph(nw, g_cfg, self.cfg)
+                widths = {
+                    (e.origin.name, e.target.name): e.options["penwidth"]
+                    for e in graph.edges}
+                self.assertEqual(
+                    widths["A", "D"], str(float(g_cfg.edge.width)))
+
+    def test_node_values(self):
+        graph = kinetic.build_dotgraph(
+            self.nw, chem_cfg=self.cfg, node_values=[1., 2., 3., 4.])
+        self.assertEqual(len(graph.nodes), 4)
+        self.assertEqual(graph.nodes[3].options["xlabel"], '"4.00e+00"')
+        with self.assertRaises(ValueError):
+            kinetic.build_dotgraph(
+                self.nw, chem_cfg=self.cfg, node_values=[1., 2.])
+
+
+if __name__ == "__main__":
+    unittest.main()
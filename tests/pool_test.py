@@ -0,0 +1,41 @@
+import unittest
+from typing import NamedTuple
+
+from rnets.kinetics import pool
+
+
+class _Scale(NamedTuple):
+    factor: int
+
+
+def _scaled(x: int) -> int:
+    return pool.get_problem(_Scale).factor * x
+
+
+class PoolTestCase(unittest.TestCase):
+    """A test case for the pool module"""
+
+    def test_serial(self):
+        self.assertEqual(
+            list(pool.run_pool(_scaled, _Scale(3), range(4), max_workers=1))
+            , [0, 3, 6, 9])
+
+    def test_parallel(self):
+        self.assertEqual(
+            list(pool.run_pool(
+                _scaled, _Scale(2), range(5), max_workers=2, chunksize=2))
+            , [0, 2, 4, 6, 8])
+
+    def test_unordered(self):
+        res = dict(pool.run_pool_unordered(
+            _scaled, _Scale(5), [1, 2, 3], max_workers=2))
+        self.assertEqual(res, {0: 5, 1: 10, 2: 15})
+
+    def test_wrong_problem(self):
+        with pool.worker_pool("not a scale", max_workers=1):
+            with self.assertRaises(RuntimeError):
+                _scaled(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from math import isnan
+from pathlib import Path
+
+from rnets import chemistry as ch
+from rnets.kinetics import ranking
+from rnets.parser import parse_network_from_file
+
+COMPS = """name,energy,conc
+Cat,0.,1.
+A,0.,1.
+CatA,{},0.
+B,-0.3,0.
+"""
+
+REACTS = """cleft,cleft,cright,cright,energy,direction,name
+Cat,A,CatA,,{},<->,R0
+CatA,,Cat,B,{},<->,R1
+"""
+
+
+class RankingTestCase(unittest.TestCase):
+    """A test case for the ranking module"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        # Surfaces binding CatA from strongly to weakly
+        for i in range(20):
+            d = -0.5 + 0.05 * i
+            (self.root / f"s{i:02d}_comp.csv").write_text(
+                COMPS.format(-0.1 + d))
+            (self.root / f"s{i:02d}_reac.csv").write_text(
+                REACTS.format(0.5 + 0.5 * d, 0.7 + 0.5 * d))
+        (self.root / "lone_comp.csv").write_text(COMPS.format(0.))
+        self.cfg = ch.ChemCfg(T=300., A=1e13)
+
+    def test_pairs(self):
+        pairs = ranking.find_network_pairs(self.root)
+        self.assertEqual(len(pairs), 20)
+        name, cf, rf = pairs[3]
+        self.assertEqual(name, "s03")
+        self.assertEqual(rf, self.root / "s03_reac.csv")
+
+    def test_bound(self):
+        for _, cf, rf in ranking.find_network_pairs(self.root):
+            nw = parse_network_from_file(cf, rf)
+            for crit in ("span", "steady"):
+                self.assertGreaterEqual(
+                    ranking.network_bound(
+                        nw, crit, "B", self.cfg, ("A", "B"))
+                    , ranking.network_tof(
+                        nw, crit, "B", self.cfg, ("A", "B")))
+            self.assertEqual(
+                ranking.network_bound(nw, "span", "Cat", self.cfg), 0.)
+
+    def test_rank(self):
+        full = sorted(
+            ((ranking.network_tof(
+                parse_network_from_file(cf, rf), "steady", "B", self.cfg
+                , ("A", "B")), name)
+             for name, cf, rf in ranking.find_network_pairs(self.root))
+            , reverse=True)
+        for crit in ("span", "steady"):
+            for workers in (1, 2):
+                r = ranking.rank_networks(
+                    self.root, 3, crit, "B", self.cfg, ("A", "B")
+                    , max_workers=workers)
+                self.assertEqual(
+                    [c.name for c in r.top], [n for _, n in full[:3]])
+                self.assertLess(r.evaluated, 20)
+                self.assertEqual(
+                    r.evaluated
+                    , sum(c.tof is not None for c in r.candidates))
+                bounds = [c.bound for c in r.candidates]
+                self.assertEqual(bounds, sorted(bounds, reverse=True))
+
+    def test_default_workers(self):
+        serial = ranking.rank_networks(
+            self.root, 3, "span", chem_cfg=self.cfg, max_workers=1)
+        parallel = ranking.rank_networks(
+            self.root, 3, "span", chem_cfg=self.cfg)
+        self.assertEqual(
+            [c.name for c in parallel.top], [c.name for c in serial.top])
+
+    def test_unparsable(self):
+        (self.root / "bad_comp.csv").write_text("label,energy\nA,0.\n")
+        (self.root / "bad_reac.csv").write_text(REACTS.format(0.5, 0.7))
+        # Quoted header and values, as written by some spreadsheets
+        (self.root / "quoted_comp.csv").write_text(
+            '"name","energy","conc"\n"Cat",0.,1.\n"A",0.,1.\n'
+            '"CatA",-0.35,0.\n"B",-0.3,0.\n')
+        (self.root / "quoted_reac.csv").write_text(REACTS.format(0.35, 0.55))
+        r = ranking.rank_networks(
+            self.root, 25, "span", chem_cfg=self.cfg, max_workers=1)
+        self.assertEqual(len(r.candidates), 22)
+        self.assertEqual(r.candidates[-1].name, "bad")
+        self.assertTrue(isnan(r.candidates[-1].tof))
+        self.assertEqual(r.top[-1].name, "bad")
+        quoted = next(c for c in r.candidates if c.name == "quoted")
+        self.assertGreater(quoted.tof, 0.)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            ranking.rank_networks(self.root, criterion="rates")
+        with self.assertRaises(ValueError):
+            ranking.rank_networks(self.root, k=0)
+        with self.assertRaises(ValueError):
+            ranking.rank_networks(self.root, criterion="steady")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from rnets import chemistry as ch
+from rnets.kinetics import ode, reduction
+from rnets.parser import parse_network
+
+COMPS = """name,energy,conc
+A,0.,1.
+B,-0.05,0.
+C,-0.1,0.
+"""
+
+REACTS = """cleft,cleft,cright,energy,direction,name
+A,,B,0.3,<->,R0
+B,,C,0.75,<->,R1
+"""
+
+
+class ReductionTestCase(unittest.TestCase):
+    """A test case for the reduction module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.cfg = ch.ChemCfg(T=300.)
+        self.m = ode.build_mass_action(self.nw, self.cfg)
+        self.fast = next(
+            j for j, r in enumerate(self.m.engine.reactions)
+            if {c.name for side in r.compounds for c in side} == {"A", "B"})
+
+    def test_find_fast(self):
+        c = [1., 0., 0.]
+        lams = reduction.relaxation_rates(self.m, c)
+        kt = self.m.engine.kt
+        for j, lam in enumerate(lams):
+            self.assertAlmostEqual(lam, kt.kf[j] + kt.kr[j])
+        self.assertEqual(
+            reduction.find_fast(self.m, c, 1.), ((self.fast,), ()))
+
+    def test_model(self):
+        rm = reduction.build_reduced_model(self.m, [self.fast], [2])
+        self.assertEqual(rm.eq_reactions, (self.fast,))
+        self.assertEqual(rm.eq_compounds, (2,))
+        self.assertEqual(rm.slow, ((1, 1, 0),))
+        rm = reduction.build_reduced_model(self.m, [self.fast], [])
+        self.assertEqual(len(rm.slow), 2)
+        c = reduction.project(rm, [1., 0.2], [1., 0., 0.])
+        self.assertAlmostEqual(c[0] + c[1], 1.)
+        self.assertAlmostEqual(c[2], 0.2)
+        rates = ch.eval_rates(self.m.engine, c)
+        self.assertAlmostEqual(
+            rates.net[self.fast] / rates.fwd[self.fast], 0., places=6)
+
+    def test_reduced_kinetics(self):
+        ts = [0., 1., 2., 5., 10.]
+        full = ode.solve_kinetics(self.nw, ts, self.cfg, method="ros2")
+        rm, red = reduction.solve_reduced_kinetics(self.nw, ts, self.cfg)
+        self.assertEqual(rm.fast, (self.fast,))
+        self.assertTrue(red.success)
+        self.assertEqual(len(red.y), len(ts))
+        for y0, y1 in zip(full.y[1:], red.y[1:]):
+            self.assertAlmostEqual(sum(y1), 1., places=12)
+            for a, b in zip(y0, y1):
+                self.assertAlmostEqual(a, b, places=4)
+        *_, last = ode.trajectory_networks(self.nw, red)
+        self.assertEqual(last.compounds[2].conc, red.y[-1][2])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            reduction.solve_reduced_kinetics(self.nw, [0.], self.cfg)
+
+
+if __name__ == "__main__":
+    unittest.main()
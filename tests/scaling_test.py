@@ -0,0 +1,109 @@
+import unittest
+from math import inf, log10
+
+from rnets import chemistry as ch
+from rnets.kinetics import scaling
+from rnets.parser import parse_network
+
+COMPS = """name,energy,conc
+Cat,0.,1.
+A,0.,1.
+CatA,-0.1,0.
+B,-0.3,0.
+"""
+
+REACTS = """cleft,cleft,cright,cright,energy,direction,name
+Cat,A,CatA,,0.5,<->,R0
+CatA,,Cat,B,0.7,<->,R1
+"""
+
+
+class ScalingTestCase(unittest.TestCase):
+    """A test case for the scaling module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.cfg = ch.ChemCfg(T=300., A=1e13)
+        self.sr = scaling.build_scaling(
+            self.nw, ("dE",)
+            , {"CatA": (-0.1, 1.), "R0": (0.5, 0.5), "R1": (0.7, 0.5)})
+        self.points = scaling.descriptor_grid(
+            [x / 10. for x in range(-5, 6)])
+
+    def test_energies(self):
+        self.assertEqual(len(self.points), 11)
+        c_es, r_es = scaling.scaled_energies(self.sr, self.points)
+        self.assertEqual(len(c_es), 11)
+        for (d,), cs, rs in zip(self.points, c_es, r_es):
+            self.assertEqual(cs[0], 0.)
+            self.assertAlmostEqual(cs[2], -0.1 + d)
+            self.assertAlmostEqual(cs[3], -0.3)
+            self.assertEqual(len(rs), 2)
+        nw = scaling.screening_network(
+            self.nw, scaling.screen_catalysts(
+                self.nw, self.sr, self.points[:1], "span"
+                , chem_cfg=self.cfg, max_workers=1)
+            , 0)
+        self.assertAlmostEqual(nw.compounds[2].energy, -0.6)
+        for r, e in zip(nw.reactions, (0.25, 0.25, 0.45, 0.45)):
+            self.assertAlmostEqual(r.energy, e)
+        for c in nw.reactions[0].compounds[0]:
+            self.assertIs(c, nw.compounds[c.idx])
+
+    def test_volcano(self):
+        span = scaling.screen_catalysts(
+            self.nw, self.sr, self.points, "span", chem_cfg=self.cfg
+            , max_workers=1)
+        steady = scaling.screen_catalysts(
+            self.nw, self.sr, self.points, "steady", product="B"
+            , chem_cfg=self.cfg, fixed=(1, 3), max_workers=2)
+        header, rows = scaling.volcano_table(steady)
+        self.assertEqual(header, ("dE", "log10_tof"))
+        # The top of the volcano balances the two steps
+        top = max(range(len(rows)), key=lambda i: rows[i][1])
+        self.assertEqual(rows[top][0], 0.1)
+        for a, b in zip(span.tof, steady.tof):
+            self.assertAlmostEqual(log10(a), log10(b), places=4)
+        self.assertEqual(len(steady.rates[0]), 2)
+        nw = scaling.screening_network(self.nw, steady, top)
+        self.assertAlmostEqual(
+            sum(nw.compounds[i].conc for i in (0, 2)), 1.)
+        self.assertIsNone(span.rates[0])
+        rates = scaling.screen_catalysts(
+            self.nw, self.sr, self.points, "rates", product="B"
+            , chem_cfg=self.cfg, max_workers=1)
+        self.assertEqual(scaling.volcano_table(rates)[1][0][1], -inf)
+
+    def test_cycle(self):
+        # Cycle found in another instance of the same network
+        cycle = next(ch.find_catalytic_cycles(
+            parse_network(COMPS, REACTS)))
+        res = scaling.screen_catalysts(
+            self.nw, self.sr, self.points, "span", cycle=cycle
+            , chem_cfg=self.cfg, max_workers=1)
+        ref = scaling.screen_catalysts(
+            self.nw, self.sr, self.points, "span", chem_cfg=self.cfg
+            , max_workers=1)
+        self.assertEqual(list(res.tof), list(ref.tof))
+        other = next(ch.find_catalytic_cycles(parse_network(
+            COMPS + "C,-0.2,0.\n", REACTS.replace("Cat,B", "Cat,C"))))
+        with self.assertRaises(ValueError):
+            scaling.screen_catalysts(
+                self.nw, self.sr, self.points, "span", cycle=other
+                , max_workers=1)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            scaling.build_scaling(self.nw, ("dE",), {"D": (0., 1.)})
+        with self.assertRaises(ValueError):
+            scaling.build_scaling(self.nw, ("dE",), {"CatA": (0.,)})
+        with self.assertRaises(ValueError):
+            scaling.scaled_energies(self.sr, [(0., 1.)])
+        with self.assertRaises(ValueError):
+            scaling.screen_catalysts(self.nw, self.sr, self.points, "k")
+        with self.assertRaises(ValueError):
+            scaling.screen_catalysts(self.nw, self.sr, self.points, "steady")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from rnets import chemistry as ch
+from rnets.kinetics import conservation, ode, steady
+
+import networks
+
+
+class SteadyTestCase(networks.DimerTestCase):
+    """A test case for the conservation and steady modules"""
+
+    def test_conservation_laws(self):
+        m = ode.build_mass_action(self.nw, self.cfg)
+        cl = conservation.conservation_laws(m.stoich)
+        self.assertEqual(cl.laws, ((1, 1, 2),))
+        self.assertEqual(len(cl.pivots), 1)
+        self.assertEqual(
+            conservation.conserved_totals(cl, [0.2, 0.4, 0.1]), (0.8,))
+
+    def test_reduction(self):
+        m = ode.build_mass_action(self.nw, self.cfg)
+        c = [0.5, 0.3, 0.1]
+        red = ode.reduce_system(m, c)
+        # The most abundant compound is the dependent one
+        self.assertEqual(red.dependent, (0,))
+        self.assertEqual(red.free, (1, 2))
+        x = conservation.reduce_vector(red, c)
+        self.assertEqual(list(conservation.expand_vector(red, x)), c)
+        rhs, jac = ode.mass_action_system(m, red)
+        j0 = jac(x)
+        f0 = rhs(x)
+        for b in range(2):
+            xp = list(x)
+            xp[b] += 1e-7
+            f1 = rhs(xp)
+            for a in range(2):
+                self.assertAlmostEqual(
+                    (f1[a] - f0[a]) / 1e-7, j0[a][b]
+                    , delta=1e-5 * abs(j0[a][b]) + 1e-9)
+
+    def test_steady_state(self):
+        ss = steady.steady_state(self.nw, self.cfg)
+        self.assertTrue(ss.success)
+        a, b, c = ss.c
+        self.assertAlmostEqual(a + b + 2 * c, 1.)
+        eng = ch.build_rate_engine(self.nw, self.cfg)
+        for x in ch.eval_rates(eng, ss.c).net:
+            self.assertAlmostEqual(x, 0., places=9)
+
+    def test_sweep(self):
+        cfgs = [ch.ChemCfg(T=T) for T in (300., 320., 340.)]
+        sweep = list(steady.steady_state_sweep(self.nw, cfgs))
+        self.assertEqual(len(sweep), 3)
+        for ss, cfg in zip(sweep, cfgs):
+            self.assertTrue(ss.success)
+            self.assertEqual(ss.chem_cfg, cfg)
+            ref = steady.steady_state(self.nw, cfg)
+            for x, y in zip(ss.c, ref.c):
+                self.assertAlmostEqual(x, y, places=7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from rnets import stoich
+from rnets.parser import parse_network
+
+COMPS = """name,energy
+A,0.
+B,0.1
+C,-0.2
+Cat,0.
+"""
+
+REACTS = """cleft,cleft,cright,cright,energy,direction,name
+A,A,B,,0.5,->,R0
+B,Cat,C,Cat,0.7,<->,R1
+"""
+
+
+class StoichTestCase(unittest.TestCase):
+    """A test case for the stoich module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+        self.dense = [
+            [-2, 0, 0]
+            , [1, 1, -1]
+            , [0, -1, 1]
+            , [0, 0, 0]
+        ]
+
+    def test_csr(self):
+        m = stoich.build_stoich_matrix(self.nw)
+        self.assertEqual(m.fmt, "csr")
+        self.assertEqual(m.shape, (4, 3))
+        self.assertEqual(list(m.indptr), [0, 1, 4, 6, 6])
+        self.assertEqual(stoich.to_dense(m), self.dense)
+
+    def test_csc(self):
+        m = stoich.build_stoich_matrix(self.nw, fmt="csc")
+        self.assertEqual(m.fmt, "csc")
+        self.assertEqual(stoich.to_dense(m), self.dense)
+        self.assertEqual(stoich.to_csc(stoich.to_csr(m)), m)
+
+    def test_subset(self):
+        m = stoich.build_stoich_matrix(self.nw, self.nw.reactions[:1])
+        self.assertEqual(m.shape, (4, 1))
+        self.assertEqual(stoich.to_dense(m), [[-2], [1], [0], [0]])
+
+    def test_flux_balance(self):
+        m = stoich.build_stoich_matrix(self.nw)
+        fb = stoich.flux_balance(m, [1., 2., None])
+        self.assertEqual(list(fb.production), [0., 3., 0., 0.])
+        self.assertEqual(list(fb.consumption), [2., 0., 2., 0.])
+        self.assertEqual(list(fb.net), [-2., 3., -2., 0.])
+        self.assertEqual(
+            stoich.network_flux_balance(self.nw, [1., 2., -2.]), fb)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import copy
+import pickle
+import unittest
+
+from rnets import struct
+from rnets.parser import parse_network
+
+COMPS = """name,energy,conc,fflags,visible,opts
+A,0.,1.,i:b,,color=red:shape=box
+B,-0.1,,,grey,
+C,0.2,0.,u,false,
+"""
+
+REACTS = """cleft,cleft,cright,energy,direction,name,visible,opts,gpoly
+A,A,B,0.5,<->,R0,,,0.5:-1e-3
+B,,C,0.7,->,R1,f,penwidth=2,
+"""
+
+
+class StructTestCase(unittest.TestCase):
+    """A test case for the struct module"""
+
+    def setUp(self):
+        self.nw = parse_network(COMPS, REACTS)
+
+    def test_pack(self):
+        for oob in (False, True):
+            nw = struct.unpack_network(*struct.pack_network(self.nw, oob))
+            self.assertEqual(nw, self.nw)
+            for x, y in zip(nw.compounds, self.nw.compounds):
+                self.assertEqual(tuple(x), tuple(y))
+            for x, y in zip(nw.reactions, self.nw.reactions):
+                self.assertEqual(tuple(x), tuple(y))
+            for r in nw.reactions:
+                for c in r.compounds[0] + r.compounds[1]:
+                    self.assertIs(c, nw.compounds[c.idx])
+        c = struct.unpack_network(
+            *struct.pack_network(self.nw)).compounds
+        self.assertEqual(c[0].fflags, {struct.FFlags.I, struct.FFlags.B})
+        self.assertEqual(c[0].opts, {"color": "red", "shape": "box"})
+        self.assertIsNone(c[1].conc)
+        self.assertEqual(c[2].conc, 0.)
+        self.assertEqual(c[1].fflags, set())
+        nw = self.nw._replace(compounds=tuple(
+            x._replace(fflags=None) for x in self.nw.compounds))
+        self.assertIsNone(struct.unpack_network(
+            *struct.pack_network(nw)).compounds[1].fflags)
+        self.assertEqual(
+            [x.visible for x in c]
+            , [struct.Visibility.TRUE, struct.Visibility.GREY
+               , struct.Visibility.FALSE])
+
+    def test_pickle(self):
+        for protocol in (2, 4, 5):
+            nw = pickle.loads(pickle.dumps(self.nw, protocol))
+            self.assertEqual(nw, self.nw)
+            self.assertEqual(nw.reactions[2].opts, {"penwidth": "2"})
+            self.assertEqual(
+                nw.reactions[2].visible, struct.Visibility.FALSE)
+        buffers = []
+        data = pickle.dumps(self.nw, 5, buffer_callback=buffers.append)
+        self.assertTrue(buffers)
+        self.assertEqual(pickle.loads(data, buffers=buffers), self.nw)
+
+    def test_copy(self):
+        nw = struct.Network(
+            list(self.nw.compounds), list(self.nw.reactions))
+        shallow = copy.copy(nw)
+        self.assertIs(shallow.compounds, nw.compounds)
+        deep = copy.deepcopy(nw)
+        self.assertEqual(deep, nw)
+        self.assertIsInstance(deep.compounds, list)
+        self.assertIsNot(deep.compounds, nw.compounds)
+        # The reactions keep sharing the copied compounds
+        c = deep.reactions[0].compounds[1][0]
+        self.assertIs(c, deep.compounds[c.idx])
+
+    def test_missing_compound(self):
+        nw = self.nw._replace(compounds=self.nw.compounds[:2])
+        with self.assertRaises(ValueError):
+            struct.pack_network(nw)
+
+
+if __name__ == "__main__":
+    unittest.main()